@@ -7,6 +7,8 @@ class User(db.Model):
     cliq_user_id = db.Column(db.String(64), unique=True, nullable=False)
     # Store the channel ID where the user interacts with the bot, to send alerts back
     default_channel_id = db.Column(db.String(64), nullable=True) 
+    # Preferred display currency (ISO code, lowercase); None means Config.DEFAULT_CURRENCY
+    currency = db.Column(db.String(8), nullable=True)
     holdings = db.relationship('Holding', backref='owner', lazy='dynamic')
     alerts = db.relationship('Alert', backref='user', lazy='dynamic')
     wallets = db.relationship('Wallet', backref='owner', lazy='dynamic')
@@ -28,26 +30,156 @@ class Wallet(db.Model):
     chain = db.Column(db.String(20), default='eth')
     name = db.Column(db.String(50), nullable=True) # User-friendly name
     last_synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Staleness scheduling: balances that keep changing are re-synced every
+    # WALLET_SYNC_MIN_INTERVAL, unchanged ones back off exponentially
+    last_changed_at = db.Column(db.DateTime, nullable=True)
+    sync_interval = db.Column(db.Integer, nullable=True) # Current back-off, seconds
+    next_sync_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
 class Holding(db.Model):
     __tablename__ = 'holdings'
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    coin_id = db.Column(db.String(64), nullable=False)
+    # Indexed on its own for the coin -> holders lookup in alert fan-out
+    coin_id = db.Column(db.String(64), nullable=False, index=True)
     chain = db.Column(db.String(20), default='eth') # Network awareness
     amount = db.Column(db.Float, nullable=False)
 
-    # Composite Index for faster lookups when users scale
-    __table_args__ = (db.Index('idx_user_coin_chain', 'user_id', 'coin_id', 'chain'),)
+    # One row per (user, coin, chain): serves lookups and is the conflict
+    # target for bulk upserts (HoldingService)
+    __table_args__ = (db.UniqueConstraint('user_id', 'coin_id', 'chain', name='uq_holdings_user_coin_chain'),)
 
 class Price(db.Model):
     __tablename__ = 'prices'
     coin_id = db.Column(db.String(64), primary_key=True)
+    name = db.Column(db.String(128), nullable=True)
+    symbol = db.Column(db.String(32), nullable=True)
     last_price = db.Column(db.Float)
     last_change_pct_1h = db.Column(db.Float)
     last_change_pct_24h = db.Column(db.Float)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class PriceTick(db.Model):
+    __tablename__ = 'price_ticks'
+    # Append-only raw observations, kept for PRICE_HISTORY_RAW_HOURS. One row
+    # per coin per tick outruns an int4 id; SQLite only autoincrements INTEGER
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    coin_id = db.Column(db.String(64), nullable=False)
+    ts = db.Column(db.BigInteger, nullable=False) # Unix epoch seconds
+    price = db.Column(db.Float, nullable=False)
+
+    # Range reads per coin, and the cross-coin "older than cutoff" scan in rollups
+    __table_args__ = (
+        db.Index('idx_price_ticks_coin_ts', 'coin_id', 'ts'),
+        db.Index('idx_price_ticks_ts', 'ts'),
+    )
+
+class PriceBar(db.Model):
+    __tablename__ = 'price_bars'
+    # OHLC roll-ups of price_ticks: 300s bars, then 3600s bars
+    coin_id = db.Column(db.String(64), primary_key=True)
+    resolution = db.Column(db.Integer, primary_key=True) # Bar width in seconds
+    bucket = db.Column(db.BigInteger, primary_key=True) # Bar start, Unix epoch seconds
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    samples = db.Column(db.Integer, default=1)
+
+    __table_args__ = (db.Index('idx_price_bars_resolution_bucket', 'resolution', 'bucket'),)
+
+class Coin(db.Model):
+    __tablename__ = 'coins'
+    # Snapshot of CoinGecko /coins/list used by the local search index
+    id = db.Column(db.String(128), primary_key=True)
+    symbol = db.Column(db.String(64), nullable=False, index=True)
+    name = db.Column(db.String(256), nullable=False)
+    market_cap_rank = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    # Durable work queue drained by worker.py (see app/services/job_queue.py)
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.String(36), nullable=True, index=True) # Groups the jobs of one cron run
+    kind = db.Column(db.String(32), nullable=False) # Handler name in app/tasks.py
+    payload = db.Column(db.JSON, nullable=True)
+    status = db.Column(db.String(16), nullable=False, default='pending') # pending, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True) # Lease expiry; an expired running job is reclaimable
+    last_error = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    telemetry = db.Column(db.JSON, nullable=True) # Wall time, HTTP calls per provider and SQL counts of the last attempt
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Claim scan: next due job by status
+    __table_args__ = (db.Index('idx_jobs_status_run_after', 'status', 'run_after'),)
+
+class CronRun(db.Model):
+    __tablename__ = 'cron_runs'
+    # Telemetry of a finished scheduled run, aggregated from its jobs
+    run_id = db.Column(db.String(36), primary_key=True)
+    status = db.Column(db.String(16), nullable=False) # success, partial_error
+    started_at = db.Column(db.DateTime, nullable=False, index=True) # First job enqueued
+    finished_at = db.Column(db.DateTime, nullable=False)
+    wall_ms = db.Column(db.Float, nullable=False) # started_at -> finished_at, including queueing
+    busy_ms = db.Column(db.Float, nullable=False) # Summed handler time of all jobs
+    jobs = db.Column(db.Integer, nullable=False)
+    stages = db.Column(db.JSON, nullable=False) # {kind: {jobs, failed, busy_ms, max_ms}}
+    providers = db.Column(db.JSON, nullable=False) # {provider: {calls, errors, time_ms, max_ms, p50_ms, p95_ms}}
+    db_stats = db.Column(db.JSON, nullable=False) # {statements, time_ms}
+    items = db.Column(db.JSON, nullable=False) # Summed numeric job results
+    errors = db.Column(db.JSON, nullable=True)
+
+class RunLock(db.Model):
+    __tablename__ = 'run_locks'
+    # One row per lock name; held by a run until its jobs finish or the lease expires
+    name = db.Column(db.String(32), primary_key=True)
+    run_id = db.Column(db.String(36), nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class AlertState(db.Model):
+    __tablename__ = 'alert_state'
+    # Last alert fired per (user, coin, alert type), for in-memory cooldown checks.
+    # coin_id leads the key so a tick's flagged coins load with one PK range scan.
+    coin_id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    alert_type = db.Column(db.String(32), primary_key=True)
+    last_fired_at = db.Column(db.DateTime, nullable=False)
+    last_level = db.Column(db.Float, nullable=True) # % change that fired it
+
+class NewsCache(db.Model):
+    __tablename__ = 'news_cache'
+    # Latest CryptoPanic headlines per currency symbol, shared by every worker
+    symbol = db.Column(db.String(32), primary_key=True) # Upper-case, e.g. BTC
+    items = db.Column(db.JSON, nullable=False) # [{title, url, source, published_at}], one per URL
+    fetched_at = db.Column(db.DateTime, nullable=False)
+
+class OutboxMessage(db.Model):
+    __tablename__ = 'outbox'
+    # Cliq messages written with their Alert rows and delivered by relay.py
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(64), nullable=False, unique=True) # Same alerts -> same key -> one row
+    channel_id = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default='pending') # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_until = db.Column(db.DateTime, nullable=True) # Relay lease; an expired sending row is reclaimable
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    # Claim scan: next due message by status
+    __table_args__ = (db.Index('idx_outbox_status_run_after', 'status', 'run_after'),)
+
 class Alert(db.Model):
     __tablename__ = 'alerts'
     id = db.Column(db.Integer, primary_key=True)
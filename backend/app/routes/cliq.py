@@ -3,7 +3,11 @@ from app.models import User, Holding, Wallet, Message, db
 from app.services.coingecko_service import CoinGeckoService
 from app.services.news_service import NewsService
 from app.services.wallet_service import WalletService
+from app.services.wallet_sync_service import WalletSyncService
+from app.services.holding_service import HoldingService
 from app.services.ai_service import AIService
+from app.services.fx_service import FxService
+from app.utils import currency_symbol, format_currency
 from config import Config
 import re
 import json
@@ -94,7 +98,7 @@ def handle_command_logic(command, args, user):
     command = command.lower().strip()
     
     if command == 'price':
-        return get_price(args)
+        return get_price(args, user)
     elif command == 'reasons':
         return get_reasons(args)
     elif command == 'addcoin':
@@ -110,10 +114,12 @@ def handle_command_logic(command, args, user):
         return {"text": "Usage: `/linkwallet <chain> <address>`"}
     elif command in ['clear', 'clearportfolio']:
         return clear_portfolio(user)
+    elif command == 'currency':
+        return set_currency(user, args)
     elif command == 'chat':
         return {"text": args} # Args contains the AI's chat response
     elif command == 'help':
-        return {"text": "🤖 **Commands:**\n`/price <coin>`\n`/portfolio`\n`/addcoin <coin> <amt>`\n`/linkwallet <chain> <addr>`"}
+        return {"text": "🤖 **Commands:**\n`/price <coin>`\n`/portfolio`\n`/addcoin <coin> <amt>`\n`/linkwallet <chain> <addr>`\n`/currency <code>`"}
 
     return {"text": f"❓ Unknown command: {command}"}
 
@@ -196,7 +202,9 @@ def get_reasons(coin_input):
     symbol = data.get('symbol', '').upper()
     search_query = symbol if symbol else coin_id.upper()
     
+    # Served from the shared news cache; commit any refreshed entry
     reasons = NewsService.search_news(search_query)
+    db.session.commit()
     
     if not reasons: 
         return {"text": f"No news found for **{search_query}**."}
@@ -206,7 +214,10 @@ def get_reasons(coin_input):
         lines.append(f"• [{r['title']}]({r['url']})")
     return {"text": "\n".join(lines)}
 
-def get_price(coin):
+def user_currency(user):
+    return (user.currency if user and user.currency else Config.DEFAULT_CURRENCY).lower()
+
+def get_price(coin, user=None):
     coin = coin.lower().strip()
     found_id = CoinGeckoService.search_coin(coin)
     if found_id: coin = found_id
@@ -214,18 +225,22 @@ def get_price(coin):
     data = CoinGeckoService.get_prices([coin]).get(coin)
     if not data: return {"text": f"❌ Coin '{coin}' not found."}
     
-    price = data['current_price']
+    price, currency = FxService.convert(data['current_price'], user_currency(user))
     change = data.get('price_change_percentage_24h_in_currency', 0)
     emoji = "📈" if change >= 0 else "📉"
     
     return {
-        "text": f"💵 **{data.get('name').title()} ({data.get('symbol').upper()})**: ${price:,.2f} ({change:.2f}% {emoji})"
+        "text": f"💵 **{data.get('name').title()} ({data.get('symbol').upper()})**: {format_currency(price, currency)} ({change:.2f}% {emoji})"
     }
 
 def get_portfolio(user):
     if not user or not user.holdings.count():
         return {"text": "📉 Your portfolio is empty. Use `/addcoin` or `/linkwallet` to start."}
         
+    # Looking at the portfolio makes the user's wallets due on the next sync run
+    WalletSyncService.promote(user.id)
+    db.session.commit()
+
     report = [f"📊 **Portfolio Summary**"]
     total_value = 0
     
@@ -233,13 +248,17 @@ def get_portfolio(user):
     coin_ids = [h.coin_id.lower() for h in user.holdings]
     prices = CoinGeckoService.get_prices(coin_ids)
     
+    # Prices come in the base currency; one FX rate converts the whole report
+    rate, currency = FxService.convert(1.0, user_currency(user))
+    sym = currency_symbol(currency)
+    
     # Explicitly includes HOLDING (Amount)
     report.append(f"`{'COIN':<8} | {'NET':<5} | {'PRICE':<9} | {'HOLDING':<9} | {'VALUE':<10}`")
     
     for h in user.holdings:
         # Lookup using lowercase ID
         price_data = prices.get(h.coin_id.lower(), {})
-        price = price_data.get('current_price', 0)
+        price = (price_data.get('current_price') or 0) * rate
         value = h.amount * price
         total_value += value
         
@@ -247,11 +266,23 @@ def get_portfolio(user):
         chain = h.chain.upper() if h.chain else "MAN"
         
         if value > 0.01 or h.chain == 'manual':
-            report.append(f"`{symbol:<8} | {chain:<5} | ${price:<9,.2f} | {h.amount:<9.2f} | ${value:<10,.2f}`")
+            report.append(f"`{symbol:<8} | {chain:<5} | {sym}{price:<9,.2f} | {h.amount:<9.2f} | {sym}{value:<10,.2f}`")
 
-    report.append(f"\n💰 **Total Value: ₹{total_value:,.2f}**")
+    report.append(f"\n💰 **Total Value: {format_currency(total_value, currency)}**")
     return {"text": "\n".join(report)}
 
+def set_currency(user, code):
+    if not user: return {"text": "User error."}
+    code = code.lower().strip()
+    if not code:
+        return {"text": f"💱 Your currency is **{user_currency(user).upper()}**. Usage: `/currency <code>` (e.g. `usd`, `inr`, `eur`)"}
+    if not FxService.is_supported(code):
+        return {"text": f"❌ Currency '{code}' not supported."}
+
+    user.currency = code
+    db.session.commit()
+    return {"text": f"💱 Prices will now be shown in **{code.upper()}**."}
+
 def clear_portfolio(user):
     if not user: return {"text": "User error."}
     Holding.query.filter_by(user_id=user.id).delete()
@@ -275,16 +306,11 @@ def link_wallet(user, chain, address):
     # Trigger immediate sync
     try:
         holdings = WalletService.fetch_wallet_balances(address, chain)
-        count = 0
-        for h_data in holdings:
-            # Check if holding exists
-            h = Holding.query.filter_by(user_id=user.id, coin_id=h_data['coin_id'], chain=chain).first()
-            if h:
-                h.amount = h_data['amount']
-            else:
-                h = Holding(user_id=user.id, coin_id=h_data['coin_id'], amount=h_data['amount'], chain=chain)
-                db.session.add(h)
-            count += 1
+        # Another wallet on this chain shares the same holdings rows: merge, don't prune
+        prune = Wallet.query.filter_by(user_id=user.id, chain=chain).count() == 1
+        count, _, _ = HoldingService.replace_wallet_holdings(user.id, chain, holdings, prune=prune)
+        w.last_synced_at = datetime.utcnow()
+        WalletSyncService.reschedule(w, changed=True)
         db.session.commit()
         return {"text": f"✅ Wallet {address[:6]}... linked! Found {count} assets."}
     except Exception as e:
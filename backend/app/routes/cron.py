@@ -1,142 +1,104 @@
 from flask import Blueprint, request, jsonify
-from app.models import User, Holding, Price, Alert, Wallet, db
-from app.services.coingecko_service import CoinGeckoService
-from app.services.volatility_service import VolatilityService
-from app.services.news_service import NewsService
-from app.services.zoho_service import ZohoService
-from app.services.wallet_service import WalletService
+from app import tasks
+from app.models import db
+from app.services.price_cache import PriceCache
+from app.services.coin_index import CoinIndex
+from app.services.single_flight import SingleFlight
+from app.services.job_queue import JobQueue, JobWorker
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.outbox_relay import Outbox, OutboxRelay
+from app.services.run_lock import RunInProgress
+from app.services.cron_run_service import CronRunService
 from config import Config
-from datetime import datetime
 import os
-import time
 
 bp = Blueprint('cron', __name__, url_prefix='/api/cron')
 
+def _is_authorized():
+    api_key = request.args.get('key')
+    # Use a specific CRON_KEY env var, or fallback to SECRET_KEY
+    expected_key = os.environ.get('CRON_KEY') or Config.SECRET_KEY
+    return bool(expected_key) and api_key == expected_key
+
 @bp.route('/run-tasks', methods=['GET'])
 def run_scheduled_tasks():
     """
     Endpoint to trigger background tasks (Wallet Sync, Price Check, Alerts).
     Protected by a simple key check.
-    Usage: GET /api/cron/run-tasks?key=<YOUR_SECRET_KEY>
+
+    Only enqueues the run's jobs and returns 202 with a run ID; worker
+    processes (python worker.py) do the work and the relay (python relay.py)
+    delivers the alerts. Poll /api/cron/runs/<run_id> for progress. With
+    inline=1 the run and its alerts are processed in this request instead
+    (single-process setups without a worker). While a previous run still
+    has unfinished jobs no new run is started: the response is 200 with
+    status "in_progress" and that run's ID.
+    Usage: GET /api/cron/run-tasks?key=<YOUR_SECRET_KEY>[&inline=1]
     """
     # Security Check
-    api_key = request.args.get('key')
-    # Use a specific CRON_KEY env var, or fallback to SECRET_KEY
-    expected_key = os.environ.get('CRON_KEY') or Config.SECRET_KEY
-    
-    if not expected_key or api_key != expected_key:
+    if not _is_authorized():
         return jsonify({"error": "Unauthorized"}), 401
 
-    results = {
-        "wallets_synced": 0,
-        "prices_checked": 0,
-        "alerts_sent": 0,
-        "errors": []
-    }
-
-    # ---------------------------------------------------------
-    # 1. SYNC WALLETS
-    # ---------------------------------------------------------
     try:
-        wallets = Wallet.query.all()
-        for wallet in wallets:
-            holdings_data = WalletService.fetch_wallet_balances(wallet.address, wallet.chain)
-            if holdings_data:
-                for item in holdings_data:
-                    coin_id = item['coin_id']
-                    amount = item['amount']
-                    chain = item['chain']
-                    
-                    # Update or Create Holding
-                    holding = Holding.query.filter_by(
-                        user_id=wallet.user_id, 
-                        coin_id=coin_id, 
-                        chain=chain
-                    ).first()
-                    
-                    if holding:
-                        holding.amount = amount
-                    else:
-                        holding = Holding(
-                            user_id=wallet.user_id, 
-                            coin_id=coin_id, 
-                            amount=amount, 
-                            chain=chain
-                        )
-                        db.session.add(holding)
-                
-                wallet.last_synced_at = datetime.utcnow()
-                results["wallets_synced"] += 1
-                # Sleep briefly to avoid rate limits if many wallets
-                time.sleep(0.5)
-        db.session.commit()
+        run_id, job_count = tasks.start_run()
+    except RunInProgress as e:
+        db.session.rollback()
+        return jsonify({"status": "in_progress", "run_id": e.run_id}), 200
     except Exception as e:
-        error_msg = f"Wallet Sync Error: {str(e)}"
+        db.session.rollback()
+        error_msg = f"Enqueue Error: {str(e)}"
         print(error_msg)
-        results["errors"].append(error_msg)
+        return jsonify({"status": "error", "errors": [error_msg]}), 500
 
-    # ---------------------------------------------------------
-    # 2. CHECK PRICES & VOLATILITY
-    # ---------------------------------------------------------
-    try:
-        # Get all unique coins tracked
-        holdings = Holding.query.with_entities(Holding.coin_id).distinct().all()
-        all_coin_ids = [h.coin_id for h in holdings]
-        
-        if all_coin_ids:
-            # Fetch prices (Service handles batching)
-            prices = CoinGeckoService.get_prices(all_coin_ids)
-            results["prices_checked"] = len(prices)
-            
-            for coin_id, data in prices.items():
-                # Update Price DB
-                price_record = Price.query.get(coin_id)
-                if not price_record:
-                    price_record = Price(coin_id=coin_id)
-                    db.session.add(price_record)
-                    
-                price_record.last_price = data['current_price']
-                price_record.last_change_pct_1h = data.get('price_change_percentage_1h_in_currency', 0)
-                price_record.last_change_pct_24h = data.get('price_change_percentage_24h_in_currency', 0)
-                
-                # Check Volatility
-                volatility_alerts = VolatilityService.check_volatility(data)
-                if volatility_alerts:
-                    # Fetch reasons (optional, can be skipped to save API calls)
-                    reasons = []
-                    try:
-                        reasons = NewsService.get_reasons_for_movement(coin_id, volatility_alerts[0]['change'])
-                    except: pass
-                    
-                    # Notify Users
-                    users_holding = User.query.join(Holding).filter(Holding.coin_id == coin_id).all()
-                    for user in users_holding:
-                        if not user.default_channel_id: continue
-                        
-                        for alert in volatility_alerts:
-                            # Save Alert
-                            new_alert = Alert(
-                                user_id=user.id,
-                                coin_id=coin_id,
-                                price_change_pct=alert['change'],
-                                alert_message=alert['message']
-                            )
-                            db.session.add(new_alert)
-                            
-                            # Send Message
-                            try:
-                                payload = ZohoService.format_alert_message(coin_id, alert, reasons, data['current_price'])
-                                ZohoService.send_message(user.default_channel_id, payload)
-                                results["alerts_sent"] += 1
-                            except Exception as e:
-                                print(f"Send Error: {e}")
-            
-            db.session.commit()
-            
-    except Exception as e:
-        error_msg = f"Price Check Error: {str(e)}"
-        print(error_msg)
-        results["errors"].append(error_msg)
-        return jsonify({"status": "partial_error", "results": results}), 500
+    if request.args.get('inline') in ('1', 'true'):
+        status = JobWorker(tasks.HANDLERS, worker_id=f"inline:{run_id[:8]}").drain(run_id)
+        status["outbox_drained"] = OutboxRelay(worker_id=f"inline:{run_id[:8]}").drain(timeout=60)
+        code = 500 if status["status"] == "partial_error" else 200
+        return jsonify(status), code
+
+    return jsonify({"status": "queued", "run_id": run_id, "jobs": job_count}), 202
+
+@bp.route('/runs', methods=['GET'])
+def get_run_history():
+    """
+    Recent finished runs with percentiles across them: run wall time, time
+    per stage, calls and latency per provider, SQL statements.
+    Usage: GET /api/cron/runs?key=<YOUR_SECRET_KEY>[&limit=50]
+    """
+    if not _is_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify(CronRunService.history(limit))
+
+@bp.route('/runs/<run_id>', methods=['GET'])
+def get_run_status(run_id):
+    """
+    Progress and summed results of one run, plus its telemetry once finished.
+    Usage: GET /api/cron/runs/<run_id>?key=<YOUR_SECRET_KEY>
+    """
+    if not _is_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
+
+    status = JobQueue.run_status(run_id)
+    if status is None:
+        return jsonify({"error": "Unknown run"}), 404
+    status["telemetry"] = CronRunService.get(run_id)
+    return jsonify(status)
+
+@bp.route('/stats', methods=['GET'])
+def get_stats():
+    """
+    Cache and coalescing counters for tuning TTLs against the provider rate budget.
+    Usage: GET /api/cron/stats?key=<YOUR_SECRET_KEY>
+    """
+    if not _is_authorized():
+        return jsonify({"error": "Unauthorized"}), 401
 
-    return jsonify({"status": "success", "results": results})
+    return jsonify({
+        "price_cache": PriceCache.get_stats(),
+        "coin_index": {"coins": CoinIndex.size()},
+        "single_flight": SingleFlight.get_stats(),
+        "cliq_dispatcher": NotificationDispatcher.get_stats(),
+        "outbox": Outbox.get_stats()
+    })
@@ -1,6 +1,10 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from app.models import User
 from app.services.coingecko_service import CoinGeckoService
+from app.services.price_history_service import PriceHistoryService
+from app.services.fx_service import FxService
+from config import Config
+import time
 
 bp = Blueprint('portfolio', __name__, url_prefix='/api/portfolio')
 
@@ -9,7 +13,11 @@ def get_portfolio_data(user_id):
     user = User.query.filter_by(cliq_user_id=user_id).first()
     
     if not user:
-        return jsonify({"total_value": 0, "holdings": []})
+        return jsonify({"total_value": 0, "holdings": [], "currency": Config.DEFAULT_CURRENCY})
+
+    # ?currency= overrides the user's preference; conversion is local (one cached FX rate)
+    requested = request.args.get('currency') or user.currency or Config.DEFAULT_CURRENCY
+    rate, currency = FxService.convert(1.0, requested)
 
     holdings_data = []
     total_value = 0
@@ -19,7 +27,7 @@ def get_portfolio_data(user_id):
         prices = CoinGeckoService.get_prices(coin_ids)
         
         for h in user.holdings:
-            price = prices.get(h.coin_id, {}).get('current_price', 0)
+            price = (prices.get(h.coin_id, {}).get('current_price') or 0) * rate
             value = h.amount * price
             total_value += value
             
@@ -33,5 +41,21 @@ def get_portfolio_data(user_id):
 
     return jsonify({
         "total_value": total_value,
+        "currency": currency,
         "holdings": holdings_data
     })
+
+@bp.route('/history/<coin_id>', methods=['GET'])
+def get_price_history(coin_id):
+    """
+    Stored price history for charts, newest last.
+    Usage: GET /api/portfolio/history/bitcoin?hours=24
+    """
+    hours = request.args.get('hours', 24, type=float)
+    end = int(time.time())
+    start = end - int(hours * 3600)
+
+    return jsonify({
+        "coin": coin_id,
+        "points": PriceHistoryService.get_range(coin_id.lower(), start, end)
+    })
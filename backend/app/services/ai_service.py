@@ -51,6 +51,7 @@ class AIService:
         - "portfolio": View portfolio. Args: "" (empty string).
         - "linkwallet": Link wallet. Args: "chain address" (e.g., "eth 0x123...").
         - "clear": Clear/reset data. Args: "".
+        - "currency": Set display currency. Args: currency code (e.g., "usd", "inr", "eur").
         - "help": User asks for help. Args: "".
         - "chat": General greeting/unclear. Args: A short, friendly reply text.
 
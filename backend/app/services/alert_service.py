@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import User, Holding, Alert, AlertState
+from app.services.news_service import NewsService
+from app.services.zoho_service import ZohoService
+from app.services.outbox_relay import Outbox
+from app.services.fx_service import FxService
+from app.utils import bulk_upsert
+from config import Config
+
+
+class AlertService:
+    """Fan-out of volatility alerts to every user holding the coin."""
+
+    @staticmethod
+    def holder_index(coin_ids):
+        """
+        {coin_id: [(user_id, channel_id, currency)]} for users with a channel,
+        built with one query. A user holding the coin on several chains is
+        listed once.
+        """
+        index = {}
+        if not coin_ids:
+            return index
+
+        rows = db.session.query(Holding.coin_id, User.id, User.default_channel_id, User.currency) \
+            .join(User, User.id == Holding.user_id) \
+            .filter(Holding.coin_id.in_(list(coin_ids)), User.default_channel_id.isnot(None)) \
+            .distinct().all()
+        for coin_id, user_id, channel_id, currency in rows:
+            index.setdefault(coin_id, []).append((user_id, channel_id, currency))
+        return index
+
+    @staticmethod
+    def load_alert_state(coin_ids):
+        """{(coin_id, user_id, alert_type): (last_fired_at, last_level)} in one query."""
+        if not coin_ids:
+            return {}
+        rows = db.session.query(AlertState.coin_id, AlertState.user_id, AlertState.alert_type,
+                                AlertState.last_fired_at, AlertState.last_level) \
+            .filter(AlertState.coin_id.in_(list(coin_ids))).all()
+        return {(c, u, t): (fired_at, level) for c, u, t, fired_at, level in rows}
+
+    @staticmethod
+    def in_cooldown(state, alert, now):
+        """
+        True if the same alert fired within ALERT_COOLDOWN_MINUTES, unless
+        the move has since grown by ALERT_ESCALATION_PCT in the same direction.
+        """
+        if state is None:
+            return False
+        fired_at, level = state
+        if now - fired_at >= timedelta(minutes=Config.ALERT_COOLDOWN_MINUTES):
+            return False
+        if level is None or (level > 0) != (alert['change'] > 0):
+            return True
+        return abs(alert['change']) - abs(level) < Config.ALERT_ESCALATION_PCT
+
+    @staticmethod
+    def news_symbol(coin_id, quote):
+        """CryptoPanic filters by ticker symbol (BTC), not by CoinGecko id (bitcoin)."""
+        return (quote.get('symbol') or coin_id).upper()
+
+    @staticmethod
+    def digest_key(user_id, channel_id, coin_alerts, state):
+        """
+        Outbox key of a digest: its alerts plus the cooldown state they were
+        checked against. Overlapping runs that both passed the cooldown check
+        produce the same key, and so a single message.
+        """
+        parts = []
+        for coin_id, alerts in coin_alerts:
+            for alert in alerts:
+                fired_at, _ = state.get((coin_id, user_id, alert['type']), (None, None))
+                parts.append(f"{coin_id}:{alert['type']}:{fired_at.isoformat() if fired_at else '-'}")
+        return Outbox.idempotency_key(user_id, channel_id, *sorted(parts))
+
+    @staticmethod
+    def notify_holders(coin_id, quote, volatility_alerts):
+        """Notify the holders of a single coin. See notify_many()."""
+        return AlertService.notify_many({coin_id: volatility_alerts}, {coin_id: quote})
+
+    @staticmethod
+    def notify_many(flagged, prices):
+        """
+        Save an Alert row per (holder, alert) for every flagged coin
+        ({coin_id: alerts}) and one Cliq digest per holder covering all of
+        their coins (see ZohoService.format_alert_digest) to the outbox, in
+        the caller's transaction; the relay delivers it after commit. Holders,
+        cooldown state and news headlines are loaded once for all coins;
+        alerts still in cooldown are skipped and the state of queued ones is
+        written back in bulk.
+        Returns the number of alerts queued.
+        """
+        sent = 0
+        now = datetime.utcnow()
+        holders = AlertService.holder_index(flagged)
+        state = AlertService.load_alert_state(holders)
+        fired, outbox = [], []
+
+        # Alerts out of cooldown, grouped per holder; news is only looked up for these coins
+        digests = {}
+        for coin_id, volatility_alerts in flagged.items():
+            for user_id, channel_id, currency in holders.get(coin_id, []):
+                due = [a for a in volatility_alerts
+                       if not AlertService.in_cooldown(state.get((coin_id, user_id, a['type'])), a, now)]
+                if due:
+                    digests.setdefault((user_id, channel_id, currency), []).append((coin_id, due))
+
+        # Headlines come from the shared news cache, one lookup for the whole batch
+        symbols = {coin_id: AlertService.news_symbol(coin_id, prices[coin_id])
+                   for coin_alerts in digests.values() for coin_id, _ in coin_alerts}
+        news = {}
+        try:
+            news = NewsService.get_news(set(symbols.values()))
+        except Exception as e:
+            print(f"News lookup failed: {e}")
+
+        for (user_id, channel_id, currency), coin_alerts in digests.items():
+            # Build the message first: a digest that can't be formatted leaves
+            # no Alert rows or cooldown behind, so it fires again next tick
+            try:
+                items = []
+                currency = currency or Config.DEFAULT_CURRENCY
+                for coin_id, due in coin_alerts:
+                    price, currency = FxService.convert(prices[coin_id]['current_price'], currency)
+                    items.append((coin_id, due, news.get(symbols[coin_id], []), price))
+                payload = ZohoService.format_alert_digest(items, currency)
+            except Exception as e:
+                print(f"Send Error: {e}")
+                continue
+
+            # Queue Message (delivered by the outbox relay after commit)
+            outbox.append({
+                'idempotency_key': AlertService.digest_key(user_id, channel_id, coin_alerts, state),
+                'channel_id': channel_id,
+                'payload': payload
+            })
+
+            for coin_id, due in coin_alerts:
+                # Save Alert
+                for alert in due:
+                    db.session.add(Alert(
+                        user_id=user_id,
+                        coin_id=coin_id,
+                        price_change_pct=alert['change'],
+                        alert_message=alert['message']
+                    ))
+                sent += len(due)
+                fired.extend({
+                    'coin_id': coin_id, 'user_id': user_id, 'alert_type': alert['type'],
+                    'last_fired_at': now, 'last_level': alert['change']
+                } for alert in due)
+
+        Outbox.add_many(outbox)
+        bulk_upsert(db.session, AlertState, fired, key_columns=['coin_id', 'user_id', 'alert_type'])
+        return sent
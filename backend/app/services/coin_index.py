@@ -0,0 +1,197 @@
+import bisect
+import difflib
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import has_app_context
+from app.extensions import db
+from config import Config
+
+
+class CoinIndex:
+    """
+    In-memory coin search index built from a CoinGecko /coins/list snapshot.
+
+    The snapshot lives in the `coins` table so every worker shares it; each
+    process loads it into dicts plus a sorted key list, which answers
+    exact-id, exact-symbol, exact-name and prefix lookups without a network
+    round trip. Ambiguous matches (many tokens share the "eth" symbol) are
+    resolved by market cap rank, like CoinGecko's own /search ordering.
+    """
+    _by_id = {}         # id -> (symbol, name, rank)
+    _by_symbol = {}     # symbol -> [ids]
+    _by_name = {}       # lowercased name -> [ids]
+    _keys = []          # sorted searchable strings (ids, symbols, names)
+    _key_ids = {}       # searchable string -> [ids]
+    _buckets = {}       # first character -> [keys], candidates for fuzzy matching
+    _aliases = {}       # query -> id learned from network /search fallbacks
+    _loaded_at = 0
+    _lock = threading.Lock()
+
+    PREFIX_MIN_LENGTH = 3
+    FUZZY_MIN_LENGTH = 4
+    FUZZY_CUTOFF = 0.85
+
+    @classmethod
+    def lookup(cls, query):
+        """
+        Resolve a user query ("btc", "Bitcoin", "solan") to a CoinGecko ID.
+        Returns None when the index has no confident match.
+        """
+        query = (query or '').lower().strip()
+        if not query:
+            return None
+
+        cls.load()
+
+        if query in cls._aliases:
+            return cls._aliases[query]
+
+        # 1. Exact id / symbol / name
+        exact = [(0, cid) for cid in ([query] if query in cls._by_id else [])]
+        exact += [(1, cid) for cid in cls._by_symbol.get(query, [])]
+        exact += [(2, cid) for cid in cls._by_name.get(query, [])]
+        if exact:
+            return cls._best(exact)
+
+        # 2. Prefix ("bitco" -> bitcoin)
+        if len(query) >= cls.PREFIX_MIN_LENGTH:
+            candidates = []
+            pos = bisect.bisect_left(cls._keys, query)
+            for key in cls._keys[pos:pos + 200]:
+                if not key.startswith(query):
+                    break
+                candidates += [(3, cid) for cid in cls._key_ids[key]]
+            if candidates:
+                return cls._best(candidates)
+
+        # 3. Fuzzy ("etherum" -> ethereum), limited to keys sharing the first letter
+        if len(query) >= cls.FUZZY_MIN_LENGTH:
+            keys = cls._buckets.get(query[0], [])
+            matches = difflib.get_close_matches(query, keys, n=3, cutoff=cls.FUZZY_CUTOFF)
+            candidates = [(4, cid) for key in matches for cid in cls._key_ids[key]]
+            if candidates:
+                return cls._best(candidates)
+
+        return None
+
+    @classmethod
+    def remember(cls, query, coin_id):
+        """Cache a network search result so the same miss is not repeated."""
+        query = (query or '').lower().strip()
+        if query and coin_id:
+            cls._aliases[query] = coin_id
+
+    @classmethod
+    def size(cls):
+        return len(cls._by_id)
+
+    @classmethod
+    def load(cls, force=False):
+        """(Re)load the snapshot from the DB when it is older than COIN_INDEX_RELOAD_SECONDS."""
+        if not force and time.time() - cls._loaded_at < Config.COIN_INDEX_RELOAD_SECONDS:
+            return
+        if not has_app_context():
+            return
+
+        with cls._lock:
+            if not force and time.time() - cls._loaded_at < Config.COIN_INDEX_RELOAD_SECONDS:
+                return
+
+            from app.models import Coin
+            try:
+                rows = db.session.query(Coin.id, Coin.symbol, Coin.name, Coin.market_cap_rank).all()
+            except Exception as e:
+                print(f"⚠️ Coin index load failed: {e}")
+                cls._loaded_at = time.time()
+                return
+
+            cls._build(rows)
+            cls._loaded_at = time.time()
+
+        if rows:
+            print(f"📇 Coin index loaded ({len(rows)} coins)")
+
+    @classmethod
+    def store(cls, coins, ranks):
+        """
+        Replace the snapshot with a fresh /coins/list payload.
+        `ranks` maps coin id -> market cap rank for the top coins.
+        """
+        from app.models import Coin
+        now = datetime.utcnow()
+
+        rows = []
+        for coin in coins:
+            coin_id = coin.get('id')
+            if not coin_id:
+                continue
+            rows.append({
+                'id': coin_id,
+                'symbol': (coin.get('symbol') or '').lower(),
+                'name': coin.get('name') or coin_id,
+                'market_cap_rank': ranks.get(coin_id),
+                'updated_at': now
+            })
+
+        if not rows:
+            return 0
+
+        db.session.execute(Coin.__table__.delete())
+        db.session.execute(Coin.__table__.insert(), rows)
+        db.session.commit()
+
+        with cls._lock:
+            cls._build([(r['id'], r['symbol'], r['name'], r['market_cap_rank']) for r in rows])
+            cls._loaded_at = time.time()
+            cls._aliases = {}
+
+        return len(rows)
+
+    @staticmethod
+    def is_refresh_due():
+        from app.models import Coin
+        last = db.session.query(db.func.max(Coin.updated_at)).scalar()
+        return last is None or datetime.utcnow() - last > timedelta(hours=Config.COIN_INDEX_REFRESH_HOURS)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._build([])
+            cls._aliases = {}
+            cls._loaded_at = 0
+
+    # --- Internals ---
+
+    @classmethod
+    def _build(cls, rows):
+        by_id, by_symbol, by_name, key_ids = {}, {}, {}, {}
+
+        for coin_id, symbol, name, rank in rows:
+            symbol = (symbol or '').lower()
+            name_key = (name or '').lower()
+            by_id[coin_id] = (symbol, name, rank)
+            by_symbol.setdefault(symbol, []).append(coin_id)
+            by_name.setdefault(name_key, []).append(coin_id)
+            for key in {coin_id, symbol, name_key}:
+                if key:
+                    key_ids.setdefault(key, []).append(coin_id)
+
+        buckets = {}
+        keys = sorted(key_ids)
+        for key in keys:
+            buckets.setdefault(key[0], []).append(key)
+
+        # Swap references in one go so concurrent lookups never see a half-built index
+        cls._by_id, cls._by_symbol, cls._by_name = by_id, by_symbol, by_name
+        cls._keys, cls._key_ids, cls._buckets = keys, key_ids, buckets
+
+    @classmethod
+    def _best(cls, candidates):
+        """Pick the best candidate: ranked coins first, then match kind, then shortest id."""
+        def score(item):
+            kind, coin_id = item
+            rank = cls._by_id.get(coin_id, (None, None, None))[2]
+            return (rank if rank is not None else float('inf'), kind, len(coin_id), coin_id)
+
+        return min(candidates, key=score)[1]
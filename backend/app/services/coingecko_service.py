@@ -1,105 +1,312 @@
-import requests
-import time
 import os
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+from app.services.http_client import HttpClient
+from app.services.price_cache import PriceCache
+from app.services.coin_index import CoinIndex
+from app.services.rate_limiter import RateLimiter, parse_retry_after
+from app.services.single_flight import coalesce
+from app.services.telemetry import Telemetry
 
 class CoinGeckoService:
     BASE_URL = "https://api.coingecko.com/api/v3"
+    PRO_BASE_URL = "https://pro-api.coingecko.com/api/v3"
+
+    # /coins/markets returns at most 250 rows per page
+    MAX_PER_PAGE = 250
+    # Status codes meaning "request too large": shrink the batch and retry
+    OVERSIZED_STATUSES = (400, 413, 414, 431)
+    MIN_SPLIT_SIZE = 10
+
+    # URL budget learned from oversized-request errors (None = use config)
+    _url_budget = None
+    _request_count = 0
+    _lock = threading.Lock()
 
     @staticmethod
     def _get_api_key():
         return os.environ.get('COINGECKO_API_KEY')
 
     @staticmethod
-    def get_prices(coin_ids):
+    def _base_url():
+        if Config.coingecko_plan() == 'pro':
+            return CoinGeckoService.PRO_BASE_URL
+        return CoinGeckoService.BASE_URL
+
+    @staticmethod
+    def _auth_params():
+        """API key query param for the configured plan (demo and pro keys use different names)."""
+        api_key = CoinGeckoService._get_api_key()
+        if not api_key:
+            return {}
+        if Config.coingecko_plan() == 'pro':
+            return {"x_cg_pro_api_key": api_key}
+        return {"x_cg_demo_api_key": api_key}
+
+    @staticmethod
+    def _count_request():
+        with CoinGeckoService._lock:
+            CoinGeckoService._request_count += 1
+
+    @staticmethod
+    def get_request_count():
+        """Total CoinGecko requests made by this process. Per-job counts are in the job's Telemetry."""
+        return CoinGeckoService._request_count
+
+    @staticmethod
+    def get_prices(coin_ids, use_cache=True):
         """
-        Fetch current prices for a list of coin IDs.
-        Handles large lists by batching. 
-        If Rate Limit (429) is hit, STOPS immediately and returns partial results.
+        Get current prices for a list of coin IDs.
+        Served from PriceCache when possible; pass use_cache=False to force a
+        live fetch (the result still refreshes the cache).
         """
         if not coin_ids:
             return {}
-            
+
         # Remove duplicates and ensure lowercase
         coin_ids = list(set([cid.lower() for cid in coin_ids]))
-        
-        # Batch size
-        BATCH_SIZE = 50 
+
+        if not use_cache:
+            result = CoinGeckoService._fetch_prices(coin_ids)
+            PriceCache.put_many(result, persist=False)
+            return result
+
+        return PriceCache.get_many(coin_ids, CoinGeckoService._fetch_prices)
+
+    @staticmethod
+    @coalesce('coingecko.prices')
+    def _fetch_prices(coin_ids):
+        """
+        Fetch current prices for a list of coin IDs from CoinGecko.
+        IDs are packed into as few requests as the URL budget allows; batches
+        run concurrently (up to COINGECKO_MAX_CONCURRENCY) and share the plan's
+        token bucket. A 429 pauses the bucket for Retry-After and requeues the
+        batch; an oversized-request error splits it and lowers the budget.
+        """
+        if not coin_ids:
+            return {}
+
         result = {}
-        
+        batches = CoinGeckoService._pack_batches(coin_ids)
+        workers = max(1, min(Config.COINGECKO_MAX_CONCURRENCY, len(batches)))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='coingecko') as pool:
+            pending = {Telemetry.submit(pool, CoinGeckoService._fetch_batch, batch): (batch, 0) for batch in batches}
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch, attempt = pending.pop(future)
+                    status, data = future.result()
+
+                    if status == 'retry':
+                        if attempt + 1 >= Config.COINGECKO_MAX_RETRIES:
+                            print(f"⚠️ Giving up on batch of {len(batch)} coins after {attempt + 1} rate-limited attempts.")
+                            continue
+                        pending[Telemetry.submit(pool, CoinGeckoService._fetch_batch, batch)] = (batch, attempt + 1)
+                    elif status == 'split':
+                        mid = len(batch) // 2
+                        for half in (batch[:mid], batch[mid:]):
+                            pending[Telemetry.submit(pool, CoinGeckoService._fetch_batch, half)] = (half, attempt)
+                    elif status == 'ok':
+                        result.update(data)
+
+        return result
+
+    @staticmethod
+    def _markets_params(batch):
+        params = {
+            # Prices are ingested in one base currency and converted locally (FxService)
+            "vs_currency": Config.PRICE_BASE_CURRENCY,
+            "ids": ",".join(batch),
+            "price_change_percentage": "1h,24h",
+            # Batches never exceed one page, so ask for exactly that many rows
+            "per_page": min(len(batch), CoinGeckoService.MAX_PER_PAGE) or 1,
+            "page": 1
+        }
+        params.update(CoinGeckoService._auth_params())
+        return params
+
+    @staticmethod
+    def _url_length_budget():
+        learned = CoinGeckoService._url_budget
+        return min(learned, Config.COINGECKO_MAX_URL_LENGTH) if learned else Config.COINGECKO_MAX_URL_LENGTH
+
+    @staticmethod
+    def _pack_batches(coin_ids):
+        """
+        Split IDs into the fewest /coins/markets requests whose URL fits the
+        length budget, with at most MAX_PER_PAGE IDs each.
+        """
+        url = f"{CoinGeckoService._base_url()}/coins/markets"
+        # +2 leaves room for a three-digit per_page value
+        base_len = len(HttpClient.prepare_url(url, CoinGeckoService._markets_params([]))) + 2
+        budget = CoinGeckoService._url_length_budget()
+
+        batches = []
+        batch, length = [], base_len
+        for coin_id in coin_ids:
+            # Each id costs its encoded length plus an encoded comma (%2C)
+            cost = len(quote(coin_id, safe='')) + 3
+            if batch and (length + cost > budget or len(batch) >= CoinGeckoService.MAX_PER_PAGE):
+                batches.append(batch)
+                batch, length = [], base_len
+            batch.append(coin_id)
+            length += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @staticmethod
+    def _shrink_url_budget(url_length):
+        """Remember that a URL this long was rejected, so later packs stay below it."""
+        with CoinGeckoService._lock:
+            new_budget = int(url_length * 0.75)
+            if not CoinGeckoService._url_budget or new_budget < CoinGeckoService._url_budget:
+                CoinGeckoService._url_budget = new_budget
+                print(f"📏 CoinGecko URL budget lowered to {new_budget} chars")
+
+    @staticmethod
+    def _fetch_batch(batch):
+        """
+        Fetch one batch of IDs from /coins/markets.
+        Returns ('ok', quotes), ('retry', None) on 429, ('split', None) when the
+        request was too large, or ('failed', None).
+        """
         # Headers to mimic a browser (helps with some WAFs)
         headers = {
             "User-Agent": "Mozilla/5.0"
         }
-        
-        # Process in chunks
-        for i in range(0, len(coin_ids), BATCH_SIZE):
-            batch = coin_ids[i : i + BATCH_SIZE]
-            ids_str = ",".join(batch)
-            
-            url = f"{CoinGeckoService.BASE_URL}/coins/markets"
-            params = {
-                "vs_currency": "inr",
-                "ids": ids_str,
-                "price_change_percentage": "1h,24h"
-            }
-            
-            # Add API Key if available
-            api_key = CoinGeckoService._get_api_key()
-            if api_key:
-                params["x_cg_demo_api_key"] = api_key
-            
-            try:
-                print(f"🔄 Fetching batch {i//BATCH_SIZE + 1} ({len(batch)} coins)...")
-                response = requests.get(url, params=params, headers=headers, timeout=10)
-                
-                # --- NEW LOGIC: Fail Gracefully on Rate Limit ---
-                if response.status_code == 429:
-                    print(f"⚠️ Rate limit hit. Stopping fetch. Returning {len(result)} coins found so far.")
-                    break # Stop fetching, return what we have immediately
-
-                if response.status_code != 200:
-                    print(f"⚠️ Failed batch: {response.status_code}")
-                    continue
-
-                data = response.json()
-                
-                for item in data:
-                    result[item['id']] = {
-                        'current_price': item.get('current_price', 0) or 0,
-                        'price_change_percentage_1h_in_currency': item.get('price_change_percentage_1h_in_currency', 0),
-                        'price_change_percentage_24h_in_currency': item.get('price_change_percentage_24h_in_currency', 0),
-                        'market_cap': item.get('market_cap', 0),
-                        'name': item.get('name', item['id']),
-                        'symbol': item.get('symbol', '').upper()
-                    }
-                    
-                # Be nice to the API
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"❌ Error fetching batch: {e}")
-                
-        return result
+
+        url = f"{CoinGeckoService._base_url()}/coins/markets"
+        params = CoinGeckoService._markets_params(batch)
+
+        bucket = RateLimiter.for_provider('coingecko')
+        bucket.acquire()
+
+        try:
+            print(f"🔄 Fetching batch ({len(batch)} coins)...")
+            CoinGeckoService._count_request()
+            response = HttpClient.get(url, params=params, headers=headers, timeout=10)
+
+            if response.status_code == 429:
+                delay = parse_retry_after(response.headers.get('Retry-After'), default=5.0)
+                print(f"⚠️ Rate limit hit. Backing off {delay:.1f}s and requeueing {len(batch)} coins.")
+                bucket.penalize(delay)
+                return 'retry', None
+
+            if response.status_code in CoinGeckoService.OVERSIZED_STATUSES and len(batch) > CoinGeckoService.MIN_SPLIT_SIZE:
+                print(f"⚠️ Batch of {len(batch)} coins rejected ({response.status_code}). Splitting.")
+                CoinGeckoService._shrink_url_budget(len(HttpClient.prepare_url(url, params)))
+                return 'split', None
+
+            if response.status_code != 200:
+                print(f"⚠️ Failed batch: {response.status_code}")
+                return 'failed', None
+
+            quotes = {}
+            for item in response.json():
+                quotes[item['id']] = {
+                    'current_price': item.get('current_price', 0) or 0,
+                    'price_change_percentage_1h_in_currency': item.get('price_change_percentage_1h_in_currency', 0),
+                    'price_change_percentage_24h_in_currency': item.get('price_change_percentage_24h_in_currency', 0),
+                    'market_cap': item.get('market_cap', 0),
+                    'name': item.get('name', item['id']),
+                    'symbol': item.get('symbol', '').upper()
+                }
+            return 'ok', quotes
+
+        except Exception as e:
+            print(f"❌ Error fetching batch: {e}")
+            return 'failed', None
 
     @staticmethod
     def search_coin(query):
         """
         Search for a coin ID by name or symbol.
+        Answered from the local CoinIndex; only goes to /search on an index miss.
         """
-        url = f"{CoinGeckoService.BASE_URL}/search"
+        found_id = CoinIndex.lookup(query)
+        if found_id:
+            return found_id
+
+        return CoinGeckoService._search_remote(query)
+
+    @staticmethod
+    @coalesce('coingecko.search')
+    def _search_remote(query):
+        url = f"{CoinGeckoService._base_url()}/search"
         params = {"query": query}
         
         # Add API Key if available
-        api_key = CoinGeckoService._get_api_key()
-        if api_key:
-            params["x_cg_demo_api_key"] = api_key
+        params.update(CoinGeckoService._auth_params())
         
         try:
-            response = requests.get(url, params=params, timeout=5)
+            RateLimiter.for_provider('coingecko').acquire()
+            CoinGeckoService._count_request()
+            response = HttpClient.get(url, params=params, timeout=5)
             data = response.json()
             if "coins" in data and len(data["coins"]) > 0:
-                return data["coins"][0]["id"]
+                found_id = data["coins"][0]["id"]
+                CoinIndex.remember(query, found_id)
+                return found_id
         except Exception as e:
             print(f"Search error: {e}")
         
-        return None
\ No newline at end of file
+        return None
+
+    @staticmethod
+    def fetch_exchange_rates():
+        """
+        BTC-denominated exchange rates for every currency CoinGecko supports,
+        as {currency_code: {'value': units per 1 BTC, 'type': 'fiat' | 'crypto'
+        | 'commodity'}}. One request covers all currencies.
+        """
+        bucket = RateLimiter.for_provider('coingecko')
+        bucket.acquire()
+        CoinGeckoService._count_request()
+        response = HttpClient.get(f"{CoinGeckoService._base_url()}/exchange_rates",
+                                  params=CoinGeckoService._auth_params(), timeout=10)
+        response.raise_for_status()
+
+        rates = response.json().get('rates', {})
+        return {code.lower(): {'value': float(r['value']), 'type': r.get('type')}
+                for code, r in rates.items() if r.get('value')}
+
+    @staticmethod
+    def refresh_coin_index(rank_pages=2):
+        """
+        Rebuild the local CoinIndex from a bulk /coins/list snapshot.
+        The first `rank_pages` pages of /coins/markets (250 coins each) supply
+        market cap ranks used to disambiguate shared symbols.
+        """
+        params = CoinGeckoService._auth_params()
+        bucket = RateLimiter.for_provider('coingecko')
+
+        bucket.acquire()
+        CoinGeckoService._count_request()
+        response = HttpClient.get(f"{CoinGeckoService._base_url()}/coins/list", params=params, timeout=30)
+        response.raise_for_status()
+        coins = response.json()
+
+        ranks = {}
+        for page in range(1, rank_pages + 1):
+            page_params = dict(params, vs_currency="usd", order="market_cap_desc", per_page=250, page=page)
+            try:
+                bucket.acquire()
+                CoinGeckoService._count_request()
+                resp = HttpClient.get(f"{CoinGeckoService._base_url()}/coins/markets", params=page_params, timeout=15)
+                if resp.status_code != 200:
+                    break
+                for item in resp.json():
+                    if item.get('market_cap_rank'):
+                        ranks[item['id']] = item['market_cap_rank']
+            except Exception as e:
+                print(f"⚠️ Failed to fetch market cap ranks: {e}")
+                break
+
+        count = CoinIndex.store(coins, ranks)
+        print(f"📇 Coin index refreshed: {count} coins, {len(ranks)} ranked")
+        return count
\ No newline at end of file
@@ -0,0 +1,133 @@
+from app.extensions import db
+from app.models import CronRun, Job
+from app.services.telemetry import Telemetry
+from app.utils import bulk_upsert, percentile, sum_numeric
+
+
+class CronRunService:
+    """
+    Persisted run history. When the last job of a run finishes, the
+    telemetry of all its jobs (handler wall time, HTTP calls and latency per
+    provider, SQL statements) and their summed results are rolled up into one
+    cron_runs row; history() reports percentiles over recent runs.
+    """
+
+    @staticmethod
+    def record(run_id):
+        """Write the cron_runs row for `run_id` if none of its jobs is pending or running. Commits."""
+        unfinished = db.session.query(
+            Job.query.filter(Job.run_id == run_id, Job.status.in_(['pending', 'running'])).exists()
+        ).scalar()
+        jobs = [] if unfinished else Job.query.filter(Job.run_id == run_id).all()
+        if not jobs:
+            return None
+
+        stages = {}
+        for job in jobs:
+            busy_ms = (job.telemetry or {}).get('wall_ms', 0.0)
+            stage = stages.setdefault(job.kind, {'jobs': 0, 'failed': 0, 'busy_ms': 0.0, 'max_ms': 0.0})
+            stage['jobs'] += 1
+            stage['failed'] += int(job.status == 'failed')
+            stage['busy_ms'] = round(stage['busy_ms'] + busy_ms, 2)
+            stage['max_ms'] = max(stage['max_ms'], busy_ms)
+
+        merged = Telemetry.merge(job.telemetry for job in jobs)
+        providers = {
+            provider: {**stats,
+                       'p50_ms': Telemetry.latency_percentile(stats, 0.5),
+                       'p95_ms': Telemetry.latency_percentile(stats, 0.95)}
+            for provider, stats in merged['http'].items()
+        }
+
+        started_at = min(job.created_at for job in jobs)
+        finished_at = max(job.finished_at or job.created_at for job in jobs)
+        failed = [job for job in jobs if job.status == 'failed']
+        row = {
+            'run_id': run_id,
+            'status': 'partial_error' if failed else 'success',
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'wall_ms': round((finished_at - started_at).total_seconds() * 1000, 2),
+            'busy_ms': round(sum(stage['busy_ms'] for stage in stages.values()), 2),
+            'jobs': len(jobs),
+            'stages': stages,
+            'providers': providers,
+            'db_stats': merged['db'],
+            'items': sum_numeric(job.result for job in jobs if job.status == 'done'),
+            'errors': [f"{job.kind} #{job.id}: {job.last_error}" for job in failed] or None
+        }
+        bulk_upsert(db.session, CronRun, [row], key_columns=['run_id'])
+        db.session.commit()
+        return row
+
+    @staticmethod
+    def get(run_id):
+        run = db.session.get(CronRun, run_id)
+        return CronRunService._to_dict(run) if run else None
+
+    @staticmethod
+    def history(limit=50):
+        """
+        The last `limit` runs plus p50/p95/max across them of run wall and
+        busy time, SQL statements, busy time per stage and calls per
+        provider. Provider latency percentiles are pooled over every call of
+        those runs.
+        """
+        runs = CronRun.query.order_by(CronRun.started_at.desc()).limit(limit).all()
+
+        def spread(values):
+            values = [v for v in values if v is not None]
+            return {'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95),
+                    'max': max(values) if values else None}
+
+        stage_names = sorted({name for run in runs for name in run.stages})
+        merged = Telemetry.merge({'http': run.providers} for run in runs)
+
+        return {
+            'runs': [CronRunService._to_dict(run, detail=False) for run in runs],
+            'percentiles': {
+                'wall_ms': spread([run.wall_ms for run in runs]),
+                'busy_ms': spread([run.busy_ms for run in runs]),
+                'db_statements': spread([run.db_stats.get('statements') for run in runs]),
+                'stages_busy_ms': {
+                    name: spread([run.stages[name]['busy_ms'] for run in runs if name in run.stages])
+                    for name in stage_names
+                },
+                'providers': {
+                    provider: {
+                        'calls': spread([run.providers.get(provider, {}).get('calls', 0) for run in runs]),
+                        'error_rate': round(stats['errors'] / stats['calls'], 4) if stats['calls'] else None,
+                        'latency_p50_ms': Telemetry.latency_percentile(stats, 0.5),
+                        'latency_p95_ms': Telemetry.latency_percentile(stats, 0.95),
+                        'latency_max_ms': stats['max_ms']
+                    }
+                    for provider, stats in merged['http'].items()
+                }
+            },
+            'failed_runs': sum(run.status != 'success' for run in runs)
+        }
+
+    @staticmethod
+    def _to_dict(run, detail=True):
+        data = {
+            'run_id': run.run_id,
+            'status': run.status,
+            'started_at': run.started_at.isoformat(),
+            'finished_at': run.finished_at.isoformat(),
+            'wall_ms': run.wall_ms,
+            'busy_ms': run.busy_ms,
+            'jobs': run.jobs,
+            'stages': {name: stage['busy_ms'] for name, stage in run.stages.items()},
+            'db': run.db_stats,
+            'items': run.items,
+            'errors': run.errors or []
+        }
+        if detail:
+            data['stages'] = run.stages
+            data['providers'] = {
+                provider: {k: v for k, v in stats.items() if k != 'buckets'}
+                for provider, stats in run.providers.items()
+            }
+        else:
+            data['provider_calls'] = {provider: stats['calls'] for provider, stats in run.providers.items()}
+        return data
@@ -0,0 +1,77 @@
+import threading
+import time
+from app.services.coingecko_service import CoinGeckoService
+from config import Config
+
+
+class FxService:
+    """
+    Local currency conversion for prices ingested in PRICE_BASE_CURRENCY.
+
+    Holds one rate vector (units per BTC for every supported currency) fetched
+    from CoinGecko /exchange_rates every FX_REFRESH_SECONDS, so valuing in any
+    number of currencies costs no extra provider calls. If a refresh fails the
+    last known rates keep being used. Only fiat currencies can be chosen as a
+    display currency: CoinGecko also lists units like sats or ETH, which are
+    not ISO 4217 codes and can't be formatted as money.
+    """
+    _rates = {}
+    _fiat = set()
+    _fetched_at = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_rates(cls):
+        if time.time() - cls._fetched_at >= Config.FX_REFRESH_SECONDS:
+            with cls._lock:
+                if time.time() - cls._fetched_at >= Config.FX_REFRESH_SECONDS:
+                    cls._refresh()
+        return cls._rates
+
+    @classmethod
+    def rate(cls, currency):
+        """Multiplier from the base currency to `currency`, or None if unknown."""
+        currency = (currency or Config.PRICE_BASE_CURRENCY).lower()
+        if currency == Config.PRICE_BASE_CURRENCY:
+            return 1.0
+
+        rates = cls.get_rates()
+        base = rates.get(Config.PRICE_BASE_CURRENCY)
+        target = rates.get(currency)
+        if not base or not target:
+            return None
+        return target / base
+
+    @classmethod
+    def convert(cls, amount, currency):
+        """
+        Convert a base-currency amount. Returns (value, currency actually used);
+        falls back to the base currency when no rate is available.
+        """
+        currency = (currency or Config.DEFAULT_CURRENCY).lower()
+        rate = cls.rate(currency)
+        if rate is None:
+            return amount, Config.PRICE_BASE_CURRENCY
+        return amount * rate, currency
+
+    @classmethod
+    def is_supported(cls, currency):
+        """True for fiat currencies with a known rate (and the base currency)."""
+        currency = (currency or '').lower()
+        if currency == Config.PRICE_BASE_CURRENCY:
+            return True
+        cls.get_rates()
+        return currency in cls._fiat
+
+    @classmethod
+    def _refresh(cls):
+        try:
+            rates = CoinGeckoService.fetch_exchange_rates()
+            if rates:
+                cls._rates = {code: r['value'] for code, r in rates.items()}
+                cls._fiat = {code for code, r in rates.items() if r['type'] == 'fiat'}
+                print(f"💱 FX rates refreshed ({len(rates)} currencies)")
+        except Exception as e:
+            print(f"⚠️ FX rate refresh failed, keeping {len(cls._rates)} cached rates: {e}")
+        # Back off for a full interval either way so failures don't hit the API per request
+        cls._fetched_at = time.time()
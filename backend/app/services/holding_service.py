@@ -0,0 +1,57 @@
+from app.extensions import db
+from app.models import Holding, Wallet
+from app.utils import bulk_upsert
+
+
+class HoldingService:
+    @staticmethod
+    def replace_wallet_holdings(user_id, chain, holdings_data, prune=True):
+        """
+        Write a wallet's full token set for (user_id, chain) in one upsert.
+
+        Tokens mapping to the same coin (e.g. native ETH and WETH) are summed.
+        With `prune`, holdings on this chain missing from the set (balance
+        dropped to zero) are deleted. Pruning is skipped on an empty result,
+        since providers report failures as no balances. Caller owns the
+        transaction. Returns (rows upserted, rows removed, changed).
+        """
+        amounts = {}
+        for item in holdings_data:
+            amounts[item['coin_id']] = amounts.get(item['coin_id'], 0.0) + item['amount']
+
+        existing = dict(
+            db.session.query(Holding.coin_id, Holding.amount)
+            .filter(Holding.user_id == user_id, Holding.chain == chain)
+        )
+        changed = any(
+            coin_id not in existing or abs(existing[coin_id] - amount) > 1e-9 * max(1.0, abs(amount))
+            for coin_id, amount in amounts.items()
+        )
+
+        upserted = bulk_upsert(db.session, Holding, [
+            {'user_id': user_id, 'coin_id': coin_id, 'chain': chain, 'amount': amount}
+            for coin_id, amount in amounts.items()
+        ], key_columns=['user_id', 'coin_id', 'chain'])
+
+        removed = 0
+        stale = [coin_id for coin_id in existing if coin_id not in amounts]
+        if prune and amounts and stale:
+            removed = Holding.query.filter(
+                Holding.user_id == user_id, Holding.chain == chain, Holding.coin_id.in_(stale)
+            ).delete(synchronize_session=False)
+            changed = True
+
+        return upserted, removed, changed
+
+    @staticmethod
+    def single_wallet_chains(user_ids):
+        """
+        {(user_id, chain)} pairs backed by exactly one wallet. Holdings are
+        stored per user and chain, so only those can be pruned safely from a
+        single wallet's token set.
+        """
+        rows = db.session.query(Wallet.user_id, Wallet.chain) \
+            .filter(Wallet.user_id.in_(user_ids)) \
+            .group_by(Wallet.user_id, Wallet.chain) \
+            .having(db.func.count(Wallet.id) == 1).all()
+        return {(user_id, chain) for user_id, chain in rows}
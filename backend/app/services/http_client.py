@@ -0,0 +1,83 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.services.telemetry import Telemetry
+from config import Config
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP client for all provider services.
+
+    One requests.Session per process, so connections are kept alive and reused
+    (urllib3 keeps a separate pool per host). Every call gets default
+    connect/read timeouts, and idempotent requests are retried on connection
+    errors and 5xx responses. 429s are left to the callers, which back off
+    through their rate limiters.
+    """
+    _session = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def session(cls):
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    cls._session = cls._build_session()
+        return cls._session
+
+    @classmethod
+    def request(cls, method, url, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = cls.session().request(method, url, timeout=timeout, **kwargs)
+            ok = response.status_code < 400
+            return response
+        finally:
+            # Per-provider call counts and latency for the running job, if any
+            Telemetry.record_http(url, (time.perf_counter() - start) * 1000, ok)
+
+    @classmethod
+    def get(cls, url, **kwargs):
+        return cls.request('GET', url, **kwargs)
+
+    @classmethod
+    def post(cls, url, **kwargs):
+        return cls.request('POST', url, **kwargs)
+
+    @staticmethod
+    def prepare_url(url, params=None):
+        """The final URL (with encoded query string) a GET would send."""
+        return requests.Request('GET', url, params=params).prepare().url
+
+    @classmethod
+    def close(cls):
+        with cls._lock:
+            if cls._session is not None:
+                cls._session.close()
+                cls._session = None
+
+    @staticmethod
+    def _build_session():
+        retry = Retry(
+            total=Config.HTTP_MAX_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),  # never replay POSTs
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=Config.HTTP_POOL_HOSTS,
+            pool_maxsize=Config.HTTP_POOL_SIZE,
+            max_retries=retry
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
@@ -0,0 +1,222 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from sqlalchemy import and_, func, or_, select, update
+from app.extensions import db
+from app.models import Job
+from app.services.cron_run_service import CronRunService
+from app.services.telemetry import Telemetry
+from app.utils import sum_numeric
+from config import Config
+
+
+class JobQueue:
+    """
+    DB-backed job queue with lease ("visibility timeout") semantics.
+
+    A worker claims a due job by moving it to `running` with `locked_until`
+    set JOB_LEASE_SECONDS ahead. If the worker dies the lease expires and the
+    job is claimable again. Failed jobs are retried with exponential backoff
+    until `max_attempts`, then left in `failed` for inspection.
+
+    Claims are a conditional UPDATE, so two workers can never own the same
+    job. On Postgres the candidate row is picked with FOR UPDATE SKIP LOCKED
+    so concurrent workers don't queue up behind each other.
+    """
+
+    @staticmethod
+    def enqueue(kind, payload=None, run_id=None, max_attempts=None, delay=0):
+        """Add a job to the session; the caller commits."""
+        job = Job(
+            kind=kind,
+            payload=payload,
+            run_id=run_id,
+            status='pending',
+            attempts=0,
+            max_attempts=max_attempts or Config.JOB_MAX_ATTEMPTS,
+            run_after=datetime.utcnow() + timedelta(seconds=delay)
+        )
+        db.session.add(job)
+        return job
+
+    @staticmethod
+    def claim(worker_id, kinds=None, run_id=None):
+        """Lease the next due job to `worker_id`. Returns the Job or None."""
+        for _ in range(5):
+            now = datetime.utcnow()
+            claimable = or_(
+                and_(Job.status == 'pending', Job.run_after <= now),
+                and_(Job.status == 'running', Job.locked_until < now)
+            )
+            filters = [claimable]
+            if kinds:
+                filters.append(Job.kind.in_(kinds))
+            if run_id:
+                filters.append(Job.run_id == run_id)
+
+            query = select(Job.id).where(*filters).order_by(Job.run_after, Job.id).limit(1)
+            if db.engine.dialect.name == 'postgresql':
+                query = query.with_for_update(skip_locked=True)
+
+            job_id = db.session.execute(query).scalar()
+            if job_id is None:
+                db.session.commit()
+                return None
+
+            claimed = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, claimable)
+                .values(status='running', locked_by=worker_id, started_at=now,
+                        locked_until=now + timedelta(seconds=Config.JOB_LEASE_SECONDS),
+                        attempts=Job.attempts + 1)
+            ).rowcount
+            db.session.commit()
+
+            if claimed:
+                job = db.session.get(Job, job_id)
+                db.session.refresh(job)
+                if job.attempts > job.max_attempts:
+                    # Lease kept expiring (worker crashing on this job)
+                    JobQueue.fail(job, "Lease expired too many times")
+                    continue
+                return job
+            # Another worker won the race for this row; try the next one
+        return None
+
+    @staticmethod
+    def complete(job, result=None, telemetry=None):
+        """
+        Mark done. Commits together with whatever the handler wrote; the
+        last job of a run records the run's telemetry (CronRunService).
+        """
+        job.status = 'done'
+        job.result = result
+        job.telemetry = telemetry
+        job.locked_until = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        JobQueue._finish_run(job.run_id)
+
+    @staticmethod
+    def fail(job, error, telemetry=None):
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        job.last_error = str(error)[:2000]
+        job.telemetry = telemetry
+        job.locked_until = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = 'pending'
+            backoff = Config.JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            job.run_after = datetime.utcnow() + timedelta(seconds=backoff)
+        db.session.commit()
+        if job.status == 'failed':
+            JobQueue._finish_run(job.run_id)
+
+    @staticmethod
+    def _finish_run(run_id):
+        if not run_id:
+            return
+        try:
+            CronRunService.record(run_id)
+        except Exception as e:
+            # Telemetry must never fail the job that triggered it
+            db.session.rollback()
+            print(f"⚠️ Failed to record telemetry for run {run_id}: {e}")
+
+    @staticmethod
+    def run_status(run_id):
+        """
+        Progress of one run: job counts per kind and status, the summed
+        numeric results of finished jobs, and errors of failed ones.
+        """
+        rows = db.session.query(Job.kind, Job.status, func.count(Job.id)) \
+            .filter(Job.run_id == run_id).group_by(Job.kind, Job.status).all()
+        if not rows:
+            return None
+
+        jobs = {}
+        for kind, status, count in rows:
+            jobs.setdefault(kind, {})[status] = count
+
+        results = sum_numeric(
+            result for (result,) in db.session.query(Job.result).filter(Job.run_id == run_id, Job.status == 'done')
+        )
+
+        failed = Job.query.filter_by(run_id=run_id, status='failed').all()
+        statuses = {status for _, status, _ in rows}
+        if statuses & {'pending', 'running'}:
+            state = 'running'
+        else:
+            state = 'partial_error' if failed else 'success'
+
+        return {
+            "run_id": run_id,
+            "status": state,
+            "jobs": jobs,
+            "results": results,
+            "errors": [f"{j.kind} #{j.id}: {j.last_error}" for j in failed]
+        }
+
+
+class JobWorker:
+    """
+    Claims and runs jobs until stopped. `handlers` maps job kind to a
+    callable(payload, job) returning a JSON-serialisable result. Handlers may
+    enqueue follow-up jobs; those commit together with the job's completion.
+    Must run inside an app context.
+    """
+
+    def __init__(self, handlers, worker_id=None, kinds=None):
+        self.handlers = handlers
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.kinds = kinds or list(handlers)
+        self._stop = threading.Event()
+
+    def run(self):
+        print(f"👷 Worker {self.worker_id} started ({', '.join(self.kinds)})")
+        while not self._stop.is_set():
+            try:
+                worked = self.run_one()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Worker loop error: {e}")
+                worked = False
+            if not worked:
+                self._stop.wait(Config.JOB_POLL_SECONDS)
+
+    def stop(self):
+        self._stop.set()
+
+    def run_one(self, run_id=None):
+        """Claim and execute a single job. Returns False when nothing was due."""
+        job = JobQueue.claim(self.worker_id, self.kinds, run_id=run_id)
+        if job is None:
+            return False
+
+        start = time.perf_counter()
+        try:
+            # HTTP calls and SQL statements of the handler are counted into the job's telemetry
+            with Telemetry.collect() as telemetry:
+                result = self.handlers[job.kind](job.payload or {}, job)
+            JobQueue.complete(job, result, self._snapshot(telemetry, start))
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Job {job.kind} #{job.id} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+            traceback.print_exc()
+            JobQueue.fail(job, e, self._snapshot(telemetry, start))
+        return True
+
+    @staticmethod
+    def _snapshot(telemetry, start):
+        return {'wall_ms': round((time.perf_counter() - start) * 1000, 2), **telemetry.to_dict()}
+
+    def drain(self, run_id):
+        """Run jobs of `run_id` in this process until none are due."""
+        while self.run_one(run_id=run_id):
+            pass
+        return JobQueue.run_status(run_id)
@@ -1,65 +1,189 @@
-import requests
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from config import Config
+from app.extensions import db
+from app.models import NewsCache
+from app.services.http_client import HttpClient
+from app.services.single_flight import coalesce
+from app.utils import bulk_upsert
 
 class NewsService:
+    """
+    CryptoPanic headlines per currency symbol, read through the news_cache
+    table. A symbol is fetched at most once per NEWS_CACHE_TTL across all
+    workers; empty results and failed fetches are cached too, so a quiet or
+    unreachable API isn't hit again on every alert.
+    """
+
     @staticmethod
     def search_news(query):
+        """Cached headlines for one symbol (e.g. "BTC"). Caller commits."""
+        symbol = (query or '').upper().strip()
+        if not symbol:
+            return []
+        return NewsService.get_news([symbol]).get(symbol, [])
+
+    @staticmethod
+    def get_news(symbols, session=None):
         """
-        Search for crypto news using CryptoPanic API.
+        {SYMBOL: headlines} for `symbols`, loaded with one query. Missing or
+        expired symbols are fetched together (see fetch_news_batch) and
+        written back with one upsert through
+        `session` (default db.session); the caller owns the transaction.
+        """
+        if not Config.NEWS_API_KEY:
+            return {}
+        session = session if session is not None else db.session
+        symbols = {s.upper() for s in symbols if s}
+        if not symbols:
+            return {}
+
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=Config.NEWS_CACHE_TTL)
+        rows = session.query(NewsCache.symbol, NewsCache.items, NewsCache.fetched_at) \
+            .filter(NewsCache.symbol.in_(symbols)).all()
+
+        news, stale = {}, {}
+        for symbol, items, fetched_at in rows:
+            news[symbol] = items
+            if fetched_at < cutoff:
+                stale[symbol] = items
+
+        refreshed = []
+        due = sorted(symbols - set(news) | set(stale))
+        fetched = NewsService.fetch_news_batch(due) if due else {}
+        for symbol in due:
+            items = fetched.get(symbol)
+            if items is None:
+                # Keep serving what we had until the next TTL window
+                items = stale.get(symbol, [])
+            news[symbol] = items
+            refreshed.append({'symbol': symbol, 'items': items, 'fetched_at': now})
+
+        bulk_upsert(session, NewsCache, refreshed, key_columns=['symbol'])
+        return news
+
+    @staticmethod
+    def fetch_news_batch(symbols):
+        """
+        Uncached CryptoPanic search for many symbols. The `currencies` filter
+        takes a comma-separated list, so symbols are queried NEWS_BATCH_SIZE
+        at a time and each post is filed under the requested currencies it is
+        tagged with. Returns {SYMBOL: headlines}; symbols whose request failed
+        map to None.
+        """
+        symbols = sorted({s.upper() for s in symbols if s})
+        size = max(1, Config.NEWS_BATCH_SIZE)
+        news = {}
+        for i in range(0, len(symbols), size):
+            news.update(NewsService._fetch_chunk(symbols[i:i + size]))
+        return news
+
+    @staticmethod
+    @coalesce('news.search')
+    def _fetch_chunk(symbols):
+        """
+        One currencies=A,B,C query. Busy coins crowd out quiet ones on a
+        single page, so `next` pages are followed (up to NEWS_BATCH_MAX_PAGES)
+        while a symbol still has room on its card.
         """
         api_key = Config.NEWS_API_KEY
         if not api_key:
-            return []
+            return {s: [] for s in symbols}
+
+        print(f"🌍 Fetching news for: {','.join(symbols)}...")
 
-        print(f"🌍 Fetching news for: {query}...")
-        
         url = "https://cryptopanic.com/api/v1/posts/"
         params = {
             "auth_token": api_key,
-            "currencies": query,  # Expects SYMBOL (e.g. "BTC")
+            "currencies": ",".join(symbols),  # Expects SYMBOLS (e.g. "BTC,ETH")
             "kind": "news",
             "public": "true"
             # REMOVED: "filter": "important" to allow more results
         }
 
+        posts = []
         try:
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            if "results" not in data:
-                return []
-                
-            news_items = []
-            # Increased limit to 7 to fill the card
-            for post in data["results"][:7]:
-                # Clean Title
-                raw_title = post.get("title", "No Title")
-                clean_title = " ".join(raw_title.split())
-
-                # Build URL
-                post_url = post.get("url")
-                if not post_url and "id" in post:
-                    slug = post.get("slug", "news")
-                    post_url = f"https://cryptopanic.com/news/{post['id']}/{slug}/"
-                
-                # Get Source Domain
-                source = post.get("domain", "CryptoPanic")
-                if isinstance(source, dict):
-                    source = source.get("domain", "CryptoPanic")
-
-                news_items.append({
-                    "title": clean_title,
-                    "url": post_url or "https://cryptopanic.com",
-                    "source": source,
-                    "published_at": post.get("published_at", "")
-                })
-                
-            return news_items
+            for _ in range(max(1, Config.NEWS_BATCH_MAX_PAGES)):
+                response = HttpClient.get(url, params=params, timeout=10)
+                data = response.json() if response.status_code == 200 else None
+                # Rate limits and bad tokens come back as {"status": "api_error", ...}
+                if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+                    raise ValueError(f"unexpected response (HTTP {response.status_code})")
+                posts.extend(data["results"])
 
+                news = NewsService._split_posts(posts, symbols)
+                url, params = data.get("next"), None  # `next` carries the query string
+                if not url or all(len(items) >= Config.NEWS_MAX_ITEMS for items in news.values()):
+                    break
         except Exception as e:
             print(f"❌ Failed to fetch news: {e}")
-            return []
+            if not posts:
+                return {s: None for s in symbols}
+
+        return NewsService._split_posts(posts, symbols)
+
+    @staticmethod
+    def _split_posts(posts, symbols):
+        """
+        {SYMBOL: headlines} from a multi-currency result page: a post goes to
+        each requested currency it is tagged with, keeping the first post per
+        URL and at most NEWS_MAX_ITEMS per symbol.
+        """
+        news = {s: [] for s in symbols}
+        seen = {s: set() for s in symbols}
+        for post in posts:
+            tagged = {(c.get("code") or "").upper() for c in post.get("currencies") or []}
+            targets = [s for s in symbols if s in tagged]
+            if not targets and len(symbols) == 1:
+                targets = symbols  # Untagged post in a single-currency query
+            if not targets:
+                continue
+
+            item = NewsService._to_item(post)
+            key = NewsService._url_key(item["url"])
+            for symbol in targets:
+                # The same story is often posted more than once
+                if key in seen[symbol] or len(news[symbol]) >= Config.NEWS_MAX_ITEMS:
+                    continue
+                seen[symbol].add(key)
+                news[symbol].append(item)
+        return news
+
+    @staticmethod
+    def _to_item(post):
+        # Clean Title
+        raw_title = post.get("title", "No Title")
+        clean_title = " ".join(raw_title.split())
+
+        # Build URL
+        post_url = post.get("url")
+        if not post_url and "id" in post:
+            slug = post.get("slug", "news")
+            post_url = f"https://cryptopanic.com/news/{post['id']}/{slug}/"
+
+        # Get Source Domain
+        source = post.get("domain", "CryptoPanic")
+        if isinstance(source, dict):
+            source = source.get("domain", "CryptoPanic")
+
+        return {
+            "title": clean_title,
+            "url": post_url or "https://cryptopanic.com",
+            "source": source,
+            "published_at": post.get("published_at", "")
+        }
+
+    @staticmethod
+    def _url_key(url):
+        """Compare URLs without scheme, www., tracking parameters, fragment or trailing slash."""
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith('utm_')])
+        return urlunsplit(('', host, parts.path.rstrip('/'), query, ''))
 
     @staticmethod
     def get_reasons_for_movement(symbol, change_pct):
-        return NewsService.search_news(symbol)
\ No newline at end of file
+        return NewsService.search_news(symbol)
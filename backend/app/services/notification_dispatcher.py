@@ -0,0 +1,224 @@
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from app.services.rate_limiter import RateLimiter, parse_retry_after
+from app.services.zoho_service import ZohoService
+from config import Config
+
+
+class _Message:
+    __slots__ = ('channel_id', 'payload', 'on_done', 'enqueued_at', 'attempts', 'last_error', 'permanent')
+
+    def __init__(self, channel_id, payload, on_done=None):
+        self.channel_id = channel_id
+        self.payload = payload
+        self.on_done = on_done
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+        self.last_error = None
+        self.permanent = False  # Rejected with a 4xx: resending won't help
+
+
+class NotificationDispatcher:
+    """
+    In-process asynchronous sender for Cliq messages.
+
+    submit() only queues; CLIQ_DISPATCH_WORKERS lane threads do the posting.
+    A channel is hashed to a fixed lane, so its messages are delivered in
+    submission order while different channels proceed in parallel. All lanes
+    share the 'cliq' token bucket; a 429 pauses the bucket for Retry-After
+    and the message is retried. Timeouts, connection errors and 5xx responses
+    are retried with exponential backoff up to CLIQ_MAX_ATTEMPTS. Other 4xx
+    responses, and messages out of attempts, go to the dead-letter list.
+
+    Messages still queued when the process exits are lost; alerts therefore
+    reach the dispatcher through the outbox relay (see OutboxRelay), which
+    learns each message's fate from the `on_done` callback.
+    """
+    _lanes = []
+    _threads = []
+    _lock = threading.Lock()
+    _stop = threading.Event()
+    _dead_letters = deque(maxlen=1000)
+    _latencies_ms = deque(maxlen=5000)
+    _stats = {'submitted': 0, 'sent': 0, 'retried': 0, 'rate_limited': 0, 'dead_lettered': 0, 'dropped': 0}
+
+    @classmethod
+    def submit(cls, channel_id, payload, on_done=None):
+        """
+        Queue a message for `channel_id`. Returns False if it can't be queued.
+        `on_done(delivered, error, permanent)` is called from the lane thread
+        once the message is sent or dead-lettered.
+        """
+        if not Config.BOT_TOKEN or not Config.BOT_ID:
+            print("Bot credentials not configured.")
+            return False
+
+        cls._ensure_started()
+        lane = cls._lanes[zlib.crc32(str(channel_id).encode()) % len(cls._lanes)]
+        try:
+            lane.put_nowait(_Message(channel_id, payload, on_done))
+        except queue.Full:
+            cls._count('dropped')
+            print(f"⚠️ Cliq queue full, dropping message for {channel_id}")
+            return False
+        cls._count('submitted')
+        return True
+
+    @classmethod
+    def drain(cls, timeout=None):
+        """Block until every queued message is sent or dead-lettered. Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for lane in list(cls._lanes):
+            while lane.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        return True
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            latencies = sorted(cls._latencies_ms)
+            stats['queued'] = sum(lane.qsize() for lane in cls._lanes)
+            stats['workers'] = len(cls._threads)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 2) if latencies else None
+
+        stats['latency_ms'] = {'p50': pct(0.5), 'p95': pct(0.95), 'max': pct(1.0)}
+        return stats
+
+    @classmethod
+    def dead_letters(cls):
+        with cls._lock:
+            return [{
+                'channel_id': m.channel_id, 'attempts': m.attempts,
+                'error': m.last_error, 'payload': m.payload
+            } for m in cls._dead_letters]
+
+    @classmethod
+    def reset(cls):
+        """Stop the lane threads (after draining) and clear counters."""
+        cls.drain(timeout=30)
+        with cls._lock:
+            cls._stop.set()
+            threads, cls._threads, cls._lanes = cls._threads, [], []
+        for t in threads:
+            t.join(timeout=5)
+        with cls._lock:
+            cls._stop = threading.Event()
+            cls._dead_letters.clear()
+            cls._latencies_ms.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+
+    # --- Internals ---
+
+    @classmethod
+    def _ensure_started(cls):
+        if cls._threads:
+            return
+        with cls._lock:
+            if cls._threads:
+                return
+            workers = max(1, Config.CLIQ_DISPATCH_WORKERS)
+            size = max(1, Config.CLIQ_QUEUE_SIZE // workers)
+            lanes = [queue.Queue(maxsize=size) for _ in range(workers)]
+            threads = [
+                threading.Thread(target=cls._run_lane, args=(lane, cls._stop), daemon=True,
+                                 name=f"cliq-dispatch-{i}")
+                for i, lane in enumerate(lanes)
+            ]
+            cls._lanes = lanes
+            for t in threads:
+                t.start()
+            cls._threads = threads
+
+    @classmethod
+    def _run_lane(cls, lane, stop):
+        while not stop.is_set():
+            try:
+                message = lane.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                cls._deliver(message, stop)
+            except Exception as e:
+                message.last_error = str(e)
+                cls._dead_letter(message)
+            finally:
+                lane.task_done()
+
+    @classmethod
+    def _deliver(cls, message, stop):
+        """Send one message, retrying in place so later messages of the channel wait."""
+        bucket = RateLimiter.for_provider('cliq')
+
+        while not stop.is_set():
+            bucket.acquire()
+            message.attempts += 1
+            try:
+                response = ZohoService.post_message(message.channel_id, message.payload,
+                                                    timeout=Config.CLIQ_SEND_TIMEOUT)
+                status = response.status_code
+            except Exception as e:
+                response, status = None, None
+                message.last_error = str(e)
+
+            if status is not None and status < 400:
+                cls._record_sent(message)
+                return
+
+            if status == 429:
+                # Rate limited: wait it out without spending an attempt
+                cls._count('rate_limited')
+                bucket.penalize(parse_retry_after(response.headers.get('Retry-After'), default=5.0))
+                message.attempts -= 1
+                continue
+
+            if status is not None:
+                message.last_error = f"HTTP {status}: {response.text[:200]}"
+                if status < 500:
+                    message.permanent = True
+                    break  # Bad request/auth/channel: retrying won't help
+
+            if message.attempts >= Config.CLIQ_MAX_ATTEMPTS:
+                break
+            cls._count('retried')
+            stop.wait(Config.CLIQ_RETRY_BASE_SECONDS * 2 ** (message.attempts - 1))
+
+        cls._dead_letter(message)
+
+    @classmethod
+    def _record_sent(cls, message):
+        with cls._lock:
+            cls._stats['sent'] += 1
+            cls._latencies_ms.append((time.monotonic() - message.enqueued_at) * 1000)
+        cls._notify(message, True)
+
+    @classmethod
+    def _dead_letter(cls, message):
+        print(f"❌ Cliq message to {message.channel_id} dead-lettered after "
+              f"{message.attempts} attempts: {message.last_error}")
+        with cls._lock:
+            cls._stats['dead_lettered'] += 1
+            cls._dead_letters.append(message)
+        cls._notify(message, False)
+
+    @staticmethod
+    def _notify(message, delivered):
+        if message.on_done is None:
+            return
+        try:
+            message.on_done(delivered, message.last_error, message.permanent)
+        except Exception as e:
+            print(f"⚠️ Cliq delivery callback failed: {e}")
+
+    @classmethod
+    def _count(cls, key):
+        with cls._lock:
+            cls._stats[key] += 1
@@ -0,0 +1,227 @@
+import hashlib
+import os
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import and_, delete, func, or_, select, update
+from app.extensions import db
+from app.models import OutboxMessage
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.utils import bulk_upsert
+from config import Config
+
+
+class Outbox:
+    """
+    Transactional outbox for Cliq messages. Alert fan-out writes a row here in
+    the same transaction as its Alert rows, so either both commit or neither
+    does; OutboxRelay delivers committed rows later. Delivery is at least
+    once: a relay dying after a post but before recording it re-sends that
+    message when its lease expires.
+    """
+
+    @staticmethod
+    def idempotency_key(*parts):
+        """Stable key for a message built from the same inputs."""
+        return hashlib.sha256('|'.join(str(p) for p in parts).encode()).hexdigest()
+
+    @staticmethod
+    def add_many(messages):
+        """
+        Insert {'idempotency_key', 'channel_id', 'payload'} dicts through
+        db.session; a key that already exists is skipped, so a repeated run
+        can't queue the same message twice. The caller commits.
+        """
+        now = datetime.utcnow()
+        rows = [{**m, 'status': 'pending', 'attempts': 0, 'run_after': now, 'created_at': now}
+                for m in messages]
+        return bulk_upsert(db.session, OutboxMessage, rows, key_columns=['idempotency_key'], update_columns=[])
+
+    @staticmethod
+    def claim(worker_id, limit):
+        """
+        Lease up to `limit` due messages to `worker_id`, oldest first. Same
+        conditional-UPDATE scheme as JobQueue.claim; commits. Returns the
+        claimed rows as (id, channel_id, payload).
+        """
+        now = datetime.utcnow()
+        claimable = or_(
+            and_(OutboxMessage.status == 'pending', OutboxMessage.run_after <= now),
+            and_(OutboxMessage.status == 'sending', OutboxMessage.locked_until < now)
+        )
+        query = select(OutboxMessage.id).where(claimable) \
+            .order_by(OutboxMessage.run_after, OutboxMessage.id).limit(limit)
+        if db.engine.dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True)
+
+        ids = db.session.execute(query).scalars().all()
+        if not ids:
+            db.session.commit()
+            return []
+
+        db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids), claimable)
+            .values(status='sending', locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=Config.OUTBOX_LEASE_SECONDS),
+                    attempts=OutboxMessage.attempts + 1)
+        )
+        db.session.commit()
+
+        # Rows another relay won in between keep its worker id
+        rows = db.session.query(OutboxMessage.id, OutboxMessage.channel_id, OutboxMessage.payload) \
+            .filter(OutboxMessage.id.in_(ids), OutboxMessage.locked_by == worker_id,
+                    OutboxMessage.status == 'sending') \
+            .order_by(OutboxMessage.id).all()
+        db.session.commit()
+        return rows
+
+    @staticmethod
+    def record(results):
+        """
+        Apply delivery results [(id, delivered, error, permanent)]: sent rows
+        are marked sent, failures go back to pending with backoff until
+        OUTBOX_MAX_ATTEMPTS (or at once for permanent errors), then dead.
+        Commits.
+        """
+        if not results:
+            return
+        now = datetime.utcnow()
+        sent = [r[0] for r in results if r[1]]
+        if sent:
+            db.session.execute(
+                update(OutboxMessage).where(OutboxMessage.id.in_(sent))
+                .values(status='sent', sent_at=now, locked_until=None, last_error=None)
+            )
+
+        failed = {r[0]: r for r in results if not r[1]}
+        if failed:
+            for message in OutboxMessage.query.filter(OutboxMessage.id.in_(list(failed))):
+                _, _, error, permanent = failed[message.id]
+                message.last_error = (error or 'Delivery failed')[:2000]
+                message.locked_until = None
+                if permanent or message.attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                    message.status = 'dead'
+                else:
+                    message.status = 'pending'
+                    backoff = Config.OUTBOX_RETRY_BASE_SECONDS * 2 ** (message.attempts - 1)
+                    message.run_after = now + timedelta(seconds=backoff)
+        db.session.commit()
+
+    @staticmethod
+    def release(ids):
+        """Return claimed rows that never reached the dispatcher, without spending an attempt. Commits."""
+        if ids:
+            db.session.execute(
+                update(OutboxMessage).where(OutboxMessage.id.in_(ids))
+                .values(status='pending', locked_until=None, attempts=OutboxMessage.attempts - 1)
+            )
+        db.session.commit()
+
+    @staticmethod
+    def purge(now=None):
+        """Delete sent rows older than OUTBOX_RETENTION_HOURS. Commits."""
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=Config.OUTBOX_RETENTION_HOURS)
+        deleted = db.session.execute(
+            delete(OutboxMessage).where(OutboxMessage.status == 'sent', OutboxMessage.sent_at < cutoff)
+        ).rowcount
+        db.session.commit()
+        return deleted
+
+    @staticmethod
+    def get_stats():
+        rows = db.session.query(OutboxMessage.status, func.count(OutboxMessage.id)) \
+            .group_by(OutboxMessage.status).all()
+        stats = {status: count for status, count in rows}
+        oldest = db.session.query(func.min(OutboxMessage.created_at)) \
+            .filter(OutboxMessage.status.in_(['pending', 'sending'])).scalar()
+        stats['oldest_pending_age_s'] = round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else None
+        return stats
+
+
+class OutboxRelay:
+    """
+    Drains the outbox into NotificationDispatcher. Claims a batch, submits
+    it, and records each message's fate as the dispatcher reports it (all DB
+    writes stay on the relay's thread). At most OUTBOX_BATCH_SIZE messages
+    are in flight per relay. Several relays can run side by side. Must run
+    inside an app context.
+    """
+
+    def __init__(self, worker_id=None, batch_size=None):
+        self.worker_id = worker_id or f"relay:{socket.gethostname()}:{os.getpid()}"
+        self.batch_size = batch_size or Config.OUTBOX_BATCH_SIZE
+        self.in_flight = set()
+        self._results = deque()
+        self._stop = threading.Event()
+        self._purged_at = 0
+
+    def run(self):
+        print(f"📮 Outbox relay {self.worker_id} started")
+        try:
+            while not self._stop.is_set():
+                try:
+                    worked = self.relay_once()
+                    if time.monotonic() - self._purged_at > 3600:
+                        Outbox.purge()
+                        self._purged_at = time.monotonic()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"⚠️ Outbox relay error: {e}")
+                    worked = False
+                if not worked:
+                    self._stop.wait(Config.OUTBOX_POLL_SECONDS)
+        finally:
+            # Let messages already handed over finish, and record them
+            NotificationDispatcher.drain(timeout=30)
+            self._apply_results()
+
+    def stop(self):
+        self._stop.set()
+
+    def relay_once(self):
+        """Record finished deliveries and top up the in-flight batch. Returns True if anything happened."""
+        finished = self._apply_results()
+        room = self.batch_size - len(self.in_flight)
+        if room <= 0:
+            return bool(finished)
+
+        claimed = Outbox.claim(self.worker_id, room)
+        refused = []
+        for message_id, channel_id, payload in claimed:
+            self.in_flight.add(message_id)
+            if not NotificationDispatcher.submit(channel_id, payload, on_done=self._callback(message_id)):
+                self.in_flight.discard(message_id)
+                refused.append(message_id)
+        if refused:
+            # Dispatcher full or not configured: try again on a later pass
+            Outbox.release(refused)
+        return bool(finished or len(claimed) > len(refused))
+
+    def drain(self, timeout=None):
+        """Relay until nothing is due or in flight. Returns True if the outbox drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            worked = self.relay_once()
+            if not worked and not self.in_flight:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if not worked:
+                time.sleep(0.05)
+
+    def _callback(self, message_id):
+        def on_done(delivered, error, permanent):
+            self._results.append((message_id, delivered, error, permanent))
+        return on_done
+
+    def _apply_results(self):
+        results = []
+        while self._results:
+            results.append(self._results.popleft())
+        Outbox.record(results)
+        for message_id, *_ in results:
+            self.in_flight.discard(message_id)
+        return len(results)
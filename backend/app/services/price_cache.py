@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app, has_app_context
+from app.extensions import db
+from config import Config
+
+
+class PriceCache:
+    """
+    Process-wide TTL cache for CoinGecko quotes with stale-while-revalidate.
+
+    - Fresh quotes (younger than the coin's TTL) are served straight from memory.
+    - Stale quotes (up to TTL + PRICE_CACHE_STALE_TTL old) are served immediately
+      while a background refresh fetches a new quote.
+    - Anything older, or never seen, is fetched synchronously.
+
+    The cache is warmed from the `prices` table on first use and fetched quotes
+    are written back to it, so a restarted worker does not start cold.
+    """
+    _entries = {}          # coin_id -> (data, fetched_at epoch)
+    _refreshing = set()    # coin_ids with a background refresh in flight
+    _lock = threading.Lock()
+    _executor = None
+    _warmed = False
+
+    _stats = {
+        'hits': 0,
+        'misses': 0,
+        'stale': 0,
+        'refreshes': 0,
+        'refresh_errors': 0
+    }
+
+    @staticmethod
+    def ttl_for(coin_id):
+        return Config.PRICE_CACHE_TTL_OVERRIDES.get(coin_id, Config.PRICE_CACHE_TTL)
+
+    @classmethod
+    def get_many(cls, coin_ids, fetcher):
+        """
+        Return quotes for `coin_ids`, calling `fetcher(ids)` only for misses.
+        Stale entries are returned as-is and refreshed in the background.
+        """
+        cls.warm()
+
+        now = time.time()
+        result = {}
+        missing = []
+        stale = []
+
+        with cls._lock:
+            for coin_id in coin_ids:
+                entry = cls._entries.get(coin_id)
+                if entry is None:
+                    missing.append(coin_id)
+                    continue
+
+                data, fetched_at = entry
+                age = now - fetched_at
+                ttl = cls.ttl_for(coin_id)
+
+                if age < ttl:
+                    cls._stats['hits'] += 1
+                elif age < ttl + Config.PRICE_CACHE_STALE_TTL:
+                    cls._stats['stale'] += 1
+                    if coin_id not in cls._refreshing:
+                        cls._refreshing.add(coin_id)
+                        stale.append(coin_id)
+                else:
+                    missing.append(coin_id)
+                    continue
+
+                result[coin_id] = data
+
+            cls._stats['misses'] += len(missing)
+
+        if stale:
+            cls._submit(cls._refresh, stale, fetcher, cls._current_app())
+
+        if missing:
+            fetched = fetcher(missing)
+            cls.put_many(fetched)
+            result.update({cid: fetched[cid] for cid in missing if cid in fetched})
+
+        return result
+
+    @classmethod
+    def put_many(cls, prices, persist=True):
+        """Store fetched quotes and write them through to the Price table."""
+        now = time.time()
+        with cls._lock:
+            for coin_id, data in prices.items():
+                cls._entries[coin_id] = (data, now)
+
+        if persist and prices:
+            cls._submit(cls._persist, dict(prices), cls._current_app())
+
+    @classmethod
+    def warm(cls):
+        """Load the last known quotes from the Price table (once per process)."""
+        if cls._warmed or not has_app_context():
+            return
+        cls._warmed = True
+
+        from app.models import Price
+        try:
+            rows = Price.query.filter(Price.last_price.isnot(None)).all()
+        except Exception as e:
+            print(f"⚠️ Price cache warm-up failed: {e}")
+            return
+
+        with cls._lock:
+            for row in rows:
+                if row.coin_id in cls._entries or not row.updated_at:
+                    continue
+                fetched_at = (row.updated_at - datetime(1970, 1, 1)).total_seconds()
+                cls._entries[row.coin_id] = (cls._row_to_quote(row), fetched_at)
+
+        print(f"🔥 Price cache warmed with {len(rows)} coins")
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats['entries'] = len(cls._entries)
+            stats['refreshing'] = len(cls._refreshing)
+        lookups = stats['hits'] + stats['stale'] + stats['misses']
+        stats['hit_ratio'] = round((stats['hits'] + stats['stale']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._refreshing.clear()
+            for key in cls._stats:
+                cls._stats[key] = 0
+            cls._warmed = False
+
+    # --- Internals ---
+
+    @staticmethod
+    def _row_to_quote(row):
+        return {
+            'current_price': row.last_price or 0,
+            'price_change_percentage_1h_in_currency': row.last_change_pct_1h or 0,
+            'price_change_percentage_24h_in_currency': row.last_change_pct_24h or 0,
+            'market_cap': 0,
+            'name': row.name or row.coin_id,
+            'symbol': (row.symbol or '').upper()
+        }
+
+    @staticmethod
+    def _current_app():
+        return current_app._get_current_object() if has_app_context() else None
+
+    @classmethod
+    def _submit(cls, fn, *args):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='price-cache')
+        cls._executor.submit(fn, *args)
+
+    @classmethod
+    def _refresh(cls, coin_ids, fetcher, app):
+        try:
+            if app is not None:
+                with app.app_context():
+                    fetched = fetcher(coin_ids)
+            else:
+                fetched = fetcher(coin_ids)
+            with cls._lock:
+                cls._stats['refreshes'] += 1
+            cls.put_many(fetched, persist=False)
+            if app is not None and fetched:
+                cls._persist(fetched, app)
+        except Exception as e:
+            with cls._lock:
+                cls._stats['refresh_errors'] += 1
+            print(f"❌ Background price refresh failed: {e}")
+        finally:
+            with cls._lock:
+                cls._refreshing.difference_update(coin_ids)
+
+    @staticmethod
+    def _persist(prices, app):
+        """Write quotes through to the Price table on a separate connection."""
+        if app is None:
+            return
+
+        from app.services.price_service import PriceService
+
+        try:
+            with app.app_context():
+                with db.engine.begin() as conn:
+                    PriceService.save_quotes(prices, session=conn)
+        except Exception as e:
+            print(f"⚠️ Failed to persist cached prices: {e}")
@@ -0,0 +1,177 @@
+import time
+from app.extensions import db
+from app.models import PriceTick, PriceBar
+from config import Config
+
+
+class PriceHistoryService:
+    """
+    Compact price time-series store.
+
+    Every observed price is appended to `price_ticks`. `rollup()` folds ticks
+    older than PRICE_HISTORY_RAW_HOURS into 5-minute OHLC bars, and 5-minute
+    bars older than PRICE_HISTORY_5M_DAYS into hourly bars, so storage per coin
+    stays bounded while long ranges remain queryable.
+    """
+    FIVE_MINUTES = 300
+    ONE_HOUR = 3600
+
+    @staticmethod
+    def record(prices, ts=None):
+        """Append one tick per coin from a get_prices() result in a single statement."""
+        ts = int(ts if ts is not None else time.time())
+        rows = [
+            {'coin_id': coin_id, 'ts': ts, 'price': data['current_price']}
+            for coin_id, data in prices.items()
+            if data.get('current_price')
+        ]
+        if rows:
+            db.session.execute(PriceTick.__table__.insert(), rows)
+        return len(rows)
+
+    @staticmethod
+    def rollup(now=None):
+        """
+        Move expired raw ticks into 5m bars and expired 5m bars into 1h bars.
+        Cutoffs are aligned to bar boundaries so every bucket is rolled whole.
+        Raw ticks go oldest first in chunks of about PRICE_HISTORY_ROLLUP_CHUNK,
+        each committed with its bars, so a backlog after an outage is never
+        loaded at once.
+        """
+        now = int(now if now is not None else time.time())
+        five = PriceHistoryService.FIVE_MINUTES
+        hour = PriceHistoryService.ONE_HOUR
+
+        raw_cutoff = now - Config.PRICE_HISTORY_RAW_HOURS * 3600
+        raw_cutoff -= raw_cutoff % five
+        bar_cutoff = now - Config.PRICE_HISTORY_5M_DAYS * 86400
+        bar_cutoff -= bar_cutoff % hour
+
+        # 1. Raw ticks -> 5 minute bars
+        ticks_rolled = rolled_ticks = 0
+        while True:
+            upper = PriceHistoryService._next_chunk_end(raw_cutoff)
+            if upper is None:
+                break
+            ticks = db.session.query(PriceTick.coin_id, PriceTick.ts, PriceTick.price) \
+                .filter(PriceTick.ts < upper) \
+                .order_by(PriceTick.coin_id, PriceTick.ts).all()
+            points = [(t.coin_id, t.ts, t.price, t.price, t.price, t.price, 1) for t in ticks]
+            rolled_ticks += PriceHistoryService._write_bars(points, five)
+            db.session.query(PriceTick).filter(PriceTick.ts < upper).delete(synchronize_session=False)
+            db.session.commit()
+            ticks_rolled += len(ticks)
+
+        # 2. 5 minute bars -> hourly bars
+        bars = PriceBar.query \
+            .filter(PriceBar.resolution == five, PriceBar.bucket < bar_cutoff) \
+            .order_by(PriceBar.coin_id, PriceBar.bucket).all()
+        points = [(b.coin_id, b.bucket, b.open, b.high, b.low, b.close, b.samples or 1) for b in bars]
+        rolled_bars = PriceHistoryService._write_bars(points, hour)
+        if bars:
+            PriceBar.query.filter(PriceBar.resolution == five, PriceBar.bucket < bar_cutoff) \
+                .delete(synchronize_session=False)
+
+        return {'ticks_rolled': ticks_rolled, 'bars_5m_written': rolled_ticks,
+                'bars_5m_rolled': len(bars), 'bars_1h_written': rolled_bars}
+
+    @staticmethod
+    def _next_chunk_end(cutoff):
+        """
+        Exclusive upper ts of the next chunk of expired ticks: the bar boundary
+        at or below the PRICE_HISTORY_ROLLUP_CHUNK-th oldest tick, so buckets
+        are never split, but at least one whole bucket. None when none expired.
+        """
+        expired = db.session.query(PriceTick.ts).filter(PriceTick.ts < cutoff).order_by(PriceTick.ts)
+        first = expired.limit(1).scalar()
+        if first is None:
+            return None
+        five = PriceHistoryService.FIVE_MINUTES
+        nth = expired.offset(max(1, Config.PRICE_HISTORY_ROLLUP_CHUNK)).limit(1).scalar()
+        if nth is None:
+            return cutoff
+        return max(nth - nth % five, first - first % five + five)
+
+    @staticmethod
+    def get_range(coin_id, start, end=None):
+        """
+        Price points for `coin_id` between epoch seconds `start` and `end`.
+
+        Each tier is read only where a finer tier has no data: raw ticks
+        first, then 5m bars older than the first tick, then 1h bars older
+        than the first 5m bar. Every query is a range scan on the tier's index.
+        """
+        end = int(end if end is not None else time.time())
+        points = []
+
+        ticks = db.session.query(PriceTick.ts, PriceTick.price) \
+            .filter(PriceTick.coin_id == coin_id, PriceTick.ts >= start, PriceTick.ts <= end) \
+            .order_by(PriceTick.ts).all()
+        finer_start = ticks[0].ts if ticks else end + 1
+
+        for resolution in (PriceHistoryService.FIVE_MINUTES, PriceHistoryService.ONE_HOUR):
+            bars = PriceBar.query \
+                .filter(PriceBar.coin_id == coin_id, PriceBar.resolution == resolution,
+                        PriceBar.bucket >= start - resolution + 1, PriceBar.bucket < finer_start) \
+                .order_by(PriceBar.bucket).all()
+            points = [{
+                'ts': b.bucket, 'open': b.open, 'high': b.high, 'low': b.low,
+                'close': b.close, 'resolution': resolution
+            } for b in bars] + points
+            if bars:
+                finer_start = bars[0].bucket
+
+        points += [{
+            'ts': t.ts, 'open': t.price, 'high': t.price, 'low': t.price,
+            'close': t.price, 'resolution': 0
+        } for t in ticks]
+        return points
+
+    @staticmethod
+    def _write_bars(points, resolution):
+        """
+        Aggregate (coin_id, ts, open, high, low, close, samples) points, sorted
+        by coin and time, into bars of `resolution` seconds and merge them
+        with any bars already stored for the same buckets.
+        """
+        if not points:
+            return 0
+
+        bars = {}
+        for coin_id, ts, o, h, l, c, n in points:
+            key = (coin_id, ts - ts % resolution)
+            bar = bars.get(key)
+            if bar is None:
+                bars[key] = [o, h, l, c, n]
+            else:
+                bar[1] = max(bar[1], h)
+                bar[2] = min(bar[2], l)
+                bar[3] = c
+                bar[4] += n
+
+        coin_ids = {coin_id for coin_id, _ in bars}
+        buckets = [bucket for _, bucket in bars]
+        existing = PriceBar.query.filter(
+            PriceBar.resolution == resolution,
+            PriceBar.coin_id.in_(coin_ids),
+            PriceBar.bucket >= min(buckets),
+            PriceBar.bucket <= max(buckets)
+        ).all()
+
+        for row in existing:
+            bar = bars.get((row.coin_id, row.bucket))
+            if bar is None:
+                continue
+            # Stored bar is older than the points being rolled in
+            bar[0] = row.open
+            bar[1] = max(bar[1], row.high)
+            bar[2] = min(bar[2], row.low)
+            bar[4] += row.samples or 1
+            db.session.delete(row)
+        db.session.flush()
+
+        db.session.execute(PriceBar.__table__.insert(), [{
+            'coin_id': coin_id, 'resolution': resolution, 'bucket': bucket,
+            'open': o, 'high': h, 'low': l, 'close': c, 'samples': n
+        } for (coin_id, bucket), (o, h, l, c, n) in bars.items()])
+        return len(bars)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.extensions import db
+from app.models import Price
+from app.utils import bulk_upsert
+
+
+class PriceService:
+    @staticmethod
+    def save_quotes(prices, session=None):
+        """
+        Write the latest quote per coin to the Price table as one
+        INSERT ... ON CONFLICT per 500 coins (no ORM objects are loaded).
+        `session` may also be a Connection. Caller owns the transaction
+        (commit/rollback).
+        """
+        now = datetime.utcnow()
+        rows = [{
+            'coin_id': coin_id,
+            'name': data.get('name'),
+            'symbol': data.get('symbol'),
+            'last_price': data.get('current_price', 0),
+            'last_change_pct_1h': data.get('price_change_percentage_1h_in_currency', 0),
+            'last_change_pct_24h': data.get('price_change_percentage_24h_in_currency', 0),
+            'updated_at': now
+        } for coin_id, data in prices.items()]
+        return bulk_upsert(session if session is not None else db.session, Price, rows, key_columns=['coin_id'])
@@ -0,0 +1,101 @@
+import threading
+import time
+from config import Config
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+    Refills at `rate_per_minute` and holds at most `capacity` tokens, so short
+    bursts are allowed but the long-run request rate stays within the plan.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(3, int(rate_per_minute // 4))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Block until `tokens` are available. Returns False if `timeout` seconds
+        pass first, True otherwise.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return True
+
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    wait = (tokens - self.tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        """Stop handing out tokens for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+
+class RateLimiter:
+    """Registry of one TokenBucket per outbound provider, shared by all threads."""
+    _buckets = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def for_provider(cls, provider):
+        bucket = cls._buckets.get(provider)
+        if bucket is None:
+            with cls._lock:
+                bucket = cls._buckets.get(provider)
+                if bucket is None:
+                    rate, burst = cls._limits_for(provider)
+                    bucket = TokenBucket(rate, burst)
+                    cls._buckets[provider] = bucket
+        return bucket
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._buckets.clear()
+
+    @staticmethod
+    def _limits_for(provider):
+        if provider == 'coingecko':
+            rate = Config.COINGECKO_RATE_LIMIT or Config.COINGECKO_PLAN_LIMITS.get(Config.coingecko_plan(), 10)
+            return rate, Config.COINGECKO_BURST
+        if provider == 'cliq':
+            return Config.CLIQ_RATE_LIMIT, None
+        if provider in Config.WALLET_PROVIDER_RATE_LIMITS:
+            return Config.WALLET_PROVIDER_RATE_LIMITS[provider], None
+        return Config.DEFAULT_RATE_LIMIT, None
+
+
+def parse_retry_after(value, default=1.0):
+    """Parse a Retry-After header (seconds form) into a float delay."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
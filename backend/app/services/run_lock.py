@@ -0,0 +1,62 @@
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import exists, or_, select, text, update
+from app.extensions import db
+from app.models import Job, RunLock
+from app.utils import bulk_upsert
+from config import Config
+
+
+class RunInProgress(Exception):
+    """Raised when a run is requested while another one holds the lock."""
+
+    def __init__(self, run_id):
+        super().__init__(f"Run {run_id} is still in progress")
+        self.run_id = run_id
+
+
+class RunLockService:
+    """
+    Cross-process lock that lets one scheduled run proceed at a time.
+
+    The holder is a row in run_locks. A run keeps it while any of its jobs
+    is pending or running, and at most RUN_LOCK_LEASE_SECONDS, so a run
+    whose workers all crashed is taken over once the lease expires. The
+    lock is taken with a conditional UPDATE in the caller's transaction:
+    committed together with the run's jobs, no other caller can see the lock
+    held by a run without jobs. On Postgres a transaction-level advisory lock
+    is tried first so a concurrent caller gives up at once instead of
+    waiting on the row lock.
+    """
+
+    @staticmethod
+    def acquire(run_id, name='cron', lease=None):
+        """
+        Take lock `name` for `run_id` in the current transaction (the caller
+        commits, or rolls back to give it up). Raises RunInProgress with the
+        holder's run ID if it is taken.
+        """
+        now = datetime.utcnow()
+        lease = lease or Config.RUN_LOCK_LEASE_SECONDS
+
+        if db.engine.dialect.name == 'postgresql':
+            key = zlib.crc32(f"run_lock:{name}".encode())
+            if not db.session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': key}).scalar():
+                raise RunInProgress(RunLockService.holder(name))
+
+        # Make sure the row exists (unheld) so the claim below is one UPDATE
+        bulk_upsert(db.session, RunLock, [{'name': name, 'run_id': None, 'expires_at': now}],
+                    key_columns=['name'], update_columns=[])
+
+        unfinished = exists().where(Job.run_id == RunLock.run_id, Job.status.in_(['pending', 'running']))
+        claimed = db.session.execute(
+            update(RunLock)
+            .where(RunLock.name == name, or_(RunLock.expires_at <= now, ~unfinished))
+            .values(run_id=run_id, acquired_at=now, expires_at=now + timedelta(seconds=lease))
+        ).rowcount
+        if not claimed:
+            raise RunInProgress(RunLockService.holder(name))
+
+    @staticmethod
+    def holder(name='cron'):
+        return db.session.execute(select(RunLock.run_id).where(RunLock.name == name)).scalar()
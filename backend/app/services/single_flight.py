@@ -0,0 +1,93 @@
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result (or exception). Results are
+    shared objects, so callers must treat them as read-only.
+    """
+    _calls = {}
+    _lock = threading.Lock()
+    _stats = {}  # namespace -> {'calls': n, 'executions': n, 'coalesced': n}
+
+    @classmethod
+    def do(cls, namespace, key, fn, *args, **kwargs):
+        full_key = (namespace, key)
+
+        with cls._lock:
+            stats = cls._stats.setdefault(namespace, {'calls': 0, 'executions': 0, 'coalesced': 0})
+            stats['calls'] += 1
+            call = cls._calls.get(full_key)
+            if call is not None:
+                stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                cls._calls[full_key] = call
+                stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with cls._lock:
+                cls._calls.pop(full_key, None)
+            call.done.set()
+
+    @classmethod
+    def get_stats(cls):
+        with cls._lock:
+            return {ns: dict(stats) for ns, stats in cls._stats.items()}
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._stats.clear()
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return value.lower().strip()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted({_normalize(v) for v in value}))
+    return value
+
+
+def coalesce(namespace, key=None):
+    """
+    Decorator: route calls through SingleFlight. The key defaults to the
+    normalized arguments (strings lowercased/stripped, lists sorted and
+    de-duplicated); pass `key` for arguments where case matters.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                call_key = key(*args, **kwargs)
+            else:
+                call_key = (tuple(_normalize(a) for a in args),
+                            tuple(sorted((k, _normalize(v)) for k, v in kwargs.items())))
+            return SingleFlight.do(namespace, call_key, fn, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+import json
+import threading
+import time
+from app.extensions import db
+from app.models import Holding
+from app.services.http_client import HttpClient
+from app.services.coingecko_service import CoinGeckoService
+from app.services.price_cache import PriceCache
+from app.services.price_service import PriceService
+from app.services.price_history_service import PriceHistoryService
+from app.services.volatility_service import VolatilityService, PriceSnapshot
+from app.services.alert_service import AlertService
+from config import Config
+
+
+class PriceStreamConsumer:
+    """
+    Long-running consumer for a server-sent-events (SSE) price feed.
+
+    Each event's `data` is a JSON quote, or a list of quotes, in the same shape
+    get_prices() returns plus an `id` field. Ticks for tracked coins are
+    buffered (latest quote per coin wins) and flushed every
+    PRICE_STREAM_FLUSH_SECONDS: the Price table, price cache and history are
+    updated, and volatility is evaluated on the flushed batch. Alerts are
+    edge-triggered, so a coin that stays above a threshold alerts once rather
+    than on every tick.
+
+    While the feed is unreachable the consumer falls back to polling
+    get_prices() every PRICE_STREAM_POLL_SECONDS until it reconnects.
+    Must run inside an app context.
+    """
+
+    def __init__(self, url=None, flush_interval=None):
+        self.url = url or Config.PRICE_STREAM_URL
+        self.flush_interval = flush_interval if flush_interval is not None else Config.PRICE_STREAM_FLUSH_SECONDS
+
+        self.buffer = {}            # coin_id -> latest quote since last flush
+        self.buffer_started = None  # monotonic time of the oldest buffered tick
+        self.last_flush = time.monotonic()
+        self.tracked = set()
+        self.tracked_at = 0
+        self.active_alerts = {}     # coin_id -> alert types currently over threshold
+        self.history_at = {}        # coin_id -> epoch of the last recorded history tick
+        self.last_poll = 0
+
+        self.stats = {
+            'events': 0,
+            'ticks': 0,
+            'ticks_ignored': 0,
+            'flushes': 0,
+            'alerts_sent': 0,
+            'reconnects': 0,
+            'polls': 0,
+            'max_flush_lag_ms': 0.0
+        }
+        self._stop = threading.Event()
+
+    def run(self):
+        """Consume forever, reconnecting with backoff and polling while disconnected."""
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                self.consume_once()
+                backoff = 1
+            except Exception as e:
+                print(f"⚠️ Price stream error: {e}")
+
+            if self._stop.is_set():
+                break
+
+            self.stats['reconnects'] += 1
+            self._poll_fallback()
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def stop(self):
+        self._stop.set()
+
+    def consume_once(self):
+        """Read the feed until it closes (or stop() is called), then flush."""
+        if not self.url:
+            raise RuntimeError("PRICE_STREAM_URL is not configured")
+
+        print(f"📡 Connecting to price stream {self.url}")
+        response = HttpClient.get(
+            self.url, stream=True,
+            headers={"Accept": "text/event-stream"},
+            timeout=(Config.HTTP_CONNECT_TIMEOUT, Config.PRICE_STREAM_IDLE_TIMEOUT)
+        )
+        response.raise_for_status()
+
+        data_lines = []
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if self._stop.is_set():
+                    break
+
+                if line is None:
+                    continue
+                if line == '':
+                    # Blank line terminates an SSE event
+                    if data_lines:
+                        self.handle_event('\n'.join(data_lines))
+                        data_lines = []
+                elif line.startswith('data:'):
+                    data_lines.append(line[5:].lstrip())
+                # Comments (": ping") and other fields only serve as heartbeats
+
+                if time.monotonic() - self.last_flush >= self.flush_interval:
+                    self.flush()
+        finally:
+            response.close()
+            self.flush()
+
+    def handle_event(self, raw):
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return
+
+        self.stats['events'] += 1
+        tracked = self._tracked_coins()
+
+        for tick in payload if isinstance(payload, list) else [payload]:
+            coin_id = (tick.get('id') or '').lower()
+            if not coin_id or coin_id not in tracked or tick.get('current_price') is None:
+                self.stats['ticks_ignored'] += 1
+                continue
+
+            if self.buffer_started is None:
+                self.buffer_started = time.monotonic()
+            self.buffer[coin_id] = {
+                'current_price': tick['current_price'],
+                'price_change_percentage_1h_in_currency': tick.get('price_change_percentage_1h_in_currency', 0),
+                'price_change_percentage_24h_in_currency': tick.get('price_change_percentage_24h_in_currency', 0),
+                'market_cap': tick.get('market_cap', 0),
+                'name': tick.get('name', coin_id),
+                'symbol': (tick.get('symbol') or '').upper()
+            }
+            self.stats['ticks'] += 1
+
+    def flush(self):
+        """Apply buffered ticks: DB + cache + history, then incremental alert evaluation."""
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+
+        prices, self.buffer = self.buffer, {}
+        buffer_started, self.buffer_started = self.buffer_started, None
+        lag_ms = (time.monotonic() - buffer_started) * 1000
+        history_at = dict(self.history_at)
+
+        try:
+            PriceService.save_quotes(prices)
+            PriceCache.put_many(prices, persist=False)
+            self._record_history(prices)
+
+            flagged = VolatilityService.check_snapshot(PriceSnapshot.from_prices(prices))
+            active, fresh_alerts = {}, {}
+            for coin_id in prices:
+                alerts = flagged.get(coin_id, [])
+                previous = self.active_alerts.get(coin_id, set())
+                active[coin_id] = {a['type'] for a in alerts}
+                fresh = [a for a in alerts if a['type'] not in previous]
+                if fresh:
+                    fresh_alerts[coin_id] = fresh
+
+            if fresh_alerts:
+                self.stats['alerts_sent'] += AlertService.notify_many(fresh_alerts, prices)
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Price stream flush failed: {e}")
+            # Retry these ticks on the next flush; ticks that arrived meanwhile are newer and win
+            for coin_id, quote in prices.items():
+                self.buffer.setdefault(coin_id, quote)
+            if self.buffer_started is None or buffer_started < self.buffer_started:
+                self.buffer_started = buffer_started
+            self.history_at = history_at
+            return
+
+        # Alert state only moves once the alerts are committed
+        for coin_id, types in active.items():
+            if types:
+                self.active_alerts[coin_id] = types
+            else:
+                self.active_alerts.pop(coin_id, None)
+
+        self.stats['flushes'] += 1
+        self.stats['max_flush_lag_ms'] = max(self.stats['max_flush_lag_ms'], round(lag_ms, 2))
+
+    # --- Internals ---
+
+    def _tracked_coins(self):
+        """Coins anyone holds, refreshed every minute."""
+        if time.monotonic() - self.tracked_at > 60:
+            rows = Holding.query.with_entities(Holding.coin_id).distinct().all()
+            self.tracked = {r.coin_id.lower() for r in rows}
+            self.tracked_at = time.monotonic()
+        return self.tracked
+
+    def _record_history(self, prices):
+        """Sample the stream into price history at most once per PRICE_STREAM_HISTORY_SECONDS per coin."""
+        now = time.time()
+        due = {
+            coin_id: quote for coin_id, quote in prices.items()
+            if now - self.history_at.get(coin_id, 0) >= Config.PRICE_STREAM_HISTORY_SECONDS
+        }
+        if due:
+            PriceHistoryService.record(due, ts=now)
+            for coin_id in due:
+                self.history_at[coin_id] = now
+
+    def _poll_fallback(self):
+        """Fetch tracked coins through the polling path while the stream is down."""
+        if time.monotonic() - self.last_poll < Config.PRICE_STREAM_POLL_SECONDS:
+            return
+        self.last_poll = time.monotonic()
+
+        tracked = self._tracked_coins()
+        if not tracked:
+            return
+
+        try:
+            prices = CoinGeckoService.get_prices(list(tracked), use_cache=False)
+        except Exception as e:
+            print(f"❌ Fallback price poll failed: {e}")
+            return
+
+        self.stats['polls'] += 1
+        if self.buffer_started is None:
+            self.buffer_started = time.monotonic()
+        self.buffer.update(prices)
+        self.flush()
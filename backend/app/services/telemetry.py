@@ -0,0 +1,156 @@
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from urllib.parse import urlsplit
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Host suffix -> provider name used in the telemetry
+PROVIDER_HOSTS = {
+    'coingecko.com': 'coingecko',
+    'deep-index.moralis.io': 'moralis_evm',
+    'solana-gateway.moralis.io': 'moralis_sol',
+    'blockcypher.com': 'blockcypher',
+    'cryptopanic.com': 'cryptopanic',
+    'cliq.zoho.com': 'cliq',
+    'googleapis.com': 'gemini',
+}
+
+_current = contextvars.ContextVar('telemetry', default=None)
+
+
+def provider_for_url(url):
+    host = (urlsplit(url).hostname or '').lower()
+    for suffix, provider in PROVIDER_HOSTS.items():
+        if host == suffix or host.endswith('.' + suffix):
+            return provider
+    return host or 'unknown'
+
+
+class Telemetry:
+    """
+    Counters for one unit of work (a job): outbound HTTP calls per provider
+    with a latency histogram, and SQL statements with their time.
+
+    The collector lives in a context variable, so HttpClient and the engine
+    hooks below record into whatever job is running on the current thread.
+    Thread pools that should count towards the job submit through
+    Telemetry.submit(), which runs the task in a copy of the context.
+    Histograms have fixed buckets so jobs of a run can be merged exactly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.http = {}
+        self.db = {'statements': 0, 'time_ms': 0.0}
+
+    @staticmethod
+    def current():
+        return _current.get()
+
+    @staticmethod
+    @contextlib.contextmanager
+    def collect():
+        """Record everything done in this block (and tasks it submits) into a new Telemetry."""
+        telemetry = Telemetry()
+        token = _current.set(telemetry)
+        try:
+            yield telemetry
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def submit(pool, fn, *args, **kwargs):
+        """pool.submit() that keeps recording into the caller's Telemetry."""
+        return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+    @staticmethod
+    def record_http(url, elapsed_ms, ok):
+        telemetry = _current.get()
+        if telemetry is None:
+            return
+        provider = provider_for_url(url)
+        with telemetry._lock:
+            stats = telemetry.http.get(provider)
+            if stats is None:
+                stats = telemetry.http[provider] = Telemetry._empty_http()
+            stats['calls'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['time_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['buckets'][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def record_sql(self, elapsed_ms):
+        with self._lock:
+            self.db['statements'] += 1
+            self.db['time_ms'] += elapsed_ms
+
+    def calls(self, provider):
+        """HTTP calls made to `provider` so far."""
+        with self._lock:
+            return self.http.get(provider, {}).get('calls', 0)
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'http': {p: {**s, 'time_ms': round(s['time_ms'], 2), 'max_ms': round(s['max_ms'], 2),
+                             'buckets': list(s['buckets'])} for p, s in self.http.items()},
+                'db': {'statements': self.db['statements'], 'time_ms': round(self.db['time_ms'], 2)}
+            }
+
+    @staticmethod
+    def merge(snapshots):
+        """Combine to_dict() snapshots (e.g. all jobs of a run) into one."""
+        http, db = {}, {'statements': 0, 'time_ms': 0.0}
+        for snapshot in snapshots:
+            for provider, s in (snapshot or {}).get('http', {}).items():
+                total = http.setdefault(provider, Telemetry._empty_http())
+                total['calls'] += s['calls']
+                total['errors'] += s['errors']
+                total['time_ms'] += s['time_ms']
+                total['max_ms'] = max(total['max_ms'], s['max_ms'])
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], s['buckets'])]
+            db['statements'] += (snapshot or {}).get('db', {}).get('statements', 0)
+            db['time_ms'] += (snapshot or {}).get('db', {}).get('time_ms', 0.0)
+        db['time_ms'] = round(db['time_ms'], 2)
+        for s in http.values():
+            s['time_ms'] = round(s['time_ms'], 2)
+        return {'http': http, 'db': db}
+
+    @staticmethod
+    def latency_percentile(stats, p):
+        """Upper bound of the histogram bucket holding the p-th percentile call (max_ms for the open bucket)."""
+        calls = sum(stats['buckets'])
+        if not calls:
+            return None
+        rank, seen = p * calls, 0
+        for i, count in enumerate(stats['buckets']):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else stats['max_ms']
+        return stats['max_ms']
+
+    @staticmethod
+    def _empty_http():
+        return {'calls': 0, 'errors': 0, 'time_ms': 0.0, 'max_ms': 0.0,
+                'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1)}
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        # A connection runs one statement at a time
+        conn.info['telemetry_started'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    telemetry = _current.get()
+    started = conn.info.pop('telemetry_started', None)
+    if telemetry is not None and started is not None:
+        telemetry.record_sql((time.perf_counter() - started) * 1000)
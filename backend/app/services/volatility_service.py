@@ -1,5 +1,40 @@
+import numpy as np
 from config import Config
 
+
+class PriceSnapshot:
+    """
+    Columnar view of one tick's quotes: position i in every array is coin_ids[i].
+    Missing change values are stored as 0 so they never trip a threshold.
+    """
+
+    def __init__(self, coin_ids, price, change_1h, change_24h):
+        self.coin_ids = coin_ids
+        self.price = price
+        self.change_1h = change_1h
+        self.change_24h = change_24h
+
+    @classmethod
+    def from_prices(cls, prices):
+        """Build a snapshot from a CoinGeckoService.get_prices() result."""
+        coin_ids = list(prices)
+        quotes = [prices[cid] for cid in coin_ids]
+
+        def column(key):
+            values = np.array([q.get(key) for q in quotes], dtype=np.float64)
+            return np.nan_to_num(values, nan=0.0)
+
+        return cls(
+            coin_ids,
+            column('current_price'),
+            column('price_change_percentage_1h_in_currency'),
+            column('price_change_percentage_24h_in_currency')
+        )
+
+    def __len__(self):
+        return len(self.coin_ids)
+
+
 class VolatilityService:
     @staticmethod
     def check_volatility(coin_data):
@@ -7,24 +42,62 @@ class VolatilityService:
         Check if the coin data indicates high volatility.
         Returns a list of alerts.
         """
+        change_1h = coin_data.get('price_change_percentage_1h_in_currency', 0) or 0
+        change_24h = coin_data.get('price_change_percentage_24h_in_currency', 0) or 0
+
+        return VolatilityService._build_alerts(
+            change_1h, change_24h,
+            abs(change_1h) >= Config.VOLATILITY_1H_THRESHOLD,
+            abs(change_24h) >= Config.VOLATILITY_24H_THRESHOLD
+        )
+
+    @staticmethod
+    def flag(snapshot):
+        """
+        Evaluate every threshold rule over the whole snapshot at once.
+        Returns (flagged indices, 1h mask, 24h mask).
+        """
+        mask_1h = np.abs(snapshot.change_1h) >= Config.VOLATILITY_1H_THRESHOLD
+        mask_24h = np.abs(snapshot.change_24h) >= Config.VOLATILITY_24H_THRESHOLD
+        return np.flatnonzero(mask_1h | mask_24h), mask_1h, mask_24h
+
+    @staticmethod
+    def check_snapshot(snapshot):
+        """
+        check_volatility over a whole PriceSnapshot; same alerts as calling it
+        per quote. Returns {coin_id: [alerts]} for flagged coins only.
+        Building the snapshot and the alert dicts costs about as much as the
+        per-quote loop, so this is not faster end to end; only flag() on an
+        already built snapshot is cheap.
+        """
+        if not len(snapshot):
+            return {}
+
+        flagged, mask_1h, mask_24h = VolatilityService.flag(snapshot)
+        return {
+            snapshot.coin_ids[i]: VolatilityService._build_alerts(
+                float(snapshot.change_1h[i]), float(snapshot.change_24h[i]),
+                bool(mask_1h[i]), bool(mask_24h[i])
+            )
+            for i in flagged
+        }
+
+    @staticmethod
+    def _build_alerts(change_1h, change_24h, hit_1h, hit_24h):
         alerts = []
-        coin_id = coin_data.get('id') # This might need to be passed separately if data is just metrics
-        
-        change_1h = coin_data.get('price_change_percentage_1h_in_currency', 0)
-        change_24h = coin_data.get('price_change_percentage_24h_in_currency', 0)
-        
-        if abs(change_1h) >= Config.VOLATILITY_1H_THRESHOLD:
+
+        if hit_1h:
             alerts.append({
                 'type': '1h_volatility',
                 'change': change_1h,
                 'message': f"{'UP' if change_1h > 0 else 'DOWN'} {change_1h:.2f}% in 1h"
             })
-            
-        if abs(change_24h) >= Config.VOLATILITY_24H_THRESHOLD:
+
+        if hit_24h:
             alerts.append({
                 'type': '24h_volatility',
                 'change': change_24h,
                 'message': f"{'UP' if change_24h > 0 else 'DOWN'} {change_24h:.2f}% in 24h"
             })
-            
+
         return alerts
@@ -1,9 +1,12 @@
-import requests
 from config import Config
+from app.services.http_client import HttpClient
+from app.services.rate_limiter import RateLimiter, parse_retry_after
+from app.services.single_flight import coalesce
 
 class WalletService:
     BASE_URL_EVM = "https://deep-index.moralis.io/api/v2.2"
     BASE_URL_SOL = "https://solana-gateway.moralis.io"
+    BASE_URL_BTC = "https://api.blockcypher.com/v1/btc/main"
 
     # Static mapping for common native tokens to CoinGecko IDs
     NATIVE_MAPPING = {
@@ -37,6 +40,25 @@ class WalletService:
             "X-API-Key": Config.MORALIS_API_KEY
         }
 
+    @staticmethod
+    def provider_for_chain(chain):
+        """Balance provider serving `chain`; keys WALLET_PROVIDER_* limits."""
+        if chain == 'sol':
+            return 'moralis_sol'
+        if chain == 'btc':
+            return 'blockcypher'
+        return 'moralis_evm'
+
+    @staticmethod
+    def _get(provider, url, **kwargs):
+        """GET through the provider's token bucket; a 429 pauses the bucket for everyone."""
+        bucket = RateLimiter.for_provider(provider)
+        bucket.acquire()
+        response = HttpClient.get(url, **kwargs)
+        if response.status_code == 429:
+            bucket.penalize(parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
     @staticmethod
     def map_token_to_coingecko(symbol, name):
         symbol = symbol.upper()
@@ -45,6 +67,8 @@ class WalletService:
         return name.lower().replace(" ", "-")
 
     @staticmethod
+    # Base58 (SOL/BTC) addresses are case-sensitive, so only the chain is normalized
+    @coalesce('wallet.balances', key=lambda address, chain: (address.strip(), chain.lower()))
     def fetch_wallet_balances(address, chain):
         """
         Fetch native and token balances for a given address and chain.
@@ -60,7 +84,7 @@ class WalletService:
             if chain == 'sol':
                 # --- SOLANA ---
                 url = f"{WalletService.BASE_URL_SOL}/account/mainnet/{address}/portfolio"
-                response = requests.get(url, headers=headers)
+                response = WalletService._get('moralis_sol', url, headers=headers)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -82,23 +106,8 @@ class WalletService:
                 # --- BITCOIN (Via BlockCypher Free API) ---
                 # Moralis EVM API does not support BTC native. Using BlockCypher as fallback.
                 try:
-                    url = f"https://api.blockcypher.com/v1/btc/main/addrs/{address}/balance"
-                    resp = requests.get(url, timeout=10)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        # BlockCypher returns satoshis
-                        btc_bal = data.get('final_balance', 0) / 100_000_000
-                        if btc_bal > 0:
-                            holdings.append({'coin_id': 'bitcoin', 'amount': btc_bal, 'chain': 'btc'})
-                except Exception as e:
-                    print(f"BTC Fetch Error: {e}")
-
-            elif chain == 'btc':
-                # --- BITCOIN (Via BlockCypher Free API) ---
-                # Moralis EVM API does not support BTC native. Using BlockCypher as fallback.
-                try:
-                    url = f"https://api.blockcypher.com/v1/btc/main/addrs/{address}/balance"
-                    resp = requests.get(url, timeout=10)
+                    url = f"{WalletService.BASE_URL_BTC}/addrs/{address}/balance"
+                    resp = WalletService._get('blockcypher', url, timeout=10)
                     if resp.status_code == 200:
                         data = resp.json()
                         # BlockCypher returns satoshis
@@ -118,7 +127,7 @@ class WalletService:
                 # 1. Native Balance
                 url_native = f"{WalletService.BASE_URL_EVM}/{address}/balance"
                 params = {'chain': chain_hex}
-                resp_native = requests.get(url_native, headers=headers, params=params)
+                resp_native = WalletService._get('moralis_evm', url_native, headers=headers, params=params)
                 if resp_native.status_code == 200:
                     native_bal = float(resp_native.json().get('balance', 0)) / 10**18
                     if native_bal > 0:
@@ -127,7 +136,7 @@ class WalletService:
 
                 # 2. ERC20 Token Balances
                 url_tokens = f"{WalletService.BASE_URL_EVM}/{address}/erc20"
-                resp_tokens = requests.get(url_tokens, headers=headers, params=params)
+                resp_tokens = WalletService._get('moralis_evm', url_tokens, headers=headers, params=params)
                 if resp_tokens.status_code == 200:
                     tokens = resp_tokens.json()
                     for token in tokens:
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from app.extensions import db
+from app.models import Wallet
+from app.services.holding_service import HoldingService
+from app.services.telemetry import Telemetry
+from app.services.wallet_service import WalletService
+from config import Config
+
+
+class WalletSyncService:
+    """
+    Parallel wallet balance sync.
+
+    Balance fetches run on a pool of WALLET_SYNC_WORKERS threads. Each
+    provider (Moralis EVM, Moralis Solana, BlockCypher) has its own semaphore
+    capping wallets in flight, on top of the per-provider token bucket in
+    WalletService, so a slow or strict provider can't starve the others.
+    Fetch threads never touch the session: results are handed back and
+    written by the calling thread only (single writer).
+
+    Which wallets a run syncs is driven by staleness: see due_wallet_ids().
+    """
+    # Provider calls one sync costs (EVM: native balance + ERC20 list)
+    CALLS_PER_SYNC = {'moralis_evm': 2, 'moralis_sol': 1, 'blockcypher': 1}
+    _semaphores = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def sync(cls, wallets):
+        """
+        Fetch and store balances for `wallets` (Wallet rows). The caller owns
+        the transaction. Returns counters for the cron results.
+        """
+        stats = {'wallets_synced': 0, 'wallets_changed': 0, 'tokens_seen': 0, 'fetch_ms': 0.0, 'db_time_ms': 0.0}
+        if not wallets:
+            return stats
+
+        # Plain tuples for the worker threads; ORM objects stay on this thread
+        jobs = {w.id: (w.address, w.chain) for w in wallets}
+        by_id = {w.id: w for w in wallets}
+        prunable = HoldingService.single_wallet_chains({w.user_id for w in wallets})
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=min(Config.WALLET_SYNC_WORKERS, len(jobs))) as pool:
+            futures = {
+                Telemetry.submit(pool, cls._fetch, address, chain): wallet_id
+                for wallet_id, (address, chain) in jobs.items()
+            }
+            for future in as_completed(futures):
+                wallet = by_id[futures[future]]
+                try:
+                    holdings_data = future.result()
+                except Exception as e:
+                    print(f"Wallet Sync Error ({wallet.chain}:{wallet.address[:8]}): {e}")
+                    continue
+
+                db_start = time.perf_counter()
+                changed = cls._write(wallet, holdings_data,
+                                     prune=(wallet.user_id, wallet.chain) in prunable)
+                stats['db_time_ms'] += (time.perf_counter() - db_start) * 1000
+                cls.reschedule(wallet, changed)
+                stats['wallets_synced'] += 1
+                stats['wallets_changed'] += int(changed)
+                stats['tokens_seen'] += len(holdings_data)
+
+        stats['fetch_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        stats['db_time_ms'] = round(stats['db_time_ms'], 2)
+        return stats
+
+    @classmethod
+    def due_wallet_ids(cls, now=None, budget=None):
+        """
+        Wallets due for a sync, most overdue first, up to `budget` provider
+        calls (WALLET_SYNC_BUDGET). Wallets past the budget stay due and lead
+        the next run.
+        """
+        now = now or datetime.utcnow()
+        budget = budget if budget is not None else Config.WALLET_SYNC_BUDGET
+
+        rows = db.session.query(Wallet.id, Wallet.chain) \
+            .filter(or_(Wallet.next_sync_at <= now, Wallet.next_sync_at.is_(None))) \
+            .order_by(Wallet.next_sync_at, Wallet.id) \
+            .limit(budget).all()
+
+        wallet_ids, spent = [], 0
+        for wallet_id, chain in rows:
+            cost = cls.CALLS_PER_SYNC.get(WalletService.provider_for_chain(chain), 1)
+            if spent + cost > budget:
+                break
+            wallet_ids.append(wallet_id)
+            spent += cost
+        return wallet_ids
+
+    @staticmethod
+    def promote(user_id):
+        """A user command touched these wallets: make them due on the next run."""
+        Wallet.query.filter(Wallet.user_id == user_id, Wallet.next_sync_at > datetime.utcnow()) \
+            .update({Wallet.next_sync_at: datetime.utcnow()}, synchronize_session=False)
+
+    @classmethod
+    def sync_ids(cls, wallet_ids):
+        wallets = Wallet.query.filter(Wallet.id.in_(wallet_ids)).all()
+        return cls.sync(wallets)
+
+    @classmethod
+    def _fetch(cls, address, chain):
+        with cls._semaphore(WalletService.provider_for_chain(chain)):
+            return WalletService.fetch_wallet_balances(address, chain) or []
+
+    @classmethod
+    def _semaphore(cls, provider):
+        sem = cls._semaphores.get(provider)
+        if sem is None:
+            with cls._lock:
+                sem = cls._semaphores.get(provider)
+                if sem is None:
+                    limit = Config.WALLET_PROVIDER_CONCURRENCY.get(provider, 4)
+                    sem = threading.BoundedSemaphore(limit)
+                    cls._semaphores[provider] = sem
+        return sem
+
+    @staticmethod
+    def reschedule(wallet, changed, now=None):
+        """Reset to the minimum interval after a change, otherwise double it."""
+        now = now or datetime.utcnow()
+        if changed:
+            interval = Config.WALLET_SYNC_MIN_INTERVAL
+            wallet.last_changed_at = now
+        else:
+            interval = min((wallet.sync_interval or Config.WALLET_SYNC_MIN_INTERVAL) * 2,
+                           Config.WALLET_SYNC_MAX_INTERVAL)
+        wallet.sync_interval = interval
+        wallet.next_sync_at = now + timedelta(seconds=interval)
+
+    @staticmethod
+    def _write(wallet, holdings_data, prune=False):
+        """Bulk upsert the wallet's token set; returns True if any balance changed."""
+        _, _, changed = HoldingService.replace_wallet_holdings(
+            wallet.user_id, wallet.chain, holdings_data, prune=prune
+        )
+        wallet.last_synced_at = datetime.utcnow()
+        return changed
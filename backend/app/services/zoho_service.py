@@ -1,5 +1,6 @@
-import requests
 from config import Config
+from app.services.http_client import HttpClient
+from app.utils import format_currency
 
 class ZohoService:
     """
@@ -24,16 +25,9 @@ class ZohoService:
         # https://cliq.zoho.com/api/v2/channels/{channel_id}/message?zapikey={bot_token}
         # But usually bots post to the channel context they are in.
         
-        # If we have a channel_id (chat_id), we can target it.
-        url = f"{ZohoService.BASE_URL}/channels/{channel_id}/message"
-        
-        params = {
-            "zapikey": Config.BOT_TOKEN
-        }
-        
         # message_data should be the JSON body expected by Zoho Cliq
         try:
-            response = requests.post(url, params=params, json=message_data)
+            response = ZohoService.post_message(channel_id, message_data)
             response.raise_for_status()
             return True
         except Exception as e:
@@ -43,7 +37,20 @@ class ZohoService:
             return False
 
     @staticmethod
-    def format_alert_message(coin, alert, reasons, current_price):
+    def post_message(channel_id, message_data, timeout=None):
+        """
+        POST a message to a channel and return the raw response (no error
+        handling), for callers that act on the status, e.g. 429 Retry-After.
+        """
+        # If we have a channel_id (chat_id), we can target it.
+        url = f"{ZohoService.BASE_URL}/channels/{channel_id}/message"
+        params = {
+            "zapikey": Config.BOT_TOKEN
+        }
+        return HttpClient.post(url, params=params, json=message_data, timeout=timeout)
+
+    @staticmethod
+    def format_alert_message(coin, alert, reasons, current_price, currency='usd'):
         change_emoji = "📈" if alert['change'] > 0 else "📉"
         reasons_text = "\n".join([f"• [{r['title']}]({r['url']})" for r in reasons[:3]])
         
@@ -57,7 +64,7 @@ class ZohoService:
                 {
                     "type": "label",
                     "data": [
-                        {"label": "Price", "value": f"${current_price}"},
+                        {"label": "Price", "value": format_currency(current_price, currency)},
                         {"label": "Change", "value": f"{alert['change']:.2f}%"}
                     ]
                 },
@@ -68,3 +75,63 @@ class ZohoService:
                 }
             ]
         }
+
+    @staticmethod
+    def format_alert_digest(items, currency='usd'):
+        """
+        One card for all of a user's alerts in a tick. `items` is a list of
+        (coin, alerts, reasons, current_price). Coins are ordered by their
+        largest move; the first ALERT_DIGEST_MAX_COINS get the price slide of
+        format_alert_message (with one change per alert), the biggest mover
+        keeps its reasons slide, and the next ALERT_DIGEST_OVERFLOW_COINS are
+        summarised on one line each, followed by a count of any others.
+        A single alert is sent as the regular alert card.
+        """
+        if len(items) == 1 and len(items[0][1]) == 1:
+            coin, alerts, reasons, price = items[0]
+            return ZohoService.format_alert_message(coin, alerts[0], reasons, price, currency)
+
+        def strongest(alerts):
+            return max(alerts, key=lambda a: abs(a['change']))
+
+        items = sorted(items, key=lambda item: abs(strongest(item[1])['change']), reverse=True)
+        shown, overflow = items[:Config.ALERT_DIGEST_MAX_COINS], items[Config.ALERT_DIGEST_MAX_COINS:]
+        alert_count = sum(len(alerts) for _, alerts, _, _ in items)
+
+        slides = []
+        for i, (coin, alerts, reasons, price) in enumerate(shown):
+            top = strongest(alerts)
+            price_slide, reasons_slide = ZohoService.format_alert_message(coin, top, reasons, price, currency)["slides"]
+            price_slide["title"] = f"{'📈' if top['change'] > 0 else '📉'} {coin.upper()}"
+            if len(alerts) > 1:
+                # "Change" -> one row per timeframe ("1h Change", "24h Change")
+                price_slide["data"] = price_slide["data"][:1] + [
+                    {"label": f"{a['type'].split('_')[0]} Change", "value": f"{a['change']:.2f}%"} for a in alerts
+                ]
+            slides.append(price_slide)
+            if i == 0 and reasons:
+                reasons_slide["title"] = f"Possible Reasons ({coin.upper()})"
+                slides.append(reasons_slide)
+
+        if overflow:
+            # Bounded however many coins alert, to stay within Cliq's payload limit
+            listed = overflow[:Config.ALERT_DIGEST_OVERFLOW_COINS]
+            summary = ", ".join(f"{coin.upper()} {strongest(alerts)['change']:+.2f}%" for coin, alerts, _, _ in listed)
+            if len(overflow) > len(listed):
+                summary += f" …and {len(overflow) - len(listed)} more"
+            slides.append({
+                "type": "text",
+                "title": f"+{len(overflow)} more",
+                "data": summary
+            })
+
+        headline = ", ".join(f"{coin.upper()} {strongest(alerts)['change']:+.2f}%" for coin, alerts, _, _ in shown[:3])
+        return {
+            "text": f"🚨 **{alert_count} alerts on {len(items)} coins:** {headline}"
+                    + (" …" if len(items) > 3 else ""),
+            "card": {
+                "title": f"📊 Portfolio Alerts ({len(items)} coins)",
+                "theme": "modern-inline"
+            },
+            "slides": slides
+        }
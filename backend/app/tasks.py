@@ -0,0 +1,176 @@
+"""
+Job handlers for the scheduled run. `start_run()` splits one cron tick into
+jobs per stage (coin index refresh, wallet_sync per chunk of wallets,
+price_batch per chunk of held coins, news refresh, history rollup); each
+price_batch with volatile coins enqueues one alert_fanout covering all of
+them. Workers (python worker.py) execute them through HANDLERS. The
+scheduler (python -m app.worker) starts stages on their own cadences.
+"""
+import time
+import uuid
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Holding, Price
+from app.services.alert_service import AlertService
+from app.services.coin_index import CoinIndex
+from app.services.coingecko_service import CoinGeckoService
+from app.services.job_queue import JobQueue
+from app.services.news_service import NewsService
+from app.services.price_history_service import PriceHistoryService
+from app.services.price_service import PriceService
+from app.services.run_lock import RunLockService
+from app.services.telemetry import Telemetry
+from app.services.volatility_service import VolatilityService, PriceSnapshot
+from app.services.wallet_sync_service import WalletSyncService
+from config import Config
+
+# What /api/cron/run-tasks runs. News is refreshed on demand unless the
+# scheduler runs the 'news' stage.
+DEFAULT_STAGES = ('coin_index', 'wallets', 'prices', 'history')
+
+
+def start_run(stages=None):
+    """
+    Enqueue the jobs of one scheduled run for `stages` (default: all of
+    DEFAULT_STAGES) and return (run_id, job count). Raises RunInProgress if
+    the previous run of the same stages still has unfinished jobs; the run
+    lock commits together with the jobs. Only wallets due by staleness
+    (within the provider-call budget) are synced. Price batches cover the
+    coins held right now; coins a wallet sync adds in this run are priced
+    from the next run on.
+    """
+    stages = tuple(stages or DEFAULT_STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    run_id = uuid.uuid4().hex
+    lock = 'cron' if set(stages) == set(DEFAULT_STAGES) else 'stage:' + '+'.join(sorted(stages))
+    RunLockService.acquire(run_id, name=lock)
+
+    count = sum(STAGES[stage](run_id) for stage in stages)
+    db.session.commit()
+    return run_id, count
+
+
+def _enqueue_coin_index(run_id):
+    if not CoinIndex.is_refresh_due():
+        return 0
+    JobQueue.enqueue('coin_index_refresh', run_id=run_id, max_attempts=2)
+    return 1
+
+
+def _enqueue_wallets(run_id):
+    wallet_ids = WalletSyncService.due_wallet_ids()
+    size = Config.WALLET_JOB_CHUNK_SIZE
+    count = 0
+    for i in range(0, len(wallet_ids), size):
+        JobQueue.enqueue('wallet_sync', {'wallet_ids': wallet_ids[i:i + size]}, run_id=run_id)
+        count += 1
+    return count
+
+
+def _enqueue_prices(run_id):
+    holdings = Holding.query.with_entities(Holding.coin_id).distinct().all()
+    coin_ids = sorted({h.coin_id.lower() for h in holdings})
+    size = Config.PRICE_JOB_BATCH_SIZE
+    count = 0
+    for i in range(0, len(coin_ids), size):
+        JobQueue.enqueue('price_batch', {'coin_ids': coin_ids[i:i + size]}, run_id=run_id)
+        count += 1
+    return count
+
+
+def _enqueue_news(run_id):
+    JobQueue.enqueue('news_refresh', run_id=run_id, max_attempts=2)
+    return 1
+
+
+def _enqueue_history(run_id):
+    JobQueue.enqueue('history_rollup', run_id=run_id, max_attempts=2)
+    return 1
+
+
+STAGES = {
+    'coin_index': _enqueue_coin_index,
+    'wallets': _enqueue_wallets,
+    'prices': _enqueue_prices,
+    'news': _enqueue_news,
+    'history': _enqueue_history,
+}
+
+
+def refresh_coin_index(payload, job):
+    return {'coin_index_size': CoinGeckoService.refresh_coin_index()}
+
+
+def sync_wallets(payload, job):
+    """Sync one chunk of wallets in parallel (per-provider caps in WalletSyncService)."""
+    return WalletSyncService.sync_ids(payload['wallet_ids'])
+
+
+def check_price_batch(payload, job):
+    """Fetch, store and evaluate one batch of coins; fan out its alerts as one job."""
+    prices = CoinGeckoService.get_prices(payload['coin_ids'], use_cache=False)
+
+    # Writes are bulk statements; commit happens with the job's completion
+    db_start = time.perf_counter()
+    PriceHistoryService.record(prices)
+    PriceService.save_quotes(prices)
+    db_time_ms = (time.perf_counter() - db_start) * 1000
+
+    flagged = VolatilityService.check_snapshot(PriceSnapshot.from_prices(prices))
+    if flagged:
+        JobQueue.enqueue('alert_fanout', {
+            'coins': {
+                coin_id: {'quote': prices[coin_id], 'alerts': volatility_alerts}
+                for coin_id, volatility_alerts in flagged.items()
+            }
+        }, run_id=job.run_id)
+
+    # Counted in this job's telemetry: the process-wide counter also sees
+    # jobs running on other worker threads
+    telemetry = Telemetry.current()
+    return {
+        'prices_checked': len(prices),
+        'coingecko_requests': telemetry.calls('coingecko') if telemetry else None,
+        'coins_flagged': len(flagged),
+        'db_time_ms': round(db_time_ms, 2)
+    }
+
+
+def fan_out_alerts(payload, job):
+    """Notify holders of every coin in the batch off one coin->holders index."""
+    coins = payload['coins']
+    flagged = {coin_id: entry['alerts'] for coin_id, entry in coins.items()}
+    prices = {coin_id: entry['quote'] for coin_id, entry in coins.items()}
+    return {'alerts_sent': AlertService.notify_many(flagged, prices)}
+
+
+def refresh_news(payload, job):
+    """
+    Refresh expired news_cache entries for the most widely held coins (up
+    to NEWS_REFRESH_MAX_SYMBOLS), so alerts and /reasons find them warm.
+    """
+    holders = func.count(func.distinct(Holding.user_id))
+    rows = db.session.query(Price.symbol) \
+        .join(Holding, Holding.coin_id == Price.coin_id) \
+        .filter(Price.symbol.isnot(None), Price.symbol != '') \
+        .group_by(Price.symbol).order_by(holders.desc()) \
+        .limit(Config.NEWS_REFRESH_MAX_SYMBOLS).all()
+    symbols = [symbol for (symbol,) in rows]
+    return {'news_symbols': len(NewsService.get_news(symbols))}
+
+
+def rollup_history(payload, job):
+    return PriceHistoryService.rollup()
+
+
+HANDLERS = {
+    'coin_index_refresh': refresh_coin_index,
+    'wallet_sync': sync_wallets,
+    'price_batch': check_price_batch,
+    'alert_fanout': fan_out_alerts,
+    'news_refresh': refresh_news,
+    'history_rollup': rollup_history,
+}
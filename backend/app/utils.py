@@ -1,3 +1,88 @@
 # Utility functions can go here
-def format_currency(value):
-    return f"${value:,.2f}"
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+
+CURRENCY_SYMBOLS = {
+    'usd': '$', 'inr': '₹', 'eur': '€', 'gbp': '£', 'jpy': '¥', 'cny': '¥',
+    'krw': '₩', 'rub': '₽', 'try': '₺', 'brl': 'R$', 'aud': 'A$', 'cad': 'C$',
+    'btc': '₿', 'eth': 'Ξ'
+}
+
+def currency_symbol(currency):
+    currency = (currency or 'usd').lower()
+    return CURRENCY_SYMBOLS.get(currency, currency.upper() + ' ')
+
+def format_currency(value, currency='usd'):
+    return f"{currency_symbol(currency)}{value:,.2f}"
+
+def sum_numeric(dicts):
+    """Key-wise sum of the int/float values of several dicts (bools and other values are skipped)."""
+    totals = {}
+    for d in dicts:
+        for key, value in (d or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+def percentile(values, p):
+    """Nearest-rank percentile of `values` (None when empty)."""
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+def bulk_upsert(session, model, rows, key_columns, update_columns=None, chunk_size=500):
+    """
+    INSERT ... ON CONFLICT (key_columns) DO UPDATE for a list of row dicts,
+    executed as one executemany per `chunk_size` rows (SQLAlchemy packs these
+    into multi-row statements). Supports Postgres and SQLite (3.24+).
+    `session` is a Session or a Connection. `key_columns` must match a unique
+    constraint, and rows must not repeat a key within one call. With
+    `update_columns=[]` existing rows are left alone (ON CONFLICT DO NOTHING).
+    Other dialects fall back to a per-row ORM merge (Session only).
+    Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+
+    if update_columns is None:
+        update_columns = [c for c in rows[0] if c not in key_columns]
+
+    bind = session.get_bind() if hasattr(session, 'get_bind') else session
+    dialect = bind.dialect.name
+    if dialect == 'postgresql':
+        insert = postgresql.insert
+    elif dialect == 'sqlite':
+        insert = sqlite.insert
+    elif isinstance(session, Connection):
+        raise ValueError(f"bulk_upsert on {dialect} needs an ORM Session, not a Connection")
+    else:
+        return _merge_rows(session, model, rows, key_columns, update_columns)
+
+    stmt = insert(model.__table__)
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={c: stmt.excluded[c] for c in update_columns}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=key_columns)
+    for i in range(0, len(rows), chunk_size):
+        session.execute(stmt, rows[i:i + chunk_size])
+    return len(rows)
+
+def _merge_rows(session, model, rows, key_columns, update_columns):
+    """
+    bulk_upsert for dialects without ON CONFLICT: a SELECT and an ORM insert
+    or update per row. Unlike the single statement, two writers inserting
+    the same new key at once can still hit the unique constraint.
+    """
+    for row in rows:
+        existing = session.query(model).filter_by(**{c: row[c] for c in key_columns}).first()
+        if existing is None:
+            session.add(model(**row))
+        else:
+            for c in update_columns:
+                setattr(existing, c, row[c])
+    session.flush()
+    return len(rows)
@@ -0,0 +1,143 @@
+"""
+Built-in scheduler: starts each stage of the scheduled run on its own
+cadence instead of relying on an external cron hitting /api/cron/run-tasks.
+
+    python -m app.worker [--stages prices,wallets] [--workers 1] [--no-relay]
+
+Intervals come from SCHEDULE_INTERVALS (prices every minute, wallets every
+15 min, news every 10 min by default), each randomised by SCHEDULE_JITTER.
+A stage only enqueues its jobs; by default this process also runs job
+worker and outbox relay threads, so it is all a small deployment needs.
+With separate worker.py / relay.py processes, pass --workers 0 --no-relay.
+
+Missed runs: on start-up a stage whose last start (its run lock) is older
+than its interval runs at once, otherwise it resumes its old cadence. A
+stage that falls behind (slow enqueue, suspended host) runs once, not once
+per missed interval, and a stage whose previous run is still going is
+skipped until its next turn.
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+import schedule
+from app import create_app, db, tasks
+from app.models import RunLock
+from app.services.job_queue import JobWorker
+from app.services.outbox_relay import OutboxRelay
+from app.services.run_lock import RunInProgress
+from config import Config
+
+
+class StageScheduler:
+    def __init__(self, app, intervals=None, jitter=None):
+        self.app = app
+        intervals = Config.SCHEDULE_INTERVALS if intervals is None else intervals
+        self.intervals = {stage: seconds for stage, seconds in intervals.items() if seconds > 0}
+        unknown = set(self.intervals) - set(tasks.STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+        self.jitter = Config.SCHEDULE_JITTER if jitter is None else jitter
+        self.scheduler = schedule.Scheduler()
+        self._stop = threading.Event()
+
+    def setup(self):
+        """Register every stage; stages overdue since the last process ran are due immediately."""
+        last_started = self.last_started()
+        now = datetime.utcnow()
+        for stage, seconds in sorted(self.intervals.items()):
+            low = max(1, round(seconds * (1 - self.jitter)))
+            high = max(low, round(seconds * (1 + self.jitter)))
+            job = self.scheduler.every(low).to(high).seconds.do(self.run_stage, stage)
+
+            started = last_started.get(stage)
+            remaining = seconds - (now - started).total_seconds() if started else 0
+            # schedule works in local time; the jitter also spreads stages that are due together
+            job.next_run = datetime.now() + timedelta(seconds=max(0, remaining) + random.uniform(0, seconds * self.jitter))
+            print(f"🗓️ {stage}: every {low}-{high}s, next in {max(0, round(remaining))}s")
+
+    def last_started(self):
+        """{stage: start of its last run}, from the stage run locks."""
+        rows = db.session.query(RunLock.name, RunLock.acquired_at) \
+            .filter(RunLock.name.in_([f"stage:{stage}" for stage in self.intervals])).all()
+        db.session.commit()
+        return {name.split(':', 1)[1]: acquired_at for name, acquired_at in rows if acquired_at}
+
+    def run_stage(self, stage):
+        try:
+            run_id, count = tasks.start_run([stage])
+            print(f"⏱️ {stage}: run {run_id[:8]} queued {count} jobs")
+        except RunInProgress as e:
+            db.session.rollback()
+            print(f"⏭️ {stage}: previous run {e.run_id[:8] if e.run_id else '?'} still in progress, skipping")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ {stage}: failed to start run: {e}")
+
+    def run(self):
+        self.setup()
+        while not self._stop.is_set():
+            self.scheduler.run_pending()
+            idle = self.scheduler.idle_seconds
+            self._stop.wait(1 if idle is None else min(max(idle, 0), 1))
+
+    def stop(self):
+        self._stop.set()
+
+
+def _in_app_context(app, target):
+    def run():
+        with app.app_context():
+            target()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scheduled stages on their own cadences.")
+    parser.add_argument('--stages', help="Comma-separated stages to schedule (default: all in SCHEDULE_INTERVALS)")
+    parser.add_argument('--workers', type=int, default=1, help="Job worker threads in this process (0 = none)")
+    parser.add_argument('--no-relay', action='store_true', help="Don't deliver alerts from this process")
+    args = parser.parse_args()
+
+    intervals = Config.SCHEDULE_INTERVALS
+    if args.stages:
+        wanted = {s.strip() for s in args.stages.split(',') if s.strip()}
+        unknown = wanted - set(tasks.STAGES)
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(tasks.STAGES)})")
+        intervals = {stage: seconds for stage, seconds in intervals.items() if stage in wanted}
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        scheduler = StageScheduler(app, intervals)
+        if not scheduler.intervals:
+            print("⚠️ No stages scheduled: all selected stages are disabled in SCHEDULE_INTERVALS")
+
+        services = [JobWorker(tasks.HANDLERS, worker_id=f"{socket.gethostname()}:{os.getpid()}:{i}")
+                    for i in range(args.workers)]
+        if not args.no_relay:
+            services.append(OutboxRelay())
+        threads = [threading.Thread(target=_in_app_context(app, s.run), daemon=True) for s in services]
+
+        def shutdown(signum, frame):
+            scheduler.stop()
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        for t in threads:
+            t.start()
+        try:
+            scheduler.run()
+        finally:
+            for s in services:
+                s.stop()
+            for t in threads:
+                t.join(timeout=60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""Shared base for the unittest cases that need the Flask app and a database."""
+import unittest
+from config import Config
+from app import create_app, db
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+
+
+class AppTestCase(unittest.TestCase):
+    """
+    Runs every test inside an app context on a fresh in-memory database.
+    Subclasses that extend setUp/tearDown call super() first/last.
+    """
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
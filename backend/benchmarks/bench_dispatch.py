@@ -0,0 +1,88 @@
+"""
+Cliq alert delivery: the old inline send_message loop vs NotificationDispatcher,
+against a local Cliq stub with latency, a rate limit and random 5xx errors.
+
+Reports how long the caller is blocked (the cron tick), time until every
+message is delivered, enqueue-to-delivery latency, retries, 429s, and
+whether each channel received its messages in order.
+
+Usage (from backend/):
+    python -m benchmarks.bench_dispatch --messages 400 --channels 50 --latency 0.2
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.rate_limiter import RateLimiter
+from app.services.zoho_service import ZohoService
+from benchmarks.stubs import StubServer, cliq_stub
+
+
+def in_order(received):
+    return all(seqs == sorted(seqs) for seqs in received.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=400)
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--stub-rpm', type=int, default=3000, help='stub rate limit (0 = none)')
+    parser.add_argument('--cliq-rpm', type=int, default=Config.CLIQ_RATE_LIMIT, help='our send budget (CLIQ_RATE_LIMIT)')
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--legacy-sample', type=int, default=50, help='messages timed on the old loop')
+    args = parser.parse_args()
+
+    Config.BOT_TOKEN = Config.BOT_TOKEN or 'bench'
+    Config.BOT_ID = Config.BOT_ID or 'bench'
+    Config.CLIQ_RETRY_BASE_SECONDS = 0.2
+    Config.CLIQ_RATE_LIMIT = args.cliq_rpm
+    messages = [(f"ch{i % args.channels}", {'text': f"alert {i}", 'seq': i}) for i in range(args.messages)]
+
+    # Legacy: synchronous send per alert, on a sample
+    handler = cliq_stub(args.latency, args.stub_rpm or None, args.error_rate)
+    with StubServer(handler) as cliq, contextlib.redirect_stdout(io.StringIO()):
+        ZohoService.BASE_URL = cliq.url
+        sample = messages[:args.legacy_sample]
+        start = time.perf_counter()
+        legacy_ok = sum(bool(ZohoService.send_message(ch, payload)) for ch, payload in sample)
+        legacy_time = time.perf_counter() - start
+
+    # Dispatcher
+    handler = cliq_stub(args.latency, args.stub_rpm or None, args.error_rate)
+    with StubServer(handler) as cliq, contextlib.redirect_stdout(io.StringIO()):
+        ZohoService.BASE_URL = cliq.url
+        RateLimiter.reset()
+        NotificationDispatcher.reset()
+        start = time.perf_counter()
+        for ch, payload in messages:
+            NotificationDispatcher.submit(ch, payload)
+        enqueue_time = time.perf_counter() - start
+        NotificationDispatcher.drain()
+        total_time = time.perf_counter() - start
+        stats = NotificationDispatcher.get_stats()
+        NotificationDispatcher.reset()
+
+    legacy_rate = len(sample) / legacy_time
+    print(f"messages={args.messages} channels={args.channels} latency={args.latency}s "
+          f"stub_rpm={args.stub_rpm or 'none'} cliq_rpm={args.cliq_rpm} error_rate={args.error_rate} workers={Config.CLIQ_DISPATCH_WORKERS}")
+    print(f"  inline loop : {legacy_rate:7.1f} msg/s, caller blocked {args.messages / legacy_rate:7.2f}s "
+          f"(projected), {len(sample) - legacy_ok}/{len(sample)} lost to errors")
+    print(f"  dispatcher  : {stats['sent'] / total_time:7.1f} msg/s, caller blocked {enqueue_time * 1000:7.2f}ms, "
+          f"all delivered in {total_time:.2f}s")
+    print(f"  latency     : p50={stats['latency_ms']['p50']}ms p95={stats['latency_ms']['p95']}ms "
+          f"max={stats['latency_ms']['max']}ms")
+    print(f"  outcomes    : sent={stats['sent']} retried={stats['retried']} 429s={stats['rate_limited']} "
+          f"dead-lettered={stats['dead_lettered']}")
+    print(f"  per-channel order preserved: {in_order(handler.stats.get('received', {}))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Wall time of CoinGeckoService price fetching against a local /coins/markets stub.
+
+Compares the old sequential loop (50 ids per request, 0.5s sleep, stop on the
+first 429) with the current concurrent, token-bucket limited fetch.
+
+Usage (from backend/):
+    python -m benchmarks.bench_get_prices --coins 5000 --latency 0.1 --stub-rpm 500
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app.services.coingecko_service import CoinGeckoService
+from app.services.rate_limiter import RateLimiter
+from benchmarks.stubs import StubServer, coingecko_stub
+
+
+def legacy_get_prices(base_url, coin_ids):
+    """The pre-limiter implementation, kept here as the baseline."""
+    BATCH_SIZE = 50
+    result = {}
+    for i in range(0, len(coin_ids), BATCH_SIZE):
+        batch = coin_ids[i : i + BATCH_SIZE]
+        params = {"vs_currency": "inr", "ids": ",".join(batch), "price_change_percentage": "1h,24h"}
+        response = requests.get(f"{base_url}/coins/markets", params=params, timeout=10)
+        if response.status_code == 429:
+            break
+        if response.status_code != 200:
+            continue
+        for item in response.json():
+            result[item['id']] = item
+        time.sleep(0.5)
+    return result
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--coins', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.1, help='stub response time in seconds')
+    parser.add_argument('--stub-rpm', type=int, default=500, help='requests/minute the stub allows')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+
+    coin_ids = [f"coin-{i}" for i in range(args.coins)]
+
+    # Match the limiter to the stub's budget, as a pro key would be configured
+    Config.COINGECKO_PLAN = 'pro'
+    Config.COINGECKO_RATE_LIMIT = args.stub_rpm
+    Config.COINGECKO_MAX_CONCURRENCY = args.concurrency
+    RateLimiter.reset()
+
+    rows = []
+    if not args.skip_legacy:
+        handler = coingecko_stub(args.latency, args.stub_rpm)
+        with StubServer(handler) as stub:
+            elapsed, result = timed(legacy_get_prices, stub.url, coin_ids)
+        rows.append(('before (sequential)', elapsed, len(result), handler.stats))
+
+    handler = coingecko_stub(args.latency, args.stub_rpm)
+    with StubServer(handler) as stub:
+        CoinGeckoService.PRO_BASE_URL = stub.url
+        elapsed, result = timed(CoinGeckoService._fetch_prices, coin_ids)
+    rows.append(('after (concurrent)', elapsed, len(result), handler.stats))
+
+    print(f"{args.coins} coin ids, stub latency {args.latency * 1000:.0f}ms, stub limit {args.stub_rpm}/min")
+    print(f"{'variant':<22} {'wall time':>10} {'coins':>7} {'requests':>9} {'429s':>6}")
+    for name, elapsed, count, stats in rows:
+        print(f"{name:<22} {elapsed:>9.2f}s {count:>7} {stats.get('requests', 0):>9} {stats.get('throttled', 0):>6}")
+
+
+if __name__ == '__main__':
+    main()
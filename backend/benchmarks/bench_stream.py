@@ -0,0 +1,75 @@
+"""
+Streaming ingestion throughput against the local mock feed.
+
+Runs PriceStreamConsumer over a finite SSE stream on a temporary SQLite DB and
+reports ticks/second ingested, flush count, worst tick-to-commit lag and
+alerts raised. Alerts only go to the outbox; no relay runs, so nothing is posted.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream --coins 1000 --events 2000 --ticks-per-event 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app import create_app, db
+from app.models import User, Holding
+from app.services.stream_service import PriceStreamConsumer
+from benchmarks.stubs import StubServer, price_feed_stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--coins', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--ticks-per-event', type=int, default=20)
+    parser.add_argument('--events-per-second', type=float, default=0, help='0 = as fast as possible')
+    parser.add_argument('--flush-interval', type=float, default=0.5)
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    tmp.close()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp.name}"
+
+    coin_ids = [f"coin-{i}" for i in range(args.coins)]
+    app = create_app(BenchConfig)
+
+    with app.app_context():
+        db.create_all()
+        user = User(cliq_user_id='bench', default_channel_id='bench-channel')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([Holding(user_id=user.id, coin_id=cid, amount=1.0, chain='manual') for cid in coin_ids])
+        db.session.commit()
+
+        handler = price_feed_stub(coin_ids, events_per_second=args.events_per_second,
+                                  ticks_per_event=args.ticks_per_event, total_events=args.events)
+        with StubServer(handler) as feed:
+            consumer = PriceStreamConsumer(url=f"{feed.url}/stream", flush_interval=args.flush_interval)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                consumer.consume_once()
+            elapsed = time.perf_counter() - start
+
+    os.unlink(tmp.name)
+
+    stats = consumer.stats
+    print(f"{args.coins} tracked coins, {args.events} events x {args.ticks_per_event} ticks")
+    print(f"wall time          {elapsed:.2f}s")
+    print(f"ticks ingested     {stats['ticks']} ({stats['ticks'] / elapsed:,.0f}/s)")
+    print(f"flushes            {stats['flushes']}")
+    print(f"max flush lag      {stats['max_flush_lag_ms']:.1f}ms")
+    print(f"alerts raised      {stats['alerts_sent']} (edge-triggered)")
+
+
+if __name__ == '__main__':
+    main()
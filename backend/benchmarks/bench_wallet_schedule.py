@@ -0,0 +1,96 @@
+"""
+Provider calls per run with staleness scheduling vs. syncing every wallet.
+
+Simulates a day of cron runs over a population where only a small share of
+wallets is active (balances change between most syncs) and the rest are
+dormant. No HTTP: balances come from a deterministic model, and the real
+due-set selection and back-off code (WalletSyncService) decides what to sync.
+
+Usage (from backend/):
+    python -m benchmarks.bench_wallet_schedule --wallets 2000 --active 0.05 --tick 300
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app import create_app, db
+from app.models import User, Wallet
+from app.services.wallet_service import WalletService
+from app.services.wallet_sync_service import WalletSyncService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wallets', type=int, default=2000)
+    parser.add_argument('--active', type=float, default=0.05, help='share of wallets that change often')
+    parser.add_argument('--tick', type=int, default=300, help='seconds between cron runs')
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--budget', type=int, default=Config.WALLET_SYNC_BUDGET)
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    tmp.close()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp.name}"
+
+    app = create_app(BenchConfig)
+    rng = random.Random(11)
+    chains = ['eth', 'eth', 'polygon', 'sol', 'btc']
+
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()) as log:
+        db.create_all()
+        user = User(cliq_user_id='bench')
+        db.session.add(user)
+        db.session.flush()
+        start = datetime.utcnow()
+        db.session.add_all([
+            Wallet(user_id=user.id, address=f"addr{i:06d}", chain=chains[i % len(chains)], next_sync_at=start)
+            for i in range(args.wallets)
+        ])
+        db.session.commit()
+
+        wallets = {w.id: w for w in Wallet.query.all()}
+        active = {wid for wid in wallets if rng.random() < args.active}
+        balances = {wid: 1.0 for wid in wallets}
+        cost = lambda w: WalletSyncService.CALLS_PER_SYNC[WalletService.provider_for_chain(w.chain)]
+        baseline_per_run = sum(cost(w) for w in wallets.values())
+
+        runs = int(args.hours * 3600 / args.tick)
+        calls = []
+        for run in range(runs):
+            now = start + timedelta(seconds=run * args.tick)
+            # Active wallets move most ticks, dormant ones very rarely
+            for wid in wallets:
+                if rng.random() < (0.7 if wid in active else 0.001):
+                    balances[wid] += 1.0
+
+            spent = 0
+            for wid in WalletSyncService.due_wallet_ids(now=now, budget=args.budget):
+                wallet = wallets[wid]
+                data = [{'coin_id': 'ethereum', 'amount': balances[wid], 'chain': wallet.chain}]
+                changed = WalletSyncService._write(wallet, data)
+                WalletSyncService.reschedule(wallet, changed, now=now)
+                spent += cost(wallet)
+            db.session.commit()
+            calls.append(spent)
+
+    steady = calls[len(calls) // 4:] or calls
+    print(f"wallets={args.wallets} active={len(active)} runs={runs} every {args.tick}s budget={args.budget}")
+    print(f"  sync-everything : {baseline_per_run:8.1f} provider calls/run")
+    print(f"  scheduled       : {sum(calls) / len(calls):8.1f} calls/run avg, "
+          f"{sum(steady) / len(steady):.1f} steady-state, first run {calls[0]}")
+    print(f"  reduction       : {baseline_per_run / (sum(steady) / len(steady)):.1f}x (steady state)")
+    os.unlink(tmp.name)
+
+
+if __name__ == '__main__':
+    main()
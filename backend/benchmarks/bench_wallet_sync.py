@@ -0,0 +1,112 @@
+"""
+Wallet sync throughput against local Moralis EVM / Moralis Solana /
+BlockCypher stubs.
+
+Compares the old sequential loop (one wallet at a time, 0.5s sleep after
+each) on a sample of wallets with WalletSyncService over all of them, and
+reports wallets/second plus requests and 429s per provider.
+
+Usage (from backend/):
+    python -m benchmarks.bench_wallet_sync --wallets 600 --latency 0.15
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from app import create_app, db
+from app.models import User, Wallet
+from app.services.rate_limiter import RateLimiter
+from app.services.wallet_service import WalletService
+from app.services.wallet_sync_service import WalletSyncService
+from benchmarks.stubs import StubServer, wallet_provider_stub
+
+
+def legacy_sync(wallets):
+    """The pre-engine wallet stage, kept here as the baseline."""
+    for wallet in wallets:
+        holdings_data = WalletService.fetch_wallet_balances(wallet.address, wallet.chain)
+        WalletSyncService._write(wallet, holdings_data or [])
+        time.sleep(0.5)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wallets', type=int, default=600)
+    parser.add_argument('--latency', type=float, default=0.15)
+    parser.add_argument('--tokens', type=int, default=5, help='tokens per wallet')
+    parser.add_argument('--legacy-sample', type=int, default=20, help='wallets timed on the old loop')
+    parser.add_argument('--stub-rpm', type=int, default=0, help='per-provider stub rate limit (0 = none)')
+    args = parser.parse_args()
+
+    tmp = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    tmp.close()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp.name}"
+
+    Config.MORALIS_API_KEY = Config.MORALIS_API_KEY or 'bench'
+    app = create_app(BenchConfig)
+    chains = ['eth', 'eth', 'polygon', 'bsc', 'sol', 'btc']
+
+    handler_args = dict(latency=args.latency, tokens_per_wallet=args.tokens,
+                        rate_limit_per_minute=args.stub_rpm or None)
+    evm_h, sol_h, btc_h = (wallet_provider_stub(**handler_args) for _ in range(3))
+
+    with app.app_context(), StubServer(evm_h) as evm, StubServer(sol_h) as sol, StubServer(btc_h) as btc:
+        WalletService.BASE_URL_EVM = evm.url
+        WalletService.BASE_URL_SOL = sol.url
+        WalletService.BASE_URL_BTC = btc.url
+
+        db.create_all()
+        user = User(cliq_user_id='bench')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([
+            Wallet(user_id=user.id, address=f"addr{i:06d}", chain=chains[i % len(chains)])
+            for i in range(args.wallets)
+        ])
+        db.session.commit()
+        wallets = Wallet.query.order_by(Wallet.id).all()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            sample = wallets[:args.legacy_sample]
+            start = time.perf_counter()
+            legacy_sync(sample)
+            legacy_time = time.perf_counter() - start
+
+            RateLimiter.reset()
+            for h in (evm_h, sol_h, btc_h):
+                h.stats.clear()
+            start = time.perf_counter()
+            stats = WalletSyncService.sync(wallets)
+            db.session.commit()
+            engine_time = time.perf_counter() - start
+
+        legacy_rate = len(sample) / legacy_time
+        engine_rate = stats['wallets_synced'] / engine_time
+        print(f"wallets={args.wallets} latency={args.latency}s tokens/wallet={args.tokens} "
+              f"workers={Config.WALLET_SYNC_WORKERS}")
+        print(f"  legacy : {legacy_rate:8.2f} wallets/s  (sample of {len(sample)}, "
+              f"projected {args.wallets / legacy_rate:7.1f}s for all)")
+        print(f"  engine : {engine_rate:8.2f} wallets/s  ({engine_time:.2f}s, "
+              f"{stats['wallets_synced']} synced, {stats['tokens_seen']} tokens)")
+        print(f"  speedup: {engine_rate / legacy_rate:.1f}x")
+        for name, h in (('moralis_evm', evm_h), ('moralis_sol', sol_h), ('blockcypher', btc_h)):
+            print(f"  {name:<12} requests={h.stats.get('requests', 0):<6} "
+                  f"429s={h.stats.get('throttled', 0):<4} "
+                  f"concurrency={Config.WALLET_PROVIDER_CONCURRENCY.get(name)} "
+                  f"rpm={Config.WALLET_PROVIDER_RATE_LIMITS.get(name)}")
+
+    os.unlink(tmp.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Standalone mock SSE price feed for running stream.py offline.
+
+Usage (from backend/):
+    python -m benchmarks.mock_price_feed --port 8765 --coins bitcoin,ethereum,solana
+    PRICE_STREAM_URL=http://127.0.0.1:8765/stream python stream.py
+"""
+import argparse
+import os
+import sys
+from http.server import ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import price_feed_stub
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--coins', default='bitcoin,ethereum,solana,dogecoin,cardano')
+    parser.add_argument('--events-per-second', type=float, default=5)
+    parser.add_argument('--ticks-per-event', type=int, default=3)
+    parser.add_argument('--jump-probability', type=float, default=0.01)
+    args = parser.parse_args()
+
+    handler = price_feed_stub(
+        args.coins.split(','),
+        events_per_second=args.events_per_second,
+        ticks_per_event=args.ticks_per_event,
+        jump_probability=args.jump_probability
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), handler)
+    server.daemon_threads = True
+    print(f"📡 Mock price feed on http://127.0.0.1:{args.port}/stream")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Local stand-ins for the outbound providers, used by the benchmarks.
+Each stub is a threaded HTTP server on 127.0.0.1 with a configurable latency
+and (optionally) its own rate limit, so runs are repeatable offline.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubServer:
+    """Run a handler class on an ephemeral port for the duration of a `with` block."""
+
+    def __init__(self, handler_cls):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler_cls)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class SlidingWindow:
+    """Allow at most `limit` hits per `window` seconds across threads."""
+
+    def __init__(self, limit, window=60.0):
+        self.limit = limit
+        self.window = window
+        self.hits = deque()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.limit:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self.hits and now - self.hits[0] > self.window:
+                self.hits.popleft()
+            if len(self.hits) >= self.limit:
+                return False
+            self.hits.append(now)
+            return True
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    limiter = None
+    stats = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def throttle(self):
+        """Apply latency and the rate limit; returns False if a 429 was sent."""
+        if self.stats is not None:
+            self.stats['requests'] = self.stats.get('requests', 0) + 1
+        if self.limiter and not self.limiter.allow():
+            if self.stats is not None:
+                self.stats['throttled'] = self.stats.get('throttled', 0) + 1
+            self.send_json(429, {'error': 'rate limited'}, {'Retry-After': '1'})
+            return False
+        time.sleep(self.latency)
+        return True
+
+    def query(self):
+        return {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+
+def coingecko_stub(latency=0.1, rate_limit_per_minute=None):
+    """A /coins/markets stub returning a synthetic quote for every requested id."""
+
+    class CoinGeckoHandler(JSONHandler):
+        def do_GET(self):
+            if not self.throttle():
+                return
+            path = urlparse(self.path).path
+            if not path.endswith('/coins/markets'):
+                return self.send_json(404, {'error': 'not found'})
+
+            ids = [cid for cid in self.query().get('ids', '').split(',') if cid]
+            self.send_json(200, [{
+                'id': cid,
+                'symbol': cid[:4],
+                'name': cid.title(),
+                'current_price': 100.0 + i,
+                'market_cap': 1_000_000,
+                'price_change_percentage_1h_in_currency': 0.5,
+                'price_change_percentage_24h_in_currency': -1.5
+            } for i, cid in enumerate(ids)])
+
+    CoinGeckoHandler.latency = latency
+    CoinGeckoHandler.limiter = SlidingWindow(rate_limit_per_minute) if rate_limit_per_minute else None
+    CoinGeckoHandler.stats = {}
+    return CoinGeckoHandler
+
+
+def price_feed_stub(coin_ids, events_per_second=200, ticks_per_event=10, total_events=None,
+                    jump_probability=0.01, seed=7):
+    """
+    An SSE price feed at /stream. Each event carries `ticks_per_event` quotes
+    from a random walk over `coin_ids`; occasionally a coin jumps far enough
+    to cross the volatility thresholds. Closes after `total_events` events
+    (or runs until the client disconnects when None).
+    """
+    import random
+
+    class PriceFeedHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.0'  # stream until the connection closes
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if urlparse(self.path).path != '/stream':
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+
+            rng = random.Random(seed)
+            prices = {cid: 100.0 for cid in coin_ids}
+            changes = {cid: 0.0 for cid in coin_ids}
+            interval = 1.0 / events_per_second if events_per_second else 0
+            sent = 0
+            next_at = time.monotonic()
+
+            try:
+                while total_events is None or sent < total_events:
+                    ticks = []
+                    for _ in range(ticks_per_event):
+                        cid = rng.choice(coin_ids)
+                        step = rng.gauss(0, 0.2)
+                        if rng.random() < jump_probability:
+                            step = rng.choice([-6.0, 6.0])
+                        changes[cid] = max(-50.0, min(50.0, changes[cid] * 0.9 + step))
+                        prices[cid] *= 1 + step / 100
+                        ticks.append({
+                            'id': cid,
+                            'symbol': cid[:4],
+                            'name': cid.title(),
+                            'current_price': round(prices[cid], 6),
+                            'price_change_percentage_1h_in_currency': round(changes[cid], 4),
+                            'price_change_percentage_24h_in_currency': round(changes[cid] / 2, 4),
+                            'sent_at': time.time()
+                        })
+                    self.wfile.write(f"data: {json.dumps(ticks)}\n\n".encode())
+                    sent += 1
+                    if sent % 50 == 0:
+                        self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+
+                    next_at += interval
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return PriceFeedHandler
+
+
+def wallet_provider_stub(latency=0.15, tokens_per_wallet=5, rate_limit_per_minute=None):
+    """
+    Balance endpoints for Moralis EVM (/{address}/balance, /{address}/erc20),
+    Moralis Solana (/account/mainnet/{address}/portfolio) and BlockCypher
+    (/addrs/{address}/balance). Run one instance per provider so each gets its
+    own latency and rate limit.
+    """
+
+    class WalletHandler(JSONHandler):
+        def do_GET(self):
+            if not self.throttle():
+                return
+            parts = urlparse(self.path).path.strip('/').split('/')
+
+            if parts[-1] == 'erc20':
+                return self.send_json(200, [{
+                    'symbol': f"TK{i}", 'name': f"Token {i}",
+                    'decimals': 18, 'balance': str(10 ** 18 * (i + 1))
+                } for i in range(tokens_per_wallet)])
+            if parts[-1] == 'portfolio':
+                return self.send_json(200, {
+                    'nativeBalance': {'solana': '1.5'},
+                    'tokens': [{'symbol': f"SPL{i}", 'name': f"Spl {i}", 'amount': str(i + 1)}
+                               for i in range(tokens_per_wallet)]
+                })
+            if parts[-1] == 'balance' and 'addrs' in parts:
+                return self.send_json(200, {'final_balance': 150_000_000})
+            if parts[-1] == 'balance':
+                return self.send_json(200, {'balance': str(2 * 10 ** 18)})
+            self.send_json(404, {'error': 'not found'})
+
+    WalletHandler.latency = latency
+    WalletHandler.limiter = SlidingWindow(rate_limit_per_minute) if rate_limit_per_minute else None
+    WalletHandler.stats = {}
+    return WalletHandler
+
+
+def cliq_stub(latency=0.2, rate_limit_per_minute=None, error_rate=0.0, seed=3):
+    """
+    POST /channels/{channel_id}/message. Records the `seq` field of every
+    accepted message per channel (stats['received']) so delivery order can be
+    checked, and fails a random `error_rate` share of requests with a 500.
+    """
+    import random
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class CliqHandler(JSONHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not self.throttle():
+                return
+            parts = urlparse(self.path).path.strip('/').split('/')
+            if len(parts) < 3 or parts[-3] != 'channels':
+                return self.send_json(404, {'error': 'not found'})
+
+            with rng_lock:
+                failed = rng.random() < error_rate
+            if failed:
+                self.stats['errors'] = self.stats.get('errors', 0) + 1
+                return self.send_json(500, {'error': 'internal'})
+
+            with rng_lock:
+                self.stats.setdefault('received', {}).setdefault(parts[-2], []).append(body.get('seq'))
+            self.send_json(200, {'ok': True})
+
+    CliqHandler.latency = latency
+    CliqHandler.limiter = SlidingWindow(rate_limit_per_minute) if rate_limit_per_minute else None
+    CliqHandler.stats = {}
+    return CliqHandler
@@ -3,6 +3,19 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _parse_int_map(raw):
+    """Parse "key:value,key:value" env strings into a dict of ints."""
+    result = {}
+    for pair in (raw or '').split(','):
+        if ':' not in pair:
+            continue
+        key, value = pair.split(':', 1)
+        try:
+            result[key.strip().lower()] = int(value)
+        except ValueError:
+            continue
+    return result
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'you-will-never-guess'
     
@@ -19,8 +32,55 @@ class Config:
     
     # API Keys
     NEWS_API_KEY = os.environ.get('NEWS_API_KEY')
+    # Headlines per symbol are cached in the news_cache table for this long
+    NEWS_CACHE_TTL = int(os.environ.get('NEWS_CACHE_TTL', 1800))
+    NEWS_MAX_ITEMS = int(os.environ.get('NEWS_MAX_ITEMS', 7))
+    # Symbols per CryptoPanic request, and result pages read per request
+    NEWS_BATCH_SIZE = int(os.environ.get('NEWS_BATCH_SIZE', 20))
+    NEWS_BATCH_MAX_PAGES = int(os.environ.get('NEWS_BATCH_MAX_PAGES', 3))
+    # Symbols the scheduler's news stage keeps warm, most widely held first
+    NEWS_REFRESH_MAX_SYMBOLS = int(os.environ.get('NEWS_REFRESH_MAX_SYMBOLS', 200))
     COINGECKO_API_BASE = os.environ.get('COINGECKO_API_BASE', 'https://api.coingecko.com/api/v3')
     COINGECKO_API_KEY = os.environ.get('COINGECKO_API_KEY')
+    # CoinGecko plan: 'public' (no key), 'demo' or 'pro'. Derived from the key when unset.
+    COINGECKO_PLAN = os.environ.get('COINGECKO_PLAN')
+    # Requests per minute allowed by each plan
+    COINGECKO_PLAN_LIMITS = {'public': 10, 'demo': 30, 'pro': 500}
+    COINGECKO_RATE_LIMIT = int(os.environ.get('COINGECKO_RATE_LIMIT', 0)) or None
+    COINGECKO_BURST = int(os.environ.get('COINGECKO_BURST', 0)) or None
+    COINGECKO_MAX_CONCURRENCY = int(os.environ.get('COINGECKO_MAX_CONCURRENCY', 4))
+    COINGECKO_MAX_RETRIES = int(os.environ.get('COINGECKO_MAX_RETRIES', 5))
+    # Longest /coins/markets URL we send; IDs are packed into batches up to this
+    COINGECKO_MAX_URL_LENGTH = int(os.environ.get('COINGECKO_MAX_URL_LENGTH', 2000))
+
+    # Fallback budget (requests per minute) for providers without their own limits
+    DEFAULT_RATE_LIMIT = int(os.environ.get('DEFAULT_RATE_LIMIT', 60))
+
+    # Outbound HTTP client (shared keep-alive session)
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 15))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    # Number of per-host pools kept, and connections kept alive per host
+    HTTP_POOL_HOSTS = int(os.environ.get('HTTP_POOL_HOSTS', 10))
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 20))
+
+    # Currencies. Prices are fetched once in the base currency and converted
+    # locally to each user's preferred currency with a cached FX rate vector.
+    PRICE_BASE_CURRENCY = os.environ.get('PRICE_BASE_CURRENCY', 'usd').lower()
+    DEFAULT_CURRENCY = os.environ.get('DEFAULT_CURRENCY', 'inr').lower()
+    FX_REFRESH_SECONDS = int(os.environ.get('FX_REFRESH_SECONDS', 6 * 3600))
+
+    # Price Cache (seconds). Quotes younger than the TTL are served as-is,
+    # quotes up to TTL + STALE_TTL old are served while a refresh runs.
+    PRICE_CACHE_TTL = int(os.environ.get('PRICE_CACHE_TTL', 60))
+    PRICE_CACHE_STALE_TTL = int(os.environ.get('PRICE_CACHE_STALE_TTL', 600))
+    # Per-coin TTL overrides, e.g. "bitcoin:30,ethereum:30"
+    PRICE_CACHE_TTL_OVERRIDES = _parse_int_map(os.environ.get('PRICE_CACHE_TTL_OVERRIDES'))
+
+    # Local coin search index (snapshot of /coins/list)
+    COIN_INDEX_REFRESH_HOURS = int(os.environ.get('COIN_INDEX_REFRESH_HOURS', 24))
+    # How often each worker re-reads the snapshot from the DB
+    COIN_INDEX_RELOAD_SECONDS = int(os.environ.get('COIN_INDEX_RELOAD_SECONDS', 3600))
     
     # AI Config
     GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
@@ -29,6 +89,75 @@ class Config:
     BOT_TOKEN = os.environ.get('BOT_TOKEN')
     BOT_ID = os.environ.get('BOT_ID')
     
+    # Price History retention: raw ticks, then 5-minute bars, then hourly bars forever
+    PRICE_HISTORY_RAW_HOURS = int(os.environ.get('PRICE_HISTORY_RAW_HOURS', 48))
+    PRICE_HISTORY_5M_DAYS = int(os.environ.get('PRICE_HISTORY_5M_DAYS', 30))
+    # Expired raw ticks rolled up (and deleted) per transaction
+    PRICE_HISTORY_ROLLUP_CHUNK = int(os.environ.get('PRICE_HISTORY_ROLLUP_CHUNK', 50000))
+
+    # Streaming price ingestion (python stream.py). SSE endpoint emitting quote JSON.
+    PRICE_STREAM_URL = os.environ.get('PRICE_STREAM_URL')
+    PRICE_STREAM_FLUSH_SECONDS = float(os.environ.get('PRICE_STREAM_FLUSH_SECONDS', 1.0))
+    PRICE_STREAM_IDLE_TIMEOUT = float(os.environ.get('PRICE_STREAM_IDLE_TIMEOUT', 30))
+    # Polling fallback interval while the stream is down
+    PRICE_STREAM_POLL_SECONDS = int(os.environ.get('PRICE_STREAM_POLL_SECONDS', 60))
+    # Stream ticks are sampled into price history at most this often per coin
+    PRICE_STREAM_HISTORY_SECONDS = int(os.environ.get('PRICE_STREAM_HISTORY_SECONDS', 60))
+
+    # Job queue (python worker.py). Cron runs are split into jobs that any
+    # number of worker processes claim with a lease; a job whose lease expires
+    # (worker crashed) becomes claimable again.
+    JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', 10))
+    JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 2))
+    # Coins per price_batch job (get_prices packs these into URL-sized requests)
+    PRICE_JOB_BATCH_SIZE = int(os.environ.get('PRICE_JOB_BATCH_SIZE', 1000))
+    # A scheduled run holds the run lock until its jobs finish, or at most this long
+    RUN_LOCK_LEASE_SECONDS = int(os.environ.get('RUN_LOCK_LEASE_SECONDS', 3600))
+
+    # Built-in scheduler (python -m app.worker): seconds between runs of each
+    # stage, randomised by +/- SCHEDULE_JITTER so workers don't fire in step.
+    # Stage names are those of app.tasks.STAGES; 0 disables a stage. The env
+    # value overrides single stages, e.g. "prices:30,news:0".
+    SCHEDULE_INTERVALS = {
+        'prices': 60, 'wallets': 900, 'news': 600, 'coin_index': 3600, 'history': 3600,
+        **_parse_int_map(os.environ.get('SCHEDULE_INTERVALS'))
+    }
+    SCHEDULE_JITTER = float(os.environ.get('SCHEDULE_JITTER', 0.1))
+
+    # Alert cooldown: a user is alerted about the same coin and alert type at
+    # most once per window, unless the move grows by ALERT_ESCALATION_PCT
+    # points in the same direction
+    ALERT_COOLDOWN_MINUTES = int(os.environ.get('ALERT_COOLDOWN_MINUTES', 360))
+    ALERT_ESCALATION_PCT = float(os.environ.get('ALERT_ESCALATION_PCT', 5.0))
+    # Coins detailed in a digest card; further coins are listed on one overflow
+    # slide, up to ALERT_DIGEST_OVERFLOW_COINS of them, then counted
+    ALERT_DIGEST_MAX_COINS = int(os.environ.get('ALERT_DIGEST_MAX_COINS', 8))
+    ALERT_DIGEST_OVERFLOW_COINS = int(os.environ.get('ALERT_DIGEST_OVERFLOW_COINS', 20))
+
+    # Outbound Cliq dispatcher. Alert posts go through CLIQ_DISPATCH_WORKERS
+    # lanes (each channel always maps to the same lane, so its messages stay
+    # in order), share a CLIQ_RATE_LIMIT requests/minute budget, and are
+    # retried with exponential backoff before being dead-lettered.
+    CLIQ_DISPATCH_WORKERS = int(os.environ.get('CLIQ_DISPATCH_WORKERS', 8))
+    CLIQ_RATE_LIMIT = int(os.environ.get('CLIQ_RATE_LIMIT', 600))
+    CLIQ_MAX_ATTEMPTS = int(os.environ.get('CLIQ_MAX_ATTEMPTS', 5))
+    CLIQ_RETRY_BASE_SECONDS = float(os.environ.get('CLIQ_RETRY_BASE_SECONDS', 1.0))
+    CLIQ_SEND_TIMEOUT = float(os.environ.get('CLIQ_SEND_TIMEOUT', 10))
+    CLIQ_QUEUE_SIZE = int(os.environ.get('CLIQ_QUEUE_SIZE', 10000))
+
+    # Alert outbox. Messages are committed with their Alert rows and handed to
+    # the dispatcher by the relay (python relay.py) OUTBOX_BATCH_SIZE at a time
+    # under a lease; a message the dispatcher gave up on is retried
+    # OUTBOX_MAX_ATTEMPTS times in all. Sent rows are kept OUTBOX_RETENTION_HOURS.
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 200))
+    OUTBOX_LEASE_SECONDS = int(os.environ.get('OUTBOX_LEASE_SECONDS', 600))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 3))
+    OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', 60))
+    OUTBOX_POLL_SECONDS = float(os.environ.get('OUTBOX_POLL_SECONDS', 1))
+    OUTBOX_RETENTION_HOURS = int(os.environ.get('OUTBOX_RETENTION_HOURS', 72))
+
     # Volatility Thresholds
     VOLATILITY_1H_THRESHOLD = float(os.environ.get('VOLATILITY_1H_THRESHOLD', 3.0))
     VOLATILITY_24H_THRESHOLD = float(os.environ.get('VOLATILITY_24H_THRESHOLD', 5.0))
@@ -49,7 +178,34 @@ class Config:
     
     # Added 'btc' to supported chains
     SUPPORTED_CHAINS = list(MORALIS_CHAINS.keys()) + ['sol', 'btc']
+
+    # Parallel wallet sync. Each balance provider has its own cap on wallets
+    # in flight and its own request budget (requests/minute); override with
+    # "provider:value,..." strings. BlockCypher's free tier allows 3 req/s.
+    WALLET_SYNC_WORKERS = int(os.environ.get('WALLET_SYNC_WORKERS', 16))
+    WALLET_JOB_CHUNK_SIZE = int(os.environ.get('WALLET_JOB_CHUNK_SIZE', 100))
+    # Staleness-driven scheduling: a wallet whose balances changed is re-synced
+    # after WALLET_SYNC_MIN_INTERVAL; every unchanged sync doubles the interval
+    # up to WALLET_SYNC_MAX_INTERVAL. A run syncs due wallets until it has spent
+    # WALLET_SYNC_BUDGET provider calls; the rest wait for the next run.
+    WALLET_SYNC_MIN_INTERVAL = int(os.environ.get('WALLET_SYNC_MIN_INTERVAL', 900))
+    WALLET_SYNC_MAX_INTERVAL = int(os.environ.get('WALLET_SYNC_MAX_INTERVAL', 86400))
+    WALLET_SYNC_BUDGET = int(os.environ.get('WALLET_SYNC_BUDGET', 500))
+    WALLET_PROVIDER_CONCURRENCY = {
+        'moralis_evm': 8, 'moralis_sol': 4, 'blockcypher': 2,
+        **_parse_int_map(os.environ.get('WALLET_PROVIDER_CONCURRENCY'))
+    }
+    WALLET_PROVIDER_RATE_LIMITS = {
+        'moralis_evm': 1500, 'moralis_sol': 600, 'blockcypher': 180,
+        **_parse_int_map(os.environ.get('WALLET_PROVIDER_RATE_LIMITS'))
+    }
     
+    @staticmethod
+    def coingecko_plan():
+        if Config.COINGECKO_PLAN:
+            return Config.COINGECKO_PLAN.lower()
+        return 'demo' if Config.COINGECKO_API_KEY else 'public'
+
     @staticmethod
     def validate():
         missing = []
@@ -0,0 +1,10 @@
+from app import create_app, db
+from app.services.outbox_relay import OutboxRelay
+
+app = create_app()
+
+if __name__ == '__main__':
+    # Delivers queued alert messages; run next to the workers (several are fine)
+    with app.app_context():
+        db.create_all()
+        OutboxRelay().run()
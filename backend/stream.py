@@ -0,0 +1,9 @@
+from app import create_app, db
+from app.services.stream_service import PriceStreamConsumer
+
+app = create_app()
+
+if __name__ == '__main__':
+    with app.app_context():
+        db.create_all()
+        PriceStreamConsumer().run()
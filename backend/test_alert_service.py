@@ -0,0 +1,187 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from sqlalchemy import event
+from config import Config
+from app import db
+from app.models import User, Holding, Alert, AlertState, OutboxMessage
+from app.services.alert_service import AlertService
+from app.services.news_service import NewsService
+from app.services.zoho_service import ZohoService
+from app_test_case import AppTestCase
+
+
+def quote(price):
+    return {'current_price': price, 'name': 'x', 'symbol': 'X'}
+
+
+class AlertServiceTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        alice = User(cliq_user_id='alice', default_channel_id='ch-a', currency='usd')
+        bob = User(cliq_user_id='bob', default_channel_id='ch-b', currency='usd')
+        silent = User(cliq_user_id='silent')
+        db.session.add_all([alice, bob, silent])
+        db.session.flush()
+        db.session.add_all([
+            # Alice holds ETH on two chains: she must be alerted once
+            Holding(user_id=alice.id, coin_id='ethereum', amount=1, chain='eth'),
+            Holding(user_id=alice.id, coin_id='ethereum', amount=1, chain='arb'),
+            Holding(user_id=bob.id, coin_id='ethereum', amount=1, chain='manual'),
+            Holding(user_id=bob.id, coin_id='solana', amount=1, chain='sol'),
+            Holding(user_id=silent.id, coin_id='solana', amount=1, chain='sol'),
+        ])
+        db.session.commit()
+
+        self.news = patch.object(NewsService, 'get_news', return_value={})
+        self.get_news = self.news.start()
+
+    def tearDown(self):
+        self.news.stop()
+        super().tearDown()
+
+    def test_holder_index_is_one_deduplicated_query(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            index = AlertService.holder_index(['ethereum', 'solana', 'bitcoin'])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(sorted(ch for _, ch, _ in index['ethereum']), ['ch-a', 'ch-b'])
+        self.assertEqual([ch for _, ch, _ in index['solana']], ['ch-b'])
+        self.assertNotIn('bitcoin', index)
+
+    def test_notify_many_sends_once_per_holder_and_alert(self):
+        flagged = {
+            'ethereum': [{'type': '1h_volatility', 'change': 5.0, 'message': 'UP 5.00% in 1h'}],
+            'solana': [{'type': '1h_volatility', 'change': -4.0, 'message': 'DOWN 4.00% in 1h'},
+                       {'type': '24h_volatility', 'change': -9.0, 'message': 'DOWN 9.00% in 24h'}],
+        }
+        prices = {'ethereum': {**quote(3000.0), 'symbol': 'ETH'}, 'solana': {**quote(150.0), 'symbol': 'SOL'},
+                  'bitcoin': quote(1.0)}
+        flagged['bitcoin'] = flagged['ethereum']  # No holders
+
+        sent = AlertService.notify_many(flagged, prices)
+        db.session.commit()
+
+        # ethereum: alice + bob; solana: bob x 2 alert types -> one digest each
+        self.assertEqual(sent, 4)
+        messages = OutboxMessage.query.all()
+        self.assertEqual(sorted(m.channel_id for m in messages), ['ch-a', 'ch-b'])
+        self.assertEqual(Alert.query.count(), 4)
+        self.assertEqual(AlertState.query.count(), 4)
+
+        digest = next(m.payload for m in messages if m.channel_id == 'ch-b')
+        # Biggest move first: SOL (-9% in 24h, both timeframes listed), then ETH
+        self.assertEqual([slide.get('title') for slide in digest['slides']], ['📉 SOLANA', '📈 ETHEREUM'])
+        self.assertEqual([row['label'] for row in digest['slides'][0]['data']], ['Price', '1h Change', '24h Change'])
+        # One news lookup for the batch, by ticker symbol, only for coins being alerted
+        self.get_news.assert_called_once_with({'ETH', 'SOL'})
+
+    def test_digest_caps_coins_and_summarises_overflow(self):
+        alert = lambda change: [{'type': '1h_volatility', 'change': change, 'message': 'm'}]
+        items = [(f"coin{i}", alert(float(i)), [], 1.0) for i in range(1, 13)]
+        items[0] = ('coin1', alert(1.0), [{'title': 't', 'url': 'https://a.com'}], 1.0)
+        items[-1] = ('coin12', alert(-12.0), [{'title': 't', 'url': 'https://a.com'}], 1.0)
+
+        with patch.object(Config, 'ALERT_DIGEST_MAX_COINS', 3):
+            card = ZohoService.format_alert_digest(items, 'usd')
+
+        titles = [slide.get('title') for slide in card['slides']]
+        # Top 3 movers, reasons for the biggest one only, then the remaining 9 on one slide
+        self.assertEqual(titles, ['📉 COIN12', 'Possible Reasons (COIN12)', '📈 COIN11', '📈 COIN10', '+9 more'])
+        self.assertTrue(card['slides'][-1]['data'].startswith('COIN9 +9.00%'))
+        self.assertIn('12 alerts on 12 coins', card['text'])
+
+    def test_large_digest_overflow_is_capped(self):
+        items = [(f"coin{i}", [{'type': '1h_volatility', 'change': float(i), 'message': 'm'}], [], 1.0)
+                 for i in range(1, 201)]
+
+        with patch.object(Config, 'ALERT_DIGEST_MAX_COINS', 8), patch.object(Config, 'ALERT_DIGEST_OVERFLOW_COINS', 20):
+            card = ZohoService.format_alert_digest(items, 'usd')
+
+        overflow = card['slides'][-1]
+        self.assertEqual(len(card['slides']), 9)
+        self.assertEqual(overflow['title'], '+192 more')
+        listed, rest = overflow['data'].split(' …and ')
+        self.assertEqual(len(listed.split(', ')), 20)
+        self.assertTrue(listed.startswith('COIN192 +192.00%'))
+        self.assertEqual(rest, '172 more')
+        self.assertLess(len(json.dumps(card)), 8000)
+
+    def test_single_alert_uses_the_regular_card(self):
+        alert = {'type': '1h_volatility', 'change': 4.0, 'message': 'UP 4.00% in 1h'}
+        self.assertEqual(ZohoService.format_alert_digest([('eth', [alert], [], 1.0)]),
+                         ZohoService.format_alert_message('eth', alert, [], 1.0))
+
+    def test_cooldown_and_escalation(self):
+        alert = lambda change: {'eth': [{'type': '1h_volatility', 'change': change, 'message': 'm'}]}
+        prices = {'eth': quote(10.0)}
+        db.session.add(Holding(user_id=User.query.filter_by(cliq_user_id='bob').one().id,
+                               coin_id='eth', amount=1, chain='manual'))
+        db.session.commit()
+
+        self.assertEqual(AlertService.notify_many(alert(4.0), prices), 1)
+        db.session.commit()
+        # Same move again: cooling down
+        self.assertEqual(AlertService.notify_many(alert(4.5), prices), 0)
+        # Reversal within the window: still cooling down
+        self.assertEqual(AlertService.notify_many(alert(-6.0), prices), 0)
+        # Grew by >= ALERT_ESCALATION_PCT: fires
+        self.assertEqual(AlertService.notify_many(alert(4.0 + Config.ALERT_ESCALATION_PCT), prices), 1)
+        db.session.commit()
+
+        state = AlertState.query.one()
+        self.assertEqual(state.last_level, 4.0 + Config.ALERT_ESCALATION_PCT)
+        state.last_fired_at = datetime.utcnow() - timedelta(minutes=Config.ALERT_COOLDOWN_MINUTES + 1)
+        db.session.commit()
+        self.assertEqual(AlertService.notify_many(alert(4.0), prices), 1)
+
+    def test_overlapping_runs_queue_one_message(self):
+        flagged = {'solana': [{'type': '1h_volatility', 'change': 4.0, 'message': 'm'}]}
+        state = AlertService.load_alert_state(['solana'])
+
+        # A second run read the same (empty) cooldown state before the first committed
+        with patch.object(AlertService, 'load_alert_state', return_value=state):
+            self.assertEqual(AlertService.notify_many(flagged, {'solana': quote(1.0)}), 1)
+            db.session.commit()
+            AlertService.notify_many(flagged, {'solana': quote(1.0)})
+            db.session.commit()
+        self.assertEqual(OutboxMessage.query.count(), 1)
+
+        # Once the cooldown has passed the same alert is a new message
+        AlertState.query.update({AlertState.last_fired_at: datetime.utcnow() - timedelta(days=1)})
+        db.session.commit()
+        self.assertEqual(AlertService.notify_many(flagged, {'solana': quote(1.0)}), 1)
+        db.session.commit()
+        self.assertEqual(OutboxMessage.query.count(), 2)
+
+    def test_rolled_back_tick_leaves_no_message(self):
+        flagged = {'solana': [{'type': '1h_volatility', 'change': 4.0, 'message': 'm'}]}
+        AlertService.notify_many(flagged, {'solana': quote(1.0)})
+        db.session.rollback()
+        self.assertEqual((OutboxMessage.query.count(), Alert.query.count(), AlertState.query.count()), (0, 0, 0))
+
+    def test_unformattable_digest_records_nothing(self):
+        flagged = {'ethereum': [{'type': '1h_volatility', 'change': 5.0, 'message': 'm'}]}
+        prices = {'ethereum': quote(3000.0)}
+        holders = {h.user_id for h in Holding.query.filter_by(coin_id='ethereum')}
+
+        # Alice's and Bob's digests: the first one can't be formatted
+        with patch.object(ZohoService, 'format_alert_digest', side_effect=[ValueError("bad card"), {'text': 'ok'}]):
+            self.assertEqual(AlertService.notify_many(flagged, prices), 1)
+        db.session.commit()
+        self.assertEqual((OutboxMessage.query.count(), Alert.query.count(), AlertState.query.count()), (1, 1, 1))
+
+        # No cooldown was recorded for the failed holder, so it fires again next tick
+        self.assertEqual(AlertService.notify_many(flagged, prices), 1)
+        db.session.commit()
+        self.assertEqual({a.user_id for a in Alert.query}, holders)
+
+
+if __name__ == '__main__':
+    unittest.main()
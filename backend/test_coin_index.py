@@ -0,0 +1,52 @@
+import unittest
+from app.services.coin_index import CoinIndex
+from app_test_case import AppTestCase
+
+
+COINS = [
+    {'id': 'bitcoin', 'symbol': 'btc', 'name': 'Bitcoin'},
+    {'id': 'ethereum', 'symbol': 'eth', 'name': 'Ethereum'},
+    {'id': 'ethereum-wormhole', 'symbol': 'eth', 'name': 'Ethereum (Wormhole)'},
+    {'id': 'solana', 'symbol': 'sol', 'name': 'Solana'},
+    {'id': 'wrapped-solana', 'symbol': 'sol', 'name': 'Wrapped SOL'},
+]
+RANKS = {'bitcoin': 1, 'ethereum': 2, 'solana': 5}
+
+
+class CoinIndexTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        CoinIndex.clear()
+        CoinIndex.store(COINS, RANKS)
+
+    def tearDown(self):
+        CoinIndex.clear()
+        super().tearDown()
+
+    def test_exact_lookups(self):
+        self.assertEqual(CoinIndex.lookup('bitcoin'), 'bitcoin')
+        self.assertEqual(CoinIndex.lookup('BTC'), 'bitcoin')
+        self.assertEqual(CoinIndex.lookup('Solana'), 'solana')
+
+    def test_shared_symbol_resolved_by_rank(self):
+        self.assertEqual(CoinIndex.lookup('eth'), 'ethereum')
+        self.assertEqual(CoinIndex.lookup('sol'), 'solana')
+
+    def test_prefix_and_fuzzy(self):
+        self.assertEqual(CoinIndex.lookup('bitco'), 'bitcoin')
+        self.assertEqual(CoinIndex.lookup('etherum'), 'ethereum')
+
+    def test_miss_returns_none(self):
+        self.assertIsNone(CoinIndex.lookup('zz'))
+        self.assertIsNone(CoinIndex.lookup('notacoin'))
+
+    def test_reload_from_table(self):
+        CoinIndex.clear()
+        self.assertEqual(CoinIndex.size(), 0)
+        self.assertEqual(CoinIndex.lookup('btc'), 'bitcoin')
+        self.assertEqual(CoinIndex.size(), len(COINS))
+        self.assertFalse(CoinIndex.is_refresh_due())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from config import Config
+from app.services.rate_limiter import RateLimiter
+from app.services.coingecko_service import CoinGeckoService
+from app.services.http_client import HttpClient
+
+
+def response(status, payload=None, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.json.return_value = payload or []
+    return resp
+
+
+class CoinGeckoBatchingTestCase(unittest.TestCase):
+    def setUp(self):
+        RateLimiter.reset()
+        self.rate_limit = patch.object(Config, 'COINGECKO_RATE_LIMIT', 6000)
+        self.rate_limit.start()
+
+    def tearDown(self):
+        self.rate_limit.stop()
+        RateLimiter.reset()
+
+    def test_ids_packed_under_url_budget(self):
+        coin_ids = [f"coin-{i}" for i in range(1000)]
+        batches = CoinGeckoService._pack_batches(coin_ids)
+
+        self.assertEqual(sum(len(b) for b in batches), 1000)
+        self.assertLess(len(batches), 1000 // 50)
+        for batch in batches:
+            self.assertLessEqual(len(batch), CoinGeckoService.MAX_PER_PAGE)
+            url = HttpClient.prepare_url(f"{CoinGeckoService._base_url()}/coins/markets",
+                                         CoinGeckoService._markets_params(batch))
+            self.assertLessEqual(len(url), Config.COINGECKO_MAX_URL_LENGTH)
+
+    def test_oversized_batch_is_split(self):
+        coin_ids = [f"coin-{i}" for i in range(100)]
+        sizes = []
+
+        def fake_get(url, params=None, **kwargs):
+            ids = params['ids'].split(',')
+            sizes.append(len(ids))
+            if len(ids) > 60:
+                return response(414)
+            self.assertEqual(params['per_page'], len(ids))
+            return response(200, [{'id': cid, 'current_price': 1.0} for cid in ids])
+
+        with patch.object(CoinGeckoService, '_url_budget', None), \
+                patch.object(HttpClient, 'get', side_effect=fake_get):
+            result = CoinGeckoService._fetch_prices(coin_ids)
+            self.assertIsNotNone(CoinGeckoService._url_budget)
+
+        self.assertEqual(len(result), 100)
+        self.assertEqual(sizes, [100, 50, 50])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
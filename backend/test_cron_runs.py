@@ -0,0 +1,108 @@
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from app import db
+from app.models import CronRun, Holding
+from app.services.http_client import HttpClient
+from app.services.job_queue import JobQueue, JobWorker
+from app.services.telemetry import Telemetry
+from app_test_case import AppTestCase
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeSession:
+    def request(self, method, url, **kwargs):
+        return FakeResponse(429 if 'blockcypher' in url else 200)
+
+
+class CronRunTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = patch.object(HttpClient, 'session', return_value=FakeSession())
+        self.session.start()
+
+    def tearDown(self):
+        self.session.stop()
+        super().tearDown()
+
+    def run_jobs(self, run_id, handlers, payloads):
+        for kind, payload in payloads:
+            JobQueue.enqueue(kind, payload, run_id=run_id, max_attempts=1)
+        db.session.commit()
+        return JobWorker(handlers, worker_id='w1').drain(run_id)
+
+    def test_run_telemetry_is_recorded_when_the_last_job_finishes(self):
+        def fetch(payload, job):
+            # Calls from pool threads count towards the job too
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                futures = [Telemetry.submit(pool, HttpClient.get, 'https://api.coingecko.com/api/v3/ping')
+                           for _ in range(payload['n'])]
+                [f.result() for f in futures]
+            HttpClient.get('https://api.blockcypher.com/v1/btc/main')
+            Holding.query.count()
+            return {'prices_checked': payload['n']}
+
+        def broken(payload, job):
+            raise RuntimeError('provider down')
+
+        self.run_jobs('r1', {'fetch': fetch, 'broken': broken},
+                      [('fetch', {'n': 3}), ('fetch', {'n': 2}), ('broken', {})])
+
+        run = db.session.get(CronRun, 'r1')
+        self.assertEqual(run.status, 'partial_error')
+        self.assertEqual(run.jobs, 3)
+        self.assertEqual(run.items, {'prices_checked': 5})
+        self.assertEqual(run.stages['fetch']['jobs'], 2)
+        self.assertEqual(run.stages['broken']['failed'], 1)
+        self.assertEqual(run.providers['coingecko']['calls'], 5)
+        self.assertEqual(run.providers['blockcypher']['errors'], 2)
+        self.assertIsNotNone(run.providers['coingecko']['p95_ms'])
+        self.assertGreaterEqual(run.db_stats['statements'], 2)
+        self.assertIn('provider down', run.errors[0])
+
+    def test_unfinished_run_is_not_recorded(self):
+        JobQueue.enqueue('noop', run_id='r1')
+        JobQueue.enqueue('noop', run_id='r1')
+        db.session.commit()
+        JobWorker({'noop': lambda p, job: {}}, worker_id='w1').run_one(run_id='r1')
+        self.assertIsNone(db.session.get(CronRun, 'r1'))
+
+    def test_runs_endpoint_reports_percentiles(self):
+        def fetch(payload, job):
+            for _ in range(payload['n']):
+                HttpClient.get('https://api.coingecko.com/api/v3/ping')
+            return {}
+
+        for i, n in enumerate((1, 2, 10)):
+            self.run_jobs(f"r{i}", {'fetch': fetch}, [('fetch', {'n': n})])
+
+        with patch.dict(os.environ, {'CRON_KEY': 'test-key'}):
+            history = self.client.get('/api/cron/runs?key=test-key&limit=10').json
+            single = self.client.get('/api/cron/runs/r2?key=test-key').json
+
+        self.assertEqual(len(history['runs']), 3)
+        calls = history['percentiles']['providers']['coingecko']['calls']
+        self.assertEqual((calls['p50'], calls['max']), (2, 10))
+        self.assertIn('fetch', history['percentiles']['stages_busy_ms'])
+        self.assertEqual(single['telemetry']['providers']['coingecko']['calls'], 10)
+
+    def test_latency_histogram_percentiles(self):
+        stats = Telemetry.merge([
+            {'http': {'x': {'calls': 2, 'errors': 0, 'time_ms': 6.0, 'max_ms': 4.0,
+                            'buckets': [2] + [0] * 12}}},
+            {'http': {'x': {'calls': 2, 'errors': 1, 'time_ms': 80000.0, 'max_ms': 60000.0,
+                            'buckets': [0] * 8 + [1] + [0] * 3 + [1]}}},
+        ])['http']['x']
+        self.assertEqual((stats['calls'], stats['errors']), (4, 1))
+        self.assertEqual(Telemetry.latency_percentile(stats, 0.5), 5)
+        self.assertEqual(Telemetry.latency_percentile(stats, 0.75), 2500)
+        self.assertEqual(Telemetry.latency_percentile(stats, 1.0), 60000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+from config import Config
+from app.routes.cliq import set_currency
+from app.services.coingecko_service import CoinGeckoService
+from app.services.fx_service import FxService
+from app.utils import format_currency
+
+# CoinGecko /exchange_rates values are units per 1 BTC
+RATES = {
+    'btc': {'value': 1.0, 'type': 'crypto'},
+    'sats': {'value': 100000000.0, 'type': 'crypto'},
+    'usd': {'value': 60000.0, 'type': 'fiat'},
+    'inr': {'value': 5000000.0, 'type': 'fiat'},
+    'eur': {'value': 55000.0, 'type': 'fiat'},
+    'xau': {'value': 25.0, 'type': 'commodity'},
+}
+
+
+class FxServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        FxService._rates = {}
+        FxService._fiat = set()
+        FxService._fetched_at = 0
+        self.fetch = patch.object(CoinGeckoService, 'fetch_exchange_rates', return_value=RATES)
+        self.mock_fetch = self.fetch.start()
+
+    def tearDown(self):
+        self.fetch.stop()
+        FxService._rates = {}
+        FxService._fiat = set()
+        FxService._fetched_at = 0
+
+    def test_converts_from_base_currency(self):
+        value, currency = FxService.convert(100.0, 'inr')
+        self.assertEqual(currency, 'inr')
+        self.assertAlmostEqual(value, 100.0 * 5000000.0 / 60000.0)
+
+    def test_rates_fetched_once_for_many_currencies(self):
+        for code in ('inr', 'eur', 'btc', 'inr', 'eur'):
+            FxService.convert(10.0, code)
+        self.assertEqual(self.mock_fetch.call_count, 1)
+
+    def test_base_currency_needs_no_rates(self):
+        value, currency = FxService.convert(42.0, Config.PRICE_BASE_CURRENCY)
+        self.assertEqual((value, currency), (42.0, Config.PRICE_BASE_CURRENCY))
+        self.mock_fetch.assert_not_called()
+
+    def test_unknown_currency_falls_back_to_base(self):
+        value, currency = FxService.convert(42.0, 'xyz')
+        self.assertEqual((value, currency), (42.0, Config.PRICE_BASE_CURRENCY))
+
+    def test_failed_refresh_keeps_last_rates(self):
+        FxService.get_rates()
+        FxService._fetched_at = 0
+        self.mock_fetch.side_effect = Exception("boom")
+        value, currency = FxService.convert(1.0, 'eur')
+        self.assertEqual(currency, 'eur')
+        self.assertAlmostEqual(value, 55000.0 / 60000.0)
+
+    def test_only_fiat_is_a_supported_display_currency(self):
+        self.assertTrue(FxService.is_supported('INR'))
+        self.assertTrue(FxService.is_supported(Config.PRICE_BASE_CURRENCY))
+        for code in ('sats', 'btc', 'xau', 'xyz'):
+            self.assertFalse(FxService.is_supported(code), code)
+
+    def test_currency_command_rejects_sats(self):
+        user = SimpleNamespace(currency='usd')
+        self.assertIn("not supported", set_currency(user, 'sats')['text'])
+        self.assertEqual(user.currency, 'usd')
+
+    def test_format_currency(self):
+        self.assertEqual(format_currency(1234.5), "$1,234.50")
+        self.assertEqual(format_currency(1234.5, 'inr'), "₹1,234.50")
+        self.assertEqual(format_currency(1, 'chf'), "CHF 1.00")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import event
+from app import db
+from app.models import User, Wallet, Holding
+from app.services.holding_service import HoldingService
+from app.utils import bulk_upsert
+from app_test_case import AppTestCase
+
+
+class HoldingServiceTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User(cliq_user_id='u1')
+        db.session.add(self.user)
+        db.session.commit()
+
+    def amounts(self, chain='eth'):
+        return {h.coin_id: h.amount for h in Holding.query.filter_by(user_id=self.user.id, chain=chain)}
+
+    def test_full_token_set_in_one_upsert(self):
+        tokens = [{'coin_id': f"token-{i}", 'amount': float(i + 1), 'chain': 'eth'} for i in range(300)]
+        user_id = self.user.id
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            upserted, removed, changed = HoldingService.replace_wallet_holdings(user_id, 'eth', tokens)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        db.session.commit()
+
+        self.assertEqual((upserted, removed, changed), (300, 0, True))
+        self.assertEqual(len(self.amounts()), 300)
+        # One SELECT of the current rows + one INSERT ... ON CONFLICT
+        self.assertEqual(len(statements), 2)
+
+    def test_updates_merges_and_prunes(self):
+        HoldingService.replace_wallet_holdings(self.user.id, 'eth', [
+            {'coin_id': 'ethereum', 'amount': 1.0, 'chain': 'eth'},
+            {'coin_id': 'chainlink', 'amount': 5.0, 'chain': 'eth'},
+        ])
+        db.session.add(Holding(user_id=self.user.id, coin_id='bitcoin', amount=1.0, chain='manual'))
+        db.session.commit()
+
+        # Native ETH + WETH both map to ethereum; chainlink dropped to zero
+        _, removed, changed = HoldingService.replace_wallet_holdings(self.user.id, 'eth', [
+            {'coin_id': 'ethereum', 'amount': 2.0, 'chain': 'eth'},
+            {'coin_id': 'ethereum', 'amount': 0.5, 'chain': 'eth'},
+        ])
+        db.session.commit()
+
+        self.assertEqual(removed, 1)
+        self.assertTrue(changed)
+        self.assertEqual(self.amounts(), {'ethereum': 2.5})
+        self.assertEqual(self.amounts('manual'), {'bitcoin': 1.0})
+
+    def test_unchanged_and_empty_results(self):
+        tokens = [{'coin_id': 'ethereum', 'amount': 1.0, 'chain': 'eth'}]
+        HoldingService.replace_wallet_holdings(self.user.id, 'eth', tokens)
+        db.session.commit()
+
+        self.assertFalse(HoldingService.replace_wallet_holdings(self.user.id, 'eth', tokens)[2])
+        # An empty set may be a provider failure: nothing is pruned
+        self.assertEqual(HoldingService.replace_wallet_holdings(self.user.id, 'eth', [])[1], 0)
+        self.assertEqual(self.amounts(), {'ethereum': 1.0})
+
+    def test_single_wallet_chains(self):
+        db.session.add_all([
+            Wallet(user_id=self.user.id, address='a', chain='eth'),
+            Wallet(user_id=self.user.id, address='b', chain='eth'),
+            Wallet(user_id=self.user.id, address='c', chain='sol'),
+        ])
+        db.session.commit()
+        self.assertEqual(HoldingService.single_wallet_chains([self.user.id]), {(self.user.id, 'sol')})
+
+    def test_bulk_upsert_falls_back_to_orm_merge(self):
+        existing = Holding(user_id=self.user.id, coin_id='ethereum', amount=1.0, chain='eth')
+        db.session.add(existing)
+        db.session.commit()
+        rows = [{'user_id': self.user.id, 'coin_id': 'ethereum', 'amount': 2.0, 'chain': 'eth'},
+                {'user_id': self.user.id, 'coin_id': 'chainlink', 'amount': 5.0, 'chain': 'eth'}]
+        key = ['user_id', 'coin_id', 'chain']
+
+        # A dialect without ON CONFLICT support
+        with patch.object(db.engine.dialect, 'name', 'mysql'):
+            self.assertEqual(bulk_upsert(db.session, Holding, rows, key_columns=key, update_columns=[]), 2)
+            self.assertEqual(self.amounts(), {'ethereum': 1.0, 'chainlink': 5.0})
+
+            bulk_upsert(db.session, Holding, rows[:1], key_columns=key)
+            db.session.commit()
+            self.assertEqual(self.amounts(), {'ethereum': 2.0, 'chainlink': 5.0})
+            self.assertEqual(Holding.query.filter_by(coin_id='ethereum').one().id, existing.id)
+
+            with db.engine.connect() as conn, self.assertRaises(ValueError):
+                bulk_upsert(conn, Holding, rows, key_columns=key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db, tasks
+from app.models import Job, Holding, Price, RunLock, User
+from app.services.coingecko_service import CoinGeckoService
+from app.services.job_queue import JobQueue, JobWorker
+from app.services.telemetry import Telemetry
+from app_test_case import AppTestCase
+
+
+class JobQueueTestCase(AppTestCase):
+    def test_claim_leases_job_once(self):
+        JobQueue.enqueue('noop', {'n': 1})
+        db.session.commit()
+
+        job = JobQueue.claim('w1')
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.locked_by, 'w1')
+        self.assertIsNone(JobQueue.claim('w2'))
+
+    def test_expired_lease_is_reclaimed(self):
+        JobQueue.enqueue('noop')
+        db.session.commit()
+        job = JobQueue.claim('w1')
+        job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        again = JobQueue.claim('w2')
+        self.assertEqual(again.id, job.id)
+        self.assertEqual(again.locked_by, 'w2')
+        self.assertEqual(again.attempts, 2)
+
+    def test_failure_retries_with_backoff_then_gives_up(self):
+        JobQueue.enqueue('boom', max_attempts=2)
+        db.session.commit()
+
+        def boom(payload, job):
+            raise RuntimeError("provider down")
+
+        worker = JobWorker({'boom': boom}, worker_id='w1')
+        self.assertTrue(worker.run_one())
+        job = Job.query.one()
+        self.assertEqual(job.status, 'pending')
+        self.assertGreater(job.run_after, datetime.utcnow())
+
+        # Not due yet
+        self.assertFalse(worker.run_one())
+
+        job.run_after = datetime.utcnow()
+        db.session.commit()
+        self.assertTrue(worker.run_one())
+        job = Job.query.one()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("provider down", job.last_error)
+
+    def test_run_status_sums_results(self):
+        for n in (2, 3):
+            JobQueue.enqueue('count', {'n': n}, run_id='r1')
+        db.session.commit()
+
+        status = JobWorker({'count': lambda p, job: {'items': p['n']}}, worker_id='w1').drain('r1')
+        self.assertEqual(status['status'], 'success')
+        self.assertEqual(status['jobs'], {'count': {'done': 2}})
+        self.assertEqual(status['results'], {'items': 5})
+
+    def test_run_tasks_enqueues_and_returns_202(self):
+        user = User(cliq_user_id='u1')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add(Holding(user_id=user.id, coin_id='bitcoin', amount=1, chain='manual'))
+        db.session.commit()
+
+        with patch.dict(os.environ, {'CRON_KEY': 'test-key'}), \
+             patch('app.tasks.CoinIndex.is_refresh_due', return_value=False):
+            response = self.client.get('/api/cron/run-tasks?key=test-key')
+        self.assertEqual(response.status_code, 202)
+        run_id = response.json['run_id']
+
+        kinds = sorted(j.kind for j in Job.query.filter_by(run_id=run_id))
+        self.assertEqual(kinds, ['history_rollup', 'price_batch'])
+
+        with patch.dict(os.environ, {'CRON_KEY': 'test-key'}):
+            status = self.client.get(f'/api/cron/runs/{run_id}?key=test-key')
+        self.assertEqual(status.json['status'], 'running')
+
+    def test_overlapping_run_returns_run_in_progress(self):
+        def run_tasks():
+            with patch.dict(os.environ, {'CRON_KEY': 'test-key'}), \
+                 patch('app.tasks.CoinIndex.is_refresh_due', return_value=False):
+                return self.client.get('/api/cron/run-tasks?key=test-key')
+
+        first = run_tasks()
+        self.assertEqual(first.status_code, 202)
+        jobs = Job.query.count()
+
+        second = run_tasks()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json, {'status': 'in_progress', 'run_id': first.json['run_id']})
+        self.assertEqual(Job.query.count(), jobs)
+
+        # Crashed run: its jobs are stuck, but the lease runs out
+        RunLock.query.update({RunLock.expires_at: datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        third = run_tasks()
+        self.assertEqual(third.status_code, 202)
+
+        # Finished run: lock is free before the lease ends
+        JobWorker(tasks.HANDLERS, worker_id='w1').drain(third.json['run_id'])
+        db.session.commit()
+        self.assertEqual(run_tasks().status_code, 202)
+
+    def test_price_batch_fans_out_alert_jobs(self):
+        quote = {
+            'current_price': 100.0,
+            'price_change_percentage_1h_in_currency': 12.0,
+            'price_change_percentage_24h_in_currency': 1.0,
+            'market_cap': 0, 'name': 'bitcoin', 'symbol': 'BTC'
+        }
+        JobQueue.enqueue('price_batch', {'coin_ids': ['bitcoin']}, run_id='r1')
+        db.session.commit()
+
+        with patch.object(CoinGeckoService, 'get_prices', return_value={'bitcoin': quote}), \
+             patch('app.tasks.AlertService.notify_many', return_value=1) as notify:
+            status = JobWorker(tasks.HANDLERS, worker_id='w1').drain('r1')
+
+        notify.assert_called_once()
+        self.assertEqual(status['jobs'], {'alert_fanout': {'done': 1}, 'price_batch': {'done': 1}})
+        self.assertEqual(status['results']['alerts_sent'], 1)
+        self.assertEqual(status['results']['prices_checked'], 1)
+        self.assertIn('db_time_ms', status['results'])
+        self.assertEqual(db.session.get(Price, 'bitcoin').last_price, 100.0)
+
+        # A second tick updates the row in place
+        quote['current_price'] = 105.0
+        JobQueue.enqueue('price_batch', {'coin_ids': ['bitcoin']}, run_id='r2')
+        db.session.commit()
+        with patch.object(CoinGeckoService, 'get_prices', return_value={'bitcoin': quote}), \
+             patch('app.tasks.AlertService.notify_many', return_value=1):
+            JobWorker(tasks.HANDLERS, worker_id='w1').drain('r2')
+        db.session.expire_all()
+        self.assertEqual(Price.query.count(), 1)
+        self.assertEqual(db.session.get(Price, 'bitcoin').last_price, 105.0)
+
+    def test_price_batch_counts_only_its_own_requests(self):
+        quote = {'current_price': 1.0, 'price_change_percentage_1h_in_currency': 0.0,
+                 'price_change_percentage_24h_in_currency': 0.0, 'name': 'bitcoin', 'symbol': 'BTC'}
+
+        def get_prices(coin_ids, use_cache=True):
+            for _ in range(2):
+                Telemetry.record_http('https://api.coingecko.com/api/v3/coins/markets', 5.0, True)
+                CoinGeckoService._count_request()
+            # Requests another worker thread of this process makes meanwhile
+            for _ in range(5):
+                CoinGeckoService._count_request()
+            return {'bitcoin': quote}
+
+        JobQueue.enqueue('price_batch', {'coin_ids': ['bitcoin']}, run_id='r1')
+        db.session.commit()
+        with patch.object(CoinGeckoService, 'get_prices', side_effect=get_prices):
+            status = JobWorker(tasks.HANDLERS, worker_id='w1').drain('r1')
+        self.assertEqual(status['results']['coingecko_requests'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
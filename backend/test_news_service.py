@@ -0,0 +1,128 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from config import Config
+from app import db
+from app.models import NewsCache
+from app.services.news_service import NewsService
+from app_test_case import AppTestCase
+
+
+def post(url, title='Headline', codes=('BTC',)):
+    return {'title': title, 'url': url, 'domain': 'example.com', 'published_at': '2026-10-18T00:00:00Z',
+            'currencies': [{'code': c} for c in codes]}
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def json(self):
+        return self.data
+
+
+class NewsServiceTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.key = patch.object(Config, 'NEWS_API_KEY', 'test-key')
+        self.key.start()
+
+    def tearDown(self):
+        self.key.stop()
+        super().tearDown()
+
+    def test_fetches_each_symbol_once_per_ttl(self):
+        items = [{'title': 'BTC up', 'url': 'https://a.com/1', 'source': 'a.com', 'published_at': ''}]
+        fetch_batch = lambda symbols: {s: items for s in symbols}
+        with patch.object(NewsService, 'fetch_news_batch', side_effect=fetch_batch) as fetch:
+            self.assertEqual(NewsService.search_news('btc'), items)
+            db.session.commit()
+            news = NewsService.get_news(['BTC', 'ETH', 'SOL'])
+            db.session.commit()
+            self.assertEqual(NewsService.search_news('ETH'), items)
+
+        # Only the missing symbols, together in one batch
+        self.assertEqual([c.args[0] for c in fetch.call_args_list], [['BTC'], ['ETH', 'SOL']])
+        self.assertEqual(set(news), {'BTC', 'ETH', 'SOL'})
+
+    def test_expired_entry_is_refetched_and_kept_on_failure(self):
+        old = [{'title': 'old', 'url': 'https://a.com/old', 'source': 'a.com', 'published_at': ''}]
+        db.session.add(NewsCache(symbol='SOL', items=old,
+                                 fetched_at=datetime.utcnow() - timedelta(seconds=Config.NEWS_CACHE_TTL + 1)))
+        db.session.commit()
+
+        with patch.object(NewsService, 'fetch_news_batch', return_value={'SOL': None}) as fetch:
+            self.assertEqual(NewsService.search_news('SOL'), old)
+            db.session.commit()
+            # The failed refresh still counts as this window's fetch
+            self.assertEqual(NewsService.search_news('SOL'), old)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_posts_are_deduplicated_by_url(self):
+        news = NewsService._split_posts([
+            post('https://www.site.com/story/?utm_source=x', 'First'),
+            post('http://site.com/story', 'Repost'),
+            post('https://site.com/story?id=2', 'Other story'),
+        ], ['BTC'])
+        self.assertEqual([i['title'] for i in news['BTC']], ['First', 'Other story'])
+
+    def test_batch_query_is_split_per_currency(self):
+        page = {'results': [
+            post('https://a.com/1', 'BTC and ETH', codes=('BTC', 'ETH')),
+            post('https://a.com/2', 'ETH only', codes=('ETH',)),
+            post('https://a.com/3', 'Not requested', codes=('DOGE',)),
+        ], 'next': None}
+        with patch('app.services.news_service.HttpClient.get', return_value=FakeResponse(page)) as get:
+            news = NewsService.fetch_news_batch(['btc', 'eth', 'sol'])
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs['params']['currencies'], 'BTC,ETH,SOL')
+        self.assertEqual({s: [i['title'] for i in items] for s, items in news.items()}, {
+            'BTC': ['BTC and ETH'], 'ETH': ['BTC and ETH', 'ETH only'], 'SOL': []
+        })
+
+    def test_batches_are_chunked_and_follow_next_pages(self):
+        pages = [
+            FakeResponse({'results': [post('https://a.com/1', codes=('AAA',))], 'next': 'https://next/page2'}),
+            FakeResponse({'results': [post('https://a.com/2', codes=('BBB',))], 'next': None}),
+            FakeResponse({'results': [post('https://a.com/3', codes=('CCC',))], 'next': None}),
+        ]
+        with patch.object(Config, 'NEWS_BATCH_SIZE', 2), \
+                patch('app.services.news_service.HttpClient.get', side_effect=pages) as get:
+            news = NewsService.fetch_news_batch(['AAA', 'BBB', 'CCC'])
+
+        self.assertEqual([c.args[0] for c in get.call_args_list][1], 'https://next/page2')
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual({s: len(items) for s, items in news.items()}, {'AAA': 1, 'BBB': 1, 'CCC': 1})
+
+    def test_failed_request_maps_to_none(self):
+        with patch('app.services.news_service.HttpClient.get', side_effect=ConnectionError('down')):
+            self.assertEqual(NewsService.fetch_news_batch(['BTC']), {'BTC': None})
+
+    def test_error_response_keeps_cached_items(self):
+        old = [{'title': 'old', 'url': 'https://a.com/old', 'source': 'a.com', 'published_at': ''}]
+        db.session.add(NewsCache(symbol='BTC', items=old,
+                                 fetched_at=datetime.utcnow() - timedelta(seconds=Config.NEWS_CACHE_TTL + 1)))
+        db.session.commit()
+
+        rate_limited = FakeResponse({'status': 'api_error', 'info': 'Rate limit exceeded'}, status_code=429)
+        with patch('app.services.news_service.HttpClient.get', return_value=rate_limited):
+            self.assertEqual(NewsService.fetch_news_batch(['BTC', 'ETH']), {'BTC': None, 'ETH': None})
+            self.assertEqual(NewsService.get_news(['BTC']), {'BTC': old})
+        db.session.commit()
+        self.assertEqual(db.session.get(NewsCache, 'BTC').items, old)
+
+        # A 200 without a results list is no better
+        with patch('app.services.news_service.HttpClient.get', return_value=FakeResponse({'status': 'api_error'})):
+            self.assertEqual(NewsService.fetch_news_batch(['BTC']), {'BTC': None})
+
+    def test_disabled_without_api_key(self):
+        with patch.object(Config, 'NEWS_API_KEY', None), \
+                patch.object(NewsService, 'fetch_news_batch') as fetch:
+            self.assertEqual(NewsService.search_news('BTC'), [])
+        fetch.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
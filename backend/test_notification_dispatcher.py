@@ -0,0 +1,91 @@
+import threading
+import unittest
+from unittest.mock import patch
+from config import Config
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.rate_limiter import RateLimiter
+from app.services.zoho_service import ZohoService
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = ''
+
+
+class NotificationDispatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.config = patch.multiple(Config, BOT_TOKEN='t', BOT_ID='b', CLIQ_RETRY_BASE_SECONDS=0.01,
+                                     CLIQ_MAX_ATTEMPTS=3, CLIQ_RATE_LIMIT=60000, CLIQ_DISPATCH_WORKERS=4)
+        self.config.start()
+        RateLimiter.reset()
+        NotificationDispatcher.reset()
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def tearDown(self):
+        NotificationDispatcher.reset()
+        RateLimiter.reset()
+        self.config.stop()
+
+    def run_with(self, responder, messages):
+        def fake_post(channel_id, payload, timeout=None):
+            with self.lock:
+                self.calls.append((channel_id, payload['seq']))
+            return responder(channel_id, payload)
+
+        with patch.object(ZohoService, 'post_message', side_effect=fake_post):
+            for channel_id, seq in messages:
+                self.assertTrue(NotificationDispatcher.submit(channel_id, {'seq': seq}))
+            self.assertTrue(NotificationDispatcher.drain(timeout=10))
+        return NotificationDispatcher.get_stats()
+
+    def test_per_channel_order(self):
+        messages = [(f"ch{i % 5}", i) for i in range(100)]
+        stats = self.run_with(lambda ch, p: FakeResponse(200), messages)
+
+        self.assertEqual(stats['sent'], 100)
+        for ch in {c for c, _ in messages}:
+            seqs = [seq for c, seq in self.calls if c == ch]
+            self.assertEqual(seqs, sorted(seqs))
+
+    def test_retries_server_errors_then_succeeds(self):
+        failures = {'left': 2}
+
+        def responder(ch, p):
+            if failures['left']:
+                failures['left'] -= 1
+                return FakeResponse(503)
+            return FakeResponse(200)
+
+        stats = self.run_with(responder, [('ch', 1)])
+        self.assertEqual((stats['sent'], stats['retried'], stats['dead_lettered']), (1, 2, 0))
+
+    def test_rate_limit_does_not_use_attempts(self):
+        limited = {'left': 4}  # more than CLIQ_MAX_ATTEMPTS
+
+        def responder(ch, p):
+            if limited['left']:
+                limited['left'] -= 1
+                return FakeResponse(429, {'Retry-After': '0'})
+            return FakeResponse(200)
+
+        stats = self.run_with(responder, [('ch', 1)])
+        self.assertEqual((stats['sent'], stats['rate_limited']), (1, 4))
+
+    def test_dead_letters(self):
+        stats = self.run_with(lambda ch, p: FakeResponse(400 if p['seq'] == 1 else 500), [('a', 1), ('b', 2)])
+        self.assertEqual(stats['dead_lettered'], 2)
+
+        dead = {d['payload']['seq']: d['attempts'] for d in NotificationDispatcher.dead_letters()}
+        # 4xx is not retried; 5xx is retried up to CLIQ_MAX_ATTEMPTS
+        self.assertEqual(dead, {1: 1, 2: 3})
+
+    def test_submit_without_credentials(self):
+        with patch.object(Config, 'BOT_TOKEN', None):
+            self.assertFalse(NotificationDispatcher.submit('ch', {'seq': 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from config import Config
+from app import db
+from app.models import OutboxMessage
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.outbox_relay import Outbox, OutboxRelay
+from app.services.rate_limiter import RateLimiter
+from app.services.zoho_service import ZohoService
+from app_test_case import AppTestCase
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ''
+
+
+class OutboxRelayTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.config = patch.multiple(Config, BOT_TOKEN='t', BOT_ID='b', CLIQ_RETRY_BASE_SECONDS=0.01,
+                                     CLIQ_MAX_ATTEMPTS=2, CLIQ_RATE_LIMIT=60000)
+        self.config.start()
+        RateLimiter.reset()
+        NotificationDispatcher.reset()
+
+    def tearDown(self):
+        NotificationDispatcher.reset()
+        RateLimiter.reset()
+        self.config.stop()
+        super().tearDown()
+
+    def add(self, *channels):
+        Outbox.add_many([{'idempotency_key': f"key-{ch}", 'channel_id': ch, 'payload': {'text': ch}}
+                         for ch in channels])
+        db.session.commit()
+
+    def relay(self, status_for_channel):
+        posted = []
+
+        def fake_post(channel_id, payload, timeout=None):
+            posted.append(channel_id)
+            return FakeResponse(status_for_channel(channel_id))
+
+        with patch.object(ZohoService, 'post_message', side_effect=fake_post):
+            self.assertTrue(OutboxRelay(worker_id='test').drain(timeout=10))
+        db.session.expire_all()
+        return posted
+
+    def statuses(self):
+        return {m.channel_id: (m.status, m.attempts) for m in OutboxMessage.query}
+
+    def test_duplicate_keys_are_ignored(self):
+        self.add('a', 'b')
+        self.add('a')
+        self.assertEqual(OutboxMessage.query.count(), 2)
+
+    def test_relay_delivers_and_records_outcomes(self):
+        self.add('ok', 'bad-request', 'server-error')
+        codes = {'ok': 200, 'bad-request': 400, 'server-error': 503}
+        posted = self.relay(codes.get)
+
+        self.assertEqual(posted.count('ok'), 1)
+        self.assertEqual(self.statuses(), {
+            'ok': ('sent', 1),
+            'bad-request': ('dead', 1),      # Permanent: not retried
+            'server-error': ('pending', 1),  # Dispatcher gave up; outbox retries later
+        })
+        retry = OutboxMessage.query.filter_by(channel_id='server-error').one()
+        self.assertGreater(retry.run_after, datetime.utcnow())
+        self.assertIn('HTTP 503', retry.last_error)
+
+        # Final outbox attempt dead-letters it
+        retry.run_after = datetime.utcnow()
+        retry.attempts = Config.OUTBOX_MAX_ATTEMPTS - 1
+        db.session.commit()
+        self.relay(codes.get)
+        self.assertEqual(self.statuses()['server-error'], ('dead', Config.OUTBOX_MAX_ATTEMPTS))
+
+    def test_expired_lease_is_reclaimed(self):
+        self.add('a')
+        self.assertEqual(len(Outbox.claim('crashed-relay', 10)), 1)
+        self.assertEqual(Outbox.claim('other', 10), [])
+
+        OutboxMessage.query.update({OutboxMessage.locked_until: datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+        self.relay(lambda ch: 200)
+        self.assertEqual(self.statuses(), {'a': ('sent', 2)})
+
+    def test_refused_messages_are_released(self):
+        self.add('a')
+        with patch.object(Config, 'BOT_TOKEN', None):
+            self.relay(lambda ch: 200)
+        self.assertEqual(self.statuses(), {'a': ('pending', 0)})
+
+    def test_purge_keeps_recent_and_undelivered(self):
+        self.add('old', 'recent', 'pending')
+        now = datetime.utcnow()
+        for channel, sent_at in (('old', now - timedelta(hours=Config.OUTBOX_RETENTION_HOURS + 1)),
+                                 ('recent', now)):
+            OutboxMessage.query.filter_by(channel_id=channel).update({'status': 'sent', 'sent_at': sent_at})
+        db.session.commit()
+
+        self.assertEqual(Outbox.purge(), 1)
+        self.assertEqual(sorted(self.statuses()), ['pending', 'recent'])
+
+
+if __name__ == '__main__':
+    unittest.main()
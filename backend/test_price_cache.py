@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from config import Config
+from app import db
+from app.models import Price
+from app.services.price_cache import PriceCache
+from app_test_case import AppTestCase
+
+
+def quote(price):
+    return {
+        'current_price': price,
+        'price_change_percentage_1h_in_currency': 0,
+        'price_change_percentage_24h_in_currency': 0,
+        'market_cap': 0,
+        'name': 'bitcoin',
+        'symbol': 'BTC'
+    }
+
+
+class PriceCacheTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        PriceCache.clear()
+        self.calls = []
+
+        # Run background work inline so assertions are deterministic
+        self.submit = patch.object(PriceCache, '_submit', side_effect=lambda fn, *args: fn(*args))
+        self.submit.start()
+
+    def tearDown(self):
+        self.submit.stop()
+        PriceCache.clear()
+        super().tearDown()
+
+    def fetcher(self, coin_ids):
+        self.calls.append(sorted(coin_ids))
+        return {cid: quote(100.0) for cid in coin_ids}
+
+    def test_miss_then_hit(self):
+        first = PriceCache.get_many(['bitcoin'], self.fetcher)
+        second = PriceCache.get_many(['bitcoin'], self.fetcher)
+
+        self.assertEqual(first['bitcoin']['current_price'], 100.0)
+        self.assertEqual(second, first)
+        self.assertEqual(self.calls, [['bitcoin']])
+
+        stats = PriceCache.get_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_stale_entry_is_served_and_refreshed(self):
+        PriceCache.get_many(['bitcoin'], self.fetcher)
+        data, fetched_at = PriceCache._entries['bitcoin']
+        PriceCache._entries['bitcoin'] = (quote(50.0), fetched_at - Config.PRICE_CACHE_TTL - 1)
+
+        result = PriceCache.get_many(['bitcoin'], self.fetcher)
+
+        # Stale quote returned immediately, refresh replaced it afterwards
+        self.assertEqual(result['bitcoin']['current_price'], 50.0)
+        self.assertEqual(PriceCache._entries['bitcoin'][0]['current_price'], 100.0)
+        stats = PriceCache.get_stats()
+        self.assertEqual(stats['stale'], 1)
+        self.assertEqual(stats['refreshes'], 1)
+
+    def test_expired_entry_is_fetched_synchronously(self):
+        PriceCache.get_many(['bitcoin'], self.fetcher)
+        data, fetched_at = PriceCache._entries['bitcoin']
+        too_old = Config.PRICE_CACHE_TTL + Config.PRICE_CACHE_STALE_TTL + 1
+        PriceCache._entries['bitcoin'] = (quote(50.0), fetched_at - too_old)
+
+        result = PriceCache.get_many(['bitcoin'], self.fetcher)
+
+        self.assertEqual(result['bitcoin']['current_price'], 100.0)
+        self.assertEqual(PriceCache.get_stats()['misses'], 2)
+
+    def test_warm_start_from_price_table(self):
+        db.session.add(Price(coin_id='ethereum', name='Ethereum', symbol='ETH',
+                             last_price=2000.0, updated_at=datetime.utcnow() - timedelta(seconds=5)))
+        db.session.commit()
+
+        result = PriceCache.get_many(['ethereum'], self.fetcher)
+
+        self.assertEqual(result['ethereum']['current_price'], 2000.0)
+        self.assertEqual(result['ethereum']['symbol'], 'ETH')
+        self.assertEqual(self.calls, [])
+
+    def test_fetched_quotes_are_written_through(self):
+        PriceCache.get_many(['bitcoin'], self.fetcher)
+
+        record = db.session.get(Price, 'bitcoin')
+        self.assertIsNotNone(record)
+        self.assertEqual(record.last_price, 100.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+from config import Config
+from app.models import PriceTick, PriceBar
+from app.services.price_history_service import PriceHistoryService
+from app_test_case import AppTestCase
+
+
+DAY = 86400
+NOW = 1_800_000_000 - 1_800_000_000 % 3600  # aligned to the hour
+
+
+def quotes(price):
+    return {'bitcoin': {'current_price': price}}
+
+
+class PriceHistoryTestCase(AppTestCase):
+    def test_recent_ticks_stay_raw(self):
+        for i in range(5):
+            PriceHistoryService.record(quotes(100 + i), ts=NOW - i * 60)
+        PriceHistoryService.rollup(now=NOW)
+
+        self.assertEqual(PriceTick.query.count(), 5)
+        points = PriceHistoryService.get_range('bitcoin', NOW - 3600, NOW)
+        self.assertEqual([p['close'] for p in points], [104, 103, 102, 101, 100])
+
+    def test_old_ticks_roll_into_five_minute_bars(self):
+        start = NOW - 3 * DAY
+        for i, price in enumerate([10, 14, 8, 12]):
+            PriceHistoryService.record(quotes(price), ts=start + i * 60)
+        PriceHistoryService.rollup(now=NOW)
+
+        self.assertEqual(PriceTick.query.count(), 0)
+        bar = PriceBar.query.one()
+        self.assertEqual((bar.resolution, bar.bucket), (300, start))
+        self.assertEqual((bar.open, bar.high, bar.low, bar.close, bar.samples), (10, 14, 8, 12, 4))
+
+    def test_expired_ticks_roll_up_in_chunks(self):
+        start = NOW - 3 * DAY
+        # Three buckets of four ticks; a chunk of three never splits a bucket
+        for i in range(12):
+            PriceHistoryService.record(quotes(100 + i), ts=start + i * 75)
+        with patch.object(Config, 'PRICE_HISTORY_ROLLUP_CHUNK', 3), \
+                patch.object(PriceHistoryService, '_write_bars', wraps=PriceHistoryService._write_bars) as write_bars:
+            result = PriceHistoryService.rollup(now=NOW)
+
+        self.assertEqual(write_bars.call_count - 1, 3)  # one call per chunk, plus the 5m -> 1h pass
+        self.assertEqual((result['ticks_rolled'], result['bars_5m_written']), (12, 3))
+        self.assertEqual(PriceTick.query.count(), 0)
+        bars = PriceBar.query.order_by(PriceBar.bucket).all()
+        self.assertEqual([(b.bucket, b.open, b.high, b.low, b.close, b.samples) for b in bars],
+                         [(start + k * 300, 100 + 4 * k, 103 + 4 * k, 100 + 4 * k, 103 + 4 * k, 4) for k in range(3)])
+
+    def test_old_bars_roll_into_hourly_bars(self):
+        start = NOW - 40 * DAY
+        for i, price in enumerate([10, 20, 5, 15]):
+            PriceHistoryService.record(quotes(price), ts=start + i * 600)
+        PriceHistoryService.rollup(now=NOW)
+
+        bar = PriceBar.query.one()
+        self.assertEqual((bar.resolution, bar.bucket), (3600, start))
+        self.assertEqual((bar.open, bar.high, bar.low, bar.close, bar.samples), (10, 20, 5, 15, 4))
+
+    def test_range_spans_all_tiers_without_overlap(self):
+        for ts in (NOW - 40 * DAY, NOW - 3 * DAY, NOW - 600):
+            PriceHistoryService.record(quotes(1.0), ts=ts)
+        PriceHistoryService.rollup(now=NOW)
+
+        points = PriceHistoryService.get_range('bitcoin', NOW - 60 * DAY, NOW)
+        self.assertEqual([p['resolution'] for p in points], [3600, 300, 0])
+        self.assertEqual([p['ts'] for p in points], sorted(p['ts'] for p in points))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from config import Config
+from app.services.rate_limiter import TokenBucket, RateLimiter
+from app.services.coingecko_service import CoinGeckoService
+from app.services.http_client import HttpClient
+
+
+def response(status, payload=None, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.json.return_value = payload or []
+    return resp
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 tokens/s
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0))
+
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def test_penalize_blocks_until_retry_after(self):
+        bucket = TokenBucket(rate_per_minute=6000, capacity=5)
+        bucket.penalize(0.2)
+        self.assertFalse(bucket.acquire(timeout=0.05))
+        self.assertTrue(bucket.acquire(timeout=1))
+
+
+class BatchFetchTestCase(unittest.TestCase):
+    def setUp(self):
+        RateLimiter.reset()
+        self.rate_limit = patch.object(Config, 'COINGECKO_RATE_LIMIT', 6000)
+        self.rate_limit.start()
+
+    def tearDown(self):
+        self.rate_limit.stop()
+        RateLimiter.reset()
+
+    def test_rate_limited_batch_is_requeued(self):
+        coin_ids = [f"coin-{i}" for i in range(120)]
+        calls = []
+
+        def fake_get(url, params=None, **kwargs):
+            ids = params['ids'].split(',')
+            calls.append(ids)
+            if len(calls) == 1:
+                return response(429, headers={'Retry-After': '0'})
+            return response(200, [{'id': cid, 'current_price': 1.0} for cid in ids])
+
+        with patch.object(HttpClient, 'get', side_effect=fake_get):
+            result = CoinGeckoService._fetch_prices(coin_ids)
+
+        self.assertEqual(set(result), set(coin_ids))
+        batches = CoinGeckoService._pack_batches(coin_ids)
+        self.assertEqual(len(calls), len(batches) + 1)
+
+    def test_persistent_failure_drops_only_that_batch(self):
+        coin_ids = [f"coin-{i}" for i in range(100)]
+
+        def fake_get(url, params=None, **kwargs):
+            ids = params['ids'].split(',')
+            if 'coin-0' in ids:
+                return response(500)
+            return response(200, [{'id': cid, 'current_price': 1.0} for cid in ids])
+
+        with patch.object(Config, 'COINGECKO_MAX_URL_LENGTH', 600), \
+                patch.object(HttpClient, 'get', side_effect=fake_get):
+            batches = CoinGeckoService._pack_batches(coin_ids)
+            result = CoinGeckoService._fetch_prices(coin_ids)
+
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(len(result), 100 - len(batches[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
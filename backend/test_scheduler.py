@@ -0,0 +1,109 @@
+import ast
+import io
+import os
+import subprocess
+import sys
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import db, tasks, worker
+from app.models import Job, Holding, Price, RunLock, User
+from app.services.run_lock import RunInProgress
+from app.worker import StageScheduler
+from app_test_case import AppTestCase
+
+
+class SchedulerTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        users = [User(cliq_user_id=f'u{i}') for i in range(3)]
+        db.session.add_all(users)
+        db.session.commit()
+        # ETH held by three users, BTC by one
+        for user in users:
+            db.session.add(Holding(user_id=user.id, coin_id='ethereum', amount=1, chain='manual'))
+        db.session.add(Holding(user_id=users[0].id, coin_id='bitcoin', amount=1, chain='manual'))
+        db.session.add_all([Price(coin_id='bitcoin', symbol='BTC'), Price(coin_id='ethereum', symbol='ETH')])
+        db.session.commit()
+
+    def test_stage_run_has_its_own_lock(self):
+        run_id, count = tasks.start_run(['prices'])
+        self.assertEqual(count, 1)
+        self.assertEqual([j.kind for j in Job.query.filter_by(run_id=run_id)], ['price_batch'])
+
+        # A slow prices run blocks the next prices run, not the other stages
+        with self.assertRaises(RunInProgress) as ctx:
+            tasks.start_run(['prices'])
+        self.assertEqual(ctx.exception.run_id, run_id)
+        db.session.rollback()
+
+        news_run, _ = tasks.start_run(['news'])
+        self.assertEqual([j.kind for j in Job.query.filter_by(run_id=news_run)], ['news_refresh'])
+        with patch('app.tasks.CoinIndex.is_refresh_due', return_value=False):
+            tasks.start_run()
+        self.assertEqual(db.session.get(RunLock, 'stage:prices').run_id, run_id)
+
+    def test_unknown_stage_is_rejected(self):
+        with self.assertRaises(ValueError):
+            tasks.start_run(['prices', 'weather'])
+        self.assertEqual(Job.query.count(), 0)
+
+    def test_news_refresh_warms_most_held_symbols(self):
+        with patch('app.tasks.NewsService.get_news', side_effect=lambda symbols: dict.fromkeys(symbols, [])) as get_news:
+            result = tasks.refresh_news({}, None)
+        get_news.assert_called_once_with(['ETH', 'BTC'])
+        self.assertEqual(result, {'news_symbols': 2})
+
+    def test_setup_runs_overdue_stages_first(self):
+        now = datetime.utcnow()
+        db.session.add_all([
+            RunLock(name='stage:prices', run_id='r1', acquired_at=now - timedelta(seconds=10), expires_at=now),
+            RunLock(name='stage:wallets', run_id='r2', acquired_at=now - timedelta(hours=2), expires_at=now),
+        ])
+        db.session.commit()
+
+        scheduler = StageScheduler(self.app, {'prices': 60, 'wallets': 900, 'news': 600, 'history': 0}, jitter=0)
+        scheduler.setup()
+        next_runs = {job.job_func.args[0]: job.next_run for job in scheduler.scheduler.jobs}
+
+        # history is disabled, prices resumes its cadence, wallets and news never ran recently
+        self.assertEqual(set(next_runs), {'prices', 'wallets', 'news'})
+        self.assertGreater(next_runs['prices'], datetime.now() + timedelta(seconds=40))
+        self.assertLessEqual(next_runs['wallets'], datetime.now())
+        self.assertLessEqual(next_runs['news'], datetime.now())
+
+        with patch('app.worker.tasks.start_run', return_value=('abcdef1234', 1)) as start_run:
+            scheduler.scheduler.run_pending()
+        self.assertEqual(sorted(call.args[0] for call in start_run.call_args_list), [['news'], ['wallets']])
+
+    def test_run_in_progress_is_skipped(self):
+        scheduler = StageScheduler(self.app, {'prices': 60}, jitter=0)
+        with patch('app.worker.tasks.start_run', side_effect=RunInProgress('r1')):
+            scheduler.run_stage('prices')
+
+        with self.assertRaises(ValueError):
+            StageScheduler(self.app, {'weather': 60})
+
+    def test_stages_flag_rejects_unknown_names(self):
+        with patch('sys.argv', ['app.worker', '--stages', 'price,wallets']), \
+                patch('sys.stderr', io.StringIO()) as stderr, \
+                patch('app.worker.create_app') as create_app:
+            with self.assertRaises(SystemExit):
+                worker.main()
+        create_app.assert_not_called()
+        self.assertIn('unknown stages: price', stderr.getvalue())
+
+        # Only stages that are switched off: nothing is scheduled, not everything
+        self.assertEqual(StageScheduler(self.app, {'news': 0}).intervals, {})
+
+    def test_schedule_intervals_override_single_stages(self):
+        # Config reads the environment at import, so check it in a fresh interpreter
+        env = {**os.environ, 'SCHEDULE_INTERVALS': 'prices:30,news:0'}
+        out = subprocess.run([sys.executable, '-c', 'from config import Config; print(Config.SCHEDULE_INTERVALS)'],
+                             env=env, capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        self.assertEqual(ast.literal_eval(out.strip().splitlines()[-1]),
+                         {'prices': 30, 'wallets': 900, 'news': 0, 'coin_index': 3600, 'history': 3600})
+
+if __name__ == '__main__':
+    unittest.main()
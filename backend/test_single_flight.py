@@ -0,0 +1,72 @@
+import threading
+import time
+import unittest
+from app.services.single_flight import SingleFlight, coalesce
+
+
+class SingleFlightTestCase(unittest.TestCase):
+    def setUp(self):
+        SingleFlight.reset()
+        self.executions = 0
+
+    def run_concurrently(self, fn, args_list):
+        results = [None] * len(args_list)
+
+        def worker(i, args):
+            results[i] = fn(*args)
+
+        threads = [threading.Thread(target=worker, args=(i, args)) for i, args in enumerate(args_list)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_identical_calls_share_one_execution(self):
+        @coalesce('test.prices')
+        def fetch(coin_ids):
+            self.executions += 1
+            time.sleep(0.1)
+            return {'ids': sorted(coin_ids)}
+
+        # Same request spelled differently still coalesces
+        results = self.run_concurrently(fetch, [(['bitcoin', 'ethereum'],), (['Ethereum', 'bitcoin'],)] * 5)
+
+        self.assertEqual(self.executions, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        stats = SingleFlight.get_stats()['test.prices']
+        self.assertEqual(stats['calls'], 10)
+        self.assertEqual(stats['coalesced'], 9)
+
+    def test_different_keys_run_separately(self):
+        @coalesce('test.search')
+        def search(query):
+            self.executions += 1
+            time.sleep(0.05)
+            return query
+
+        results = self.run_concurrently(search, [('btc',), ('eth',)])
+
+        self.assertEqual(self.executions, 2)
+        self.assertEqual(sorted(results), ['btc', 'eth'])
+
+    def test_errors_propagate_to_waiters(self):
+        @coalesce('test.error')
+        def broken():
+            time.sleep(0.05)
+            raise RuntimeError('boom')
+
+        errors = []
+
+        def call():
+            try:
+                broken()
+            except RuntimeError as e:
+                errors.append(e)
+
+        self.run_concurrently(call, [()] * 3)
+        self.assertEqual(len(errors), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
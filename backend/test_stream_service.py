@@ -0,0 +1,123 @@
+import contextlib
+import io
+import json
+import unittest
+from unittest.mock import patch
+from config import Config
+from app import db
+from app.models import Holding, Price, User
+from app.services.alert_service import AlertService
+from app.services.coingecko_service import CoinGeckoService
+from app.services.price_service import PriceService
+from app.services.stream_service import PriceStreamConsumer
+from app_test_case import AppTestCase
+from benchmarks.stubs import StubServer, price_feed_stub
+
+
+def tick(coin_id, price, change_1h=0.0):
+    return {'id': coin_id, 'symbol': coin_id[:3], 'name': coin_id.title(), 'current_price': price,
+            'price_change_percentage_1h_in_currency': change_1h,
+            'price_change_percentage_24h_in_currency': 0.0}
+
+
+class PriceStreamConsumerTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User(cliq_user_id='u1', default_channel_id='ch')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add_all([Holding(user_id=user.id, coin_id=cid, amount=1, chain='manual')
+                            for cid in ('bitcoin', 'ethereum')])
+        db.session.commit()
+
+        self.consumer = PriceStreamConsumer(url='http://feed.invalid/stream', flush_interval=60)
+        self.notify = patch.object(AlertService, 'notify_many', side_effect=lambda flagged, prices: len(flagged))
+        self.notify_many = self.notify.start()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+
+    def tearDown(self):
+        self.quiet.__exit__(None, None, None)
+        self.notify.stop()
+        super().tearDown()
+
+    def test_consumes_sse_feed(self):
+        handler = price_feed_stub(['bitcoin', 'ethereum', 'dogecoin'], events_per_second=0,
+                                  ticks_per_event=5, total_events=20, jump_probability=0)
+        with StubServer(handler) as feed:
+            self.consumer.url = f"{feed.url}/stream"
+            self.consumer.consume_once()
+
+        stats = self.consumer.stats
+        self.assertEqual(stats['events'], 20)
+        self.assertEqual(stats['ticks'] + stats['ticks_ignored'], 100)
+        # dogecoin is on the feed but nobody holds it
+        self.assertGreater(stats['ticks_ignored'], 0)
+        self.assertEqual(sorted(p.coin_id for p in Price.query), ['bitcoin', 'ethereum'])
+        self.assertEqual(stats['flushes'], 1)
+
+    def test_ignores_untracked_coins_missing_prices_and_bad_events(self):
+        self.consumer.handle_event('not json')
+        self.consumer.handle_event(json.dumps(tick('dogecoin', 1.0)))
+        self.consumer.handle_event(json.dumps([tick('bitcoin', None), tick('ETHEREUM', 2000.0)]))
+
+        self.assertEqual(self.consumer.stats['events'], 2)
+        self.assertEqual(self.consumer.stats['ticks_ignored'], 2)
+        self.assertEqual(list(self.consumer.buffer), ['ethereum'])
+        self.assertEqual(self.consumer.buffer['ethereum']['symbol'], 'ETH')
+
+    def test_alerts_are_edge_triggered(self):
+        def flush_with(change):
+            self.consumer.handle_event(json.dumps(tick('bitcoin', 100.0, change)))
+            self.consumer.flush()
+
+        flush_with(Config.VOLATILITY_1H_THRESHOLD + 2)
+        flush_with(Config.VOLATILITY_1H_THRESHOLD + 3)
+        self.assertEqual(self.notify_many.call_count, 1)
+        self.assertEqual(list(self.notify_many.call_args.args[0]), ['bitcoin'])
+
+        # Dropping below the threshold re-arms the alert
+        flush_with(0.5)
+        flush_with(Config.VOLATILITY_1H_THRESHOLD + 2)
+        self.assertEqual(self.notify_many.call_count, 2)
+        self.assertEqual(self.consumer.stats['alerts_sent'], 2)
+
+    def test_polls_while_stream_is_down(self):
+        prices = {'bitcoin': tick('bitcoin', 50000.0)}
+        with patch.object(CoinGeckoService, 'get_prices', return_value=prices) as get_prices:
+            self.consumer._poll_fallback()
+            # Not again until PRICE_STREAM_POLL_SECONDS have passed
+            self.consumer._poll_fallback()
+
+        get_prices.assert_called_once()
+        self.assertEqual(sorted(get_prices.call_args.args[0]), ['bitcoin', 'ethereum'])
+        self.assertEqual(self.consumer.stats['polls'], 1)
+        self.assertEqual(db.session.get(Price, 'bitcoin').last_price, 50000.0)
+
+    def test_failed_flush_keeps_ticks_for_the_next_one(self):
+        self.consumer.handle_event(json.dumps([tick('bitcoin', 100.0, 10.0), tick('ethereum', 2000.0)]))
+        save_quotes = PriceService.save_quotes
+
+        def fail_after_newer_tick(prices):
+            # A newer bitcoin tick arrives while the failing flush is in progress
+            self.consumer.handle_event(json.dumps(tick('bitcoin', 101.0, 10.0)))
+            raise RuntimeError("database is locked")
+
+        with patch.object(PriceService, 'save_quotes', side_effect=fail_after_newer_tick):
+            self.consumer.flush()
+        self.assertEqual({cid: q['current_price'] for cid, q in self.consumer.buffer.items()},
+                         {'bitcoin': 101.0, 'ethereum': 2000.0})
+        self.assertEqual(self.consumer.stats['flushes'], 0)
+        self.notify_many.assert_not_called()
+
+        with patch.object(PriceService, 'save_quotes', side_effect=save_quotes):
+            self.consumer.flush()
+        self.assertEqual(self.consumer.buffer, {})
+        self.assertEqual(db.session.get(Price, 'bitcoin').last_price, 101.0)
+        self.assertEqual(db.session.get(Price, 'ethereum').last_price, 2000.0)
+        # The alert that didn't commit the first time is raised now
+        self.notify_many.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
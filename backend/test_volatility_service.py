@@ -0,0 +1,60 @@
+import math
+import random
+import unittest
+from config import Config
+from app.services.volatility_service import VolatilityService, PriceSnapshot
+
+
+def quote(change_1h, change_24h, price=1.0):
+    return {'current_price': price,
+            'price_change_percentage_1h_in_currency': change_1h,
+            'price_change_percentage_24h_in_currency': change_24h}
+
+
+def loop_check(prices):
+    return {cid: alerts for cid, data in prices.items()
+            if (alerts := VolatilityService.check_volatility(data))}
+
+
+class VolatilityServiceTestCase(unittest.TestCase):
+    def test_missing_changes_never_flag(self):
+        prices = {
+            'none': quote(None, None),
+            'nan': quote(math.nan, math.nan),
+            'absent': {'current_price': None},
+        }
+        snapshot = PriceSnapshot.from_prices(prices)
+
+        self.assertEqual(list(snapshot.change_1h), [0.0, 0.0, 0.0])
+        self.assertEqual(len(VolatilityService.flag(snapshot)[0]), 0)
+        self.assertEqual(VolatilityService.check_snapshot(snapshot), {})
+        self.assertEqual(loop_check(prices), {})
+
+    def test_threshold_is_inclusive(self):
+        at_1h, at_24h = Config.VOLATILITY_1H_THRESHOLD, Config.VOLATILITY_24H_THRESHOLD
+        prices = {
+            'at_1h': quote(at_1h, 0.0),
+            'at_24h_down': quote(0.0, -at_24h),
+            'just_below': quote(math.nextafter(at_1h, 0), math.nextafter(-at_24h, 0)),
+        }
+        flagged = VolatilityService.check_snapshot(PriceSnapshot.from_prices(prices))
+
+        self.assertEqual(set(flagged), {'at_1h', 'at_24h_down'})
+        self.assertEqual([a['type'] for a in flagged['at_1h']], ['1h_volatility'])
+        self.assertEqual(flagged['at_24h_down'][0]['message'], f"DOWN {-at_24h:.2f}% in 24h")
+        self.assertEqual(flagged, loop_check(prices))
+
+    def test_snapshot_matches_per_quote_check(self):
+        rng = random.Random(8)
+        edges = [None, math.nan, 0.0, Config.VOLATILITY_1H_THRESHOLD, -Config.VOLATILITY_24H_THRESHOLD]
+
+        def change(scale):
+            return rng.choice(edges) if rng.random() < 0.1 else rng.gauss(0, scale)
+
+        for size in (0, 1, 50, 2000):
+            prices = {f"coin-{i}": quote(change(2.0), change(4.0), rng.uniform(0.01, 1000)) for i in range(size)}
+            self.assertEqual(VolatilityService.check_snapshot(PriceSnapshot.from_prices(prices)), loop_check(prices))
+
+
+if __name__ == '__main__':
+    unittest.main()
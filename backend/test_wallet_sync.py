@@ -0,0 +1,106 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from config import Config
+from app import db
+from app.models import User, Wallet, Holding
+from app.services.wallet_service import WalletService
+from app.services.wallet_sync_service import WalletSyncService
+from app_test_case import AppTestCase
+
+
+class WalletSyncTestCase(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        WalletSyncService._semaphores.clear()
+
+        user = User(cliq_user_id='u1')
+        db.session.add(user)
+        db.session.flush()
+        chains = ['eth', 'sol', 'btc']
+        db.session.add_all([Wallet(user_id=user.id, address=f"a{i}", chain=chains[i % 3]) for i in range(12)])
+        db.session.commit()
+        self.user = user
+
+    def tearDown(self):
+        WalletSyncService._semaphores.clear()
+        super().tearDown()
+
+    def test_per_provider_concurrency_cap(self):
+        lock = threading.Lock()
+        in_flight, peak = {}, {}
+        writer = threading.get_ident()
+
+        def fake_fetch(address, chain):
+            provider = WalletService.provider_for_chain(chain)
+            with lock:
+                in_flight[provider] = in_flight.get(provider, 0) + 1
+                peak[provider] = max(peak.get(provider, 0), in_flight[provider])
+            time.sleep(0.05)
+            with lock:
+                in_flight[provider] -= 1
+            self.assertNotEqual(threading.get_ident(), writer)
+            return [{'coin_id': f"coin-{address}", 'amount': 1.0, 'chain': chain}]
+
+        limits = {'moralis_evm': 2, 'moralis_sol': 1, 'blockcypher': 1}
+        with patch.object(Config, 'WALLET_PROVIDER_CONCURRENCY', limits), \
+             patch.object(Config, 'WALLET_SYNC_WORKERS', 8), \
+             patch.object(WalletService, 'fetch_wallet_balances', side_effect=fake_fetch):
+            stats = WalletSyncService.sync(Wallet.query.all())
+        db.session.commit()
+
+        self.assertEqual(stats['wallets_synced'], 12)
+        for provider, limit in limits.items():
+            self.assertLessEqual(peak[provider], limit)
+        self.assertEqual(Holding.query.filter_by(user_id=self.user.id).count(), 12)
+
+    def test_failed_fetch_skips_wallet(self):
+        def fake_fetch(address, chain):
+            if chain == 'btc':
+                raise RuntimeError("provider down")
+            return []
+
+        with patch.object(WalletService, 'fetch_wallet_balances', side_effect=fake_fetch):
+            stats = WalletSyncService.sync(Wallet.query.all())
+        self.assertEqual(stats['wallets_synced'], 8)
+
+
+    def test_unchanged_wallet_backs_off_and_change_resets(self):
+        wallet = Wallet.query.filter_by(chain='sol').first()
+        balances = [{'coin_id': 'solana', 'amount': 1.0, 'chain': 'sol'}]
+
+        with patch.object(WalletService, 'fetch_wallet_balances', return_value=balances):
+            WalletSyncService.sync([wallet])  # new holding -> changed
+            self.assertEqual(wallet.sync_interval, Config.WALLET_SYNC_MIN_INTERVAL)
+            WalletSyncService.sync([wallet])
+            self.assertEqual(wallet.sync_interval, Config.WALLET_SYNC_MIN_INTERVAL * 2)
+            WalletSyncService.sync([wallet])
+            self.assertEqual(wallet.sync_interval, Config.WALLET_SYNC_MIN_INTERVAL * 4)
+
+        balances[0]['amount'] = 2.0
+        with patch.object(WalletService, 'fetch_wallet_balances', return_value=balances):
+            stats = WalletSyncService.sync([wallet])
+        self.assertEqual(stats['wallets_changed'], 1)
+        self.assertEqual(wallet.sync_interval, Config.WALLET_SYNC_MIN_INTERVAL)
+        self.assertGreater(wallet.next_sync_at, datetime.utcnow())
+
+    def test_due_set_respects_call_budget(self):
+        # 4 eth wallets cost 2 calls each, 4 sol and 4 btc cost 1
+        self.assertEqual(len(WalletSyncService.due_wallet_ids(budget=100)), 12)
+        self.assertEqual(len(WalletSyncService.due_wallet_ids(budget=4)), 3)
+
+        later = datetime.utcnow() + timedelta(hours=1)
+        for wallet in Wallet.query.all():
+            wallet.next_sync_at = later
+        db.session.commit()
+        self.assertEqual(WalletSyncService.due_wallet_ids(), [])
+
+        WalletSyncService.promote(self.user.id)
+        db.session.commit()
+        self.assertEqual(len(WalletSyncService.due_wallet_ids()), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
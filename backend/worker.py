@@ -0,0 +1,16 @@
+import argparse
+from app import create_app, db
+from app.services.job_queue import JobWorker
+from app.tasks import HANDLERS
+
+app = create_app()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run queued cron jobs. Start several for more throughput.")
+    parser.add_argument('--kinds', help="Comma-separated job kinds to handle (default: all)")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        kinds = args.kinds.split(',') if args.kinds else None
+        JobWorker(HANDLERS, kinds=kinds).run()
@@ -16,7 +16,18 @@ document.addEventListener('DOMContentLoaded', async () => {
         document.getElementById('loading').style.display = 'none';
         document.getElementById('content').style.display = 'block';
         
-        document.getElementById('total-value').textContent = `$${data.total_value.toFixed(2)}`;
+        // Values arrive already converted to the user's currency
+        const code = (data.currency || 'usd').toUpperCase();
+        const money = (v) => {
+            try {
+                return new Intl.NumberFormat(undefined, { style: 'currency', currency: code }).format(v);
+            } catch (e) {
+                // Not an ISO 4217 code (e.g. a currency saved before only fiat was accepted)
+                return `${new Intl.NumberFormat(undefined, { maximumFractionDigits: 2 }).format(v)} ${code}`;
+            }
+        };
+        
+        document.getElementById('total-value').textContent = money(data.total_value);
         
         const list = document.getElementById('holdings-list');
         list.innerHTML = '';
@@ -25,9 +36,9 @@ document.addEventListener('DOMContentLoaded', async () => {
             const row = document.createElement('tr');
             row.innerHTML = `
                 <td>${h.coin.toUpperCase()}</td>
-                <td>$${h.current_price}</td>
+                <td>${money(h.current_price)}</td>
                 <td>${h.amount}</td>
-                <td>$${h.value.toFixed(2)}</td>
+                <td>${money(h.value)}</td>
             `;
             list.appendChild(row);
         });